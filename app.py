@@ -4,7 +4,7 @@ import logging
 from trading_analysis import analyze_symbol
 from data_fetcher import symbols
 from models import TradingRecord, session
-from ml_predictor import predictor
+from ml_predictor import get_predictor, rule_based_prediction, training_status
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -39,8 +39,17 @@ def get_symbols():
 def predict():
     data = request.get_json()
     indicators = data.get('indicators', {})
-    prediction = predictor.predict(indicators)
-    return jsonify({'prediction': prediction})
+    predictor = get_predictor()
+    if predictor:
+        return jsonify({'prediction': predictor.predict(indicators), 'source': 'model',
+                        'model_version': predictor.metadata.get('version')})
+    # No model yet (training in the background): rule-based fallback
+    prediction, _ = rule_based_prediction(indicators)
+    return jsonify({'prediction': prediction, 'source': 'rules'})
+
+@app.route('/model/status')
+def model_status():
+    return jsonify(training_status())
 
 @app.route('/records')
 def get_records():
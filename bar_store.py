@@ -0,0 +1,159 @@
+import os
+import re
+import pandas as pd
+
+# Root directory of the on-disk bar store (set BAR_STORE_DIR to relocate it).
+# Simulated bars (MARKET_SIMULATOR_URL set) go to their own store so they are
+# never served as history to a later run against the live providers.
+BAR_STORE_DIR = os.getenv('BAR_STORE_DIR') or ('bar_store_simulator' if os.getenv('MARKET_SIMULATOR_URL') else 'bar_store')
+
+def _partition_path(symbol, interval):
+    """
+    Path of the Parquet file holding one symbol/interval partition.
+    """
+    safe_symbol = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+    return os.path.join(BAR_STORE_DIR, f"symbol={safe_symbol}", f"interval={interval}", 'bars.parquet')
+
+def align_timestamp(ts, index):
+    """
+    Convert a bound to a Timestamp comparable with the given index
+    (yfinance daily bars come back tz-naive, intraday bars tz-aware).
+    """
+    ts = pd.Timestamp(ts)
+    if index.tz is None and ts.tzinfo is not None:
+        return ts.tz_localize(None)
+    if index.tz is not None and ts.tzinfo is None:
+        return ts.tz_localize(index.tz)
+    if index.tz is not None:
+        return ts.tz_convert(index.tz)
+    return ts
+
+def slice_bars(data, start=None, end=None):
+    """
+    Return the bars between start and end (inclusive).
+    """
+    if data.empty:
+        return data
+    if start is not None:
+        data = data[data.index >= align_timestamp(start, data.index)]
+    if end is not None:
+        data = data[data.index <= align_timestamp(end, data.index)]
+    return data
+
+def read_bars(symbol, interval='1d', start=None, end=None):
+    """
+    Read stored bars for a symbol/interval, optionally sliced to [start, end].
+    Returns an empty DataFrame when nothing has been stored yet.
+    """
+    path = _partition_path(symbol, interval)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+
+    try:
+        data = pd.read_parquet(path)
+    except Exception as e:
+        print(f"Bar store read error for {symbol} ({interval}): {e}")
+        return pd.DataFrame()
+
+    return slice_bars(data, start, end)
+
+def write_bars(symbol, interval, data):
+    """
+    Replace the stored partition with the given bars. The file is written to
+    a temporary path first so readers never see a half-written partition.
+    """
+    path = _partition_path(symbol, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    data.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+def append_bars(symbol, interval, new_data):
+    """
+    Merge newly fetched bars into the store and return the full partition.
+    Bars already on disk are overwritten by the new ones for the same
+    timestamp, so a partial last bar gets replaced once it completes.
+    """
+    existing = read_bars(symbol, interval)
+    if new_data.empty:
+        return existing
+
+    if existing.empty:
+        merged = new_data
+    else:
+        if existing.index.tz is None and new_data.index.tz is not None:
+            # Migrate partitions written before bars were tz-aware
+            existing = existing.set_axis(existing.index.tz_localize(new_data.index.tz))
+        elif existing.index.tz is not None and new_data.index.tz is None:
+            new_data = new_data.set_axis(new_data.index.tz_localize(existing.index.tz))
+        merged = pd.concat([existing, new_data])
+
+    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+    write_bars(symbol, interval, merged)
+    return merged
+
+def _marker_path(symbol, interval, name):
+    return os.path.join(os.path.dirname(_partition_path(symbol, interval)), name)
+
+def _read_marker(symbol, interval, name):
+    try:
+        with open(_marker_path(symbol, interval, name)) as f:
+            return pd.Timestamp(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def _write_marker(symbol, interval, name, ts):
+    path = _marker_path(symbol, interval, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(pd.Timestamp(ts).isoformat())
+    os.replace(tmp_path, path)
+
+def covered_from(symbol, interval='1d'):
+    """
+    Earliest start a full download of the partition was requested from, or
+    None. The provider has nothing between it and the first stored bar (a
+    symbol listed later), so requests back to it need no new download.
+    """
+    return _read_marker(symbol, interval, 'covered_from')
+
+def mark_covered_from(symbol, interval, start):
+    """
+    Record that a full download was requested from start (kept only when
+    earlier than the start already recorded).
+    """
+    start = pd.Timestamp(start)
+    current = covered_from(symbol, interval)
+    if current is not None and current <= align_timestamp(start, pd.DatetimeIndex([current])):
+        return
+    _write_marker(symbol, interval, 'covered_from', start)
+
+def checked_through(symbol, interval='1d'):
+    """
+    Last stored bar up to which missing sessions have been requested from
+    the provider again, or None. Sessions still missing before it are ones
+    the provider does not have.
+    """
+    return _read_marker(symbol, interval, 'checked_through')
+
+def mark_checked_through(symbol, interval, ts):
+    _write_marker(symbol, interval, 'checked_through', ts)
+
+def last_bar_time(symbol, interval='1d'):
+    """
+    Timestamp of the most recent stored bar, or None.
+    """
+    data = read_bars(symbol, interval)
+    if data.empty:
+        return None
+    return data.index[-1]
+
+def last_write_time(symbol, interval='1d'):
+    """
+    When the partition was last written (IST), or None if it does not exist.
+    """
+    path = _partition_path(symbol, interval)
+    if not os.path.exists(path):
+        return None
+    return pd.Timestamp(os.path.getmtime(path), unit='s', tz='UTC').tz_convert('Asia/Kolkata')
@@ -1,55 +1,233 @@
 import pandas as pd
 import numpy as np
 
+# Bars of average range a pattern's strength is measured against
+STRENGTH_LOOKBACK = 20
+
+class CandleGeometry:
+    """
+    Candle measurements shared by every pattern, built once as NumPy arrays:
+    body, shadows, range and their values on earlier bars. Prices may be
+    Series (one symbol) or time x symbol arrays/DataFrames (a panel, as
+    panel_indicators.build_panel returns); every mask then has that shape.
+    """
+    def __init__(self, data):
+        self.open = self._array(data['Open'])
+        self.high = self._array(data['High'])
+        self.low = self._array(data['Low'])
+        self.close = self._array(data['Close'])
+        self.body = self.close - self.open
+        self.body_size = np.abs(self.body)
+        self.body_top = np.maximum(self.open, self.close)
+        self.body_bottom = np.minimum(self.open, self.close)
+        self.range = self.high - self.low
+        self.upper_shadow = self.high - self.body_top
+        self.lower_shadow = self.body_bottom - self.low
+        self.bullish = self.close > self.open
+        self.bearish = self.close < self.open
+        self._shifted = {}
+
+    @staticmethod
+    def _array(values):
+        values = np.asarray(values, dtype=np.float64)
+        return values[:, None] if values.ndim == 1 else values
+
+    def prev(self, name, bars=1):
+        """
+        Attribute `name` as of `bars` bars earlier (NaN/False at the start).
+        """
+        key = (name, bars)
+        if key not in self._shifted:
+            values = getattr(self, name)
+            shifted = np.full(values.shape, False if values.dtype == bool else np.nan, dtype=values.dtype)
+            if bars < len(values):
+                shifted[bars:] = values[:len(values) - bars]
+            self._shifted[key] = shifted
+        return self._shifted[key]
+
+    def small_body(self, ratio=0.3, bars=0):
+        body, rng = (self.body_size, self.range) if bars == 0 else (self.prev('body_size', bars), self.prev('range', bars))
+        return body < rng * ratio
+
+    def long_body(self, ratio=0.5, bars=0):
+        body, rng = (self.body_size, self.range) if bars == 0 else (self.prev('body_size', bars), self.prev('range', bars))
+        return body >= rng * ratio
+
+    def rising(self):
+        # The previous bar closed above the one before it
+        return self.prev('close') > self.prev('close', 2)
+
+    def falling(self):
+        return self.prev('close') < self.prev('close', 2)
+
+def _doji(g):
+    return (g.range > 0) & (g.body_size < g.range * 0.1)
+
+def _spinning_top(g):
+    return g.small_body() & ~_doji(g) & (g.upper_shadow > g.body_size) & (g.lower_shadow > g.body_size)
+
+def _hammer_shape(g):
+    return (g.lower_shadow > 2 * g.body_size) & (g.upper_shadow < g.body_size)
+
+def _inverted_shape(g):
+    return (g.upper_shadow > 2 * g.body_size) & (g.lower_shadow < g.body_size)
+
+def _bullish_engulfing(g):
+    return (g.prev('bearish') & g.bullish
+            & (g.open < g.prev('close')) & (g.close > g.prev('open')))
+
+def _bearish_engulfing(g):
+    return (g.prev('bullish') & g.bearish
+            & (g.open > g.prev('close')) & (g.close < g.prev('open')))
+
+def _bullish_harami(g):
+    return (g.prev('bearish') & g.long_body(bars=1) & g.bullish
+            & (g.body_top < g.prev('open')) & (g.body_bottom > g.prev('close')))
+
+def _bearish_harami(g):
+    return (g.prev('bullish') & g.long_body(bars=1) & g.bearish
+            & (g.body_top < g.prev('close')) & (g.body_bottom > g.prev('open')))
+
+def _morning_star(g):
+    first_mid = (g.prev('open', 2) + g.prev('close', 2)) / 2
+    return (g.prev('bearish', 2) & g.long_body(bars=2)
+            & g.small_body(bars=1) & (g.prev('body_bottom') < g.prev('close', 2))
+            & g.bullish & (g.close > first_mid))
+
+def _evening_star(g):
+    first_mid = (g.prev('open', 2) + g.prev('close', 2)) / 2
+    return (g.prev('bullish', 2) & g.long_body(bars=2)
+            & g.small_body(bars=1) & (g.prev('body_top') > g.prev('close', 2))
+            & g.bearish & (g.close < first_mid))
+
+def _piercing_line(g):
+    prev_mid = (g.prev('open') + g.prev('close')) / 2
+    return (g.prev('bearish') & g.long_body(bars=1) & g.bullish
+            & (g.open < g.prev('close')) & (g.close > prev_mid) & (g.close < g.prev('open')))
+
+def _dark_cloud_cover(g):
+    prev_mid = (g.prev('open') + g.prev('close')) / 2
+    return (g.prev('bullish') & g.long_body(bars=1) & g.bearish
+            & (g.open > g.prev('close')) & (g.close < prev_mid) & (g.close > g.prev('open')))
+
+def _three_white_soldiers(g):
+    return (g.bullish & g.prev('bullish') & g.prev('bullish', 2)
+            & (g.close > g.prev('close')) & (g.prev('close') > g.prev('close', 2))
+            & (g.open > g.prev('open')) & (g.open < g.prev('close'))
+            & g.long_body() & g.long_body(bars=1) & g.long_body(bars=2))
+
+def _three_black_crows(g):
+    return (g.bearish & g.prev('bearish') & g.prev('bearish', 2)
+            & (g.close < g.prev('close')) & (g.prev('close') < g.prev('close', 2))
+            & (g.open < g.prev('open')) & (g.open > g.prev('close'))
+            & g.long_body() & g.long_body(bars=1) & g.long_body(bars=2))
+
+# Pattern name -> (mask function over a CandleGeometry, direction:
+# 1 bullish, -1 bearish, 0 indecision)
+PATTERNS = {
+    'doji': (_doji, 0),
+    'spinning_top': (_spinning_top, 0),
+    'bullish_marubozu': (lambda g: (g.open == g.low) & (g.close == g.high), 1),
+    'bearish_marubozu': (lambda g: (g.open == g.high) & (g.close == g.low), -1),
+    # Same shapes read by the prior trend: bullish after a fall, bearish after a rise
+    'hammer': (lambda g: _hammer_shape(g) & g.falling(), 1),
+    'inverted_hammer': (lambda g: _inverted_shape(g) & g.falling(), 1),
+    'hanging_man': (lambda g: _hammer_shape(g) & g.rising(), -1),
+    'shooting_star': (lambda g: _inverted_shape(g) & g.rising(), -1),
+    'bullish_engulfing': (_bullish_engulfing, 1),
+    'bearish_engulfing': (_bearish_engulfing, -1),
+    'bullish_harami': (_bullish_harami, 1),
+    'bearish_harami': (_bearish_harami, -1),
+    'piercing_line': (_piercing_line, 1),
+    'dark_cloud_cover': (_dark_cloud_cover, -1),
+    'morning_star': (_morning_star, 1),
+    'evening_star': (_evening_star, -1),
+    'three_white_soldiers': (_three_white_soldiers, 1),
+    'three_black_crows': (_three_black_crows, -1),
+}
+
+def _pattern_series(data, name):
+    mask = PATTERNS[name][0](CandleGeometry(data))
+    return pd.Series(mask[:, 0], index=data.index)
+
 def bullish_marubozu(data):
     """
     Bullish Marubozu: Open = Low, Close = High, no shadows.
     """
-    return (data['Open'] == data['Low']) & (data['Close'] == data['High'])
+    return _pattern_series(data, 'bullish_marubozu')
 
 def bearish_marubozu(data):
     """
     Bearish Marubozu: Open = High, Close = Low.
     """
-    return (data['Open'] == data['High']) & (data['Close'] == data['Low'])
+    return _pattern_series(data, 'bearish_marubozu')
 
 def hammer(data):
     """
-    Hammer: Small body, long lower shadow.
+    Hammer: Small body, lower shadow over twice the body, upper shadow
+    shorter than the body, after a falling close (the same candle after a
+    rise is a hanging man).
     """
-    body = abs(data['Close'] - data['Open'])
-    lower_shadow = data['Open'] - data['Low'] if data['Close'] > data['Open'] else data['Close'] - data['Low']
-    upper_shadow = data['High'] - data['Open'] if data['Close'] > data['Open'] else data['High'] - data['Close']
-    return (lower_shadow > 2 * body) & (upper_shadow < body)
+    return _pattern_series(data, 'hammer')
 
 def doji(data):
     """
-    Doji: Open ≈ Close.
+    Doji: Open ≈ Close (body under 10% of the range).
     """
-    body = abs(data['Close'] - data['Open'])
-    total_range = data['High'] - data['Low']
-    return body / total_range < 0.1
+    return _pattern_series(data, 'doji')
 
 def bullish_engulfing(data):
     """
     Bullish Engulfing: Previous bearish, current bullish engulfing.
     """
-    prev_bearish = data['Close'].shift() < data['Open'].shift()
-    current_bullish = data['Close'] > data['Open']
-    engulfing = (data['Open'] < data['Close'].shift()) & (data['Close'] > data['Open'].shift())
-    return prev_bearish & current_bullish & engulfing
+    return _pattern_series(data, 'bullish_engulfing')
 
 def morning_star(data):
     """
-    Morning Star: Three candles - bearish, small, bullish.
+    Morning Star: Three candles - a long bearish body, a small body below
+    its close, then a bullish candle closing above the first body's midpoint.
+    """
+    return _pattern_series(data, 'morning_star')
+
+def scan_patterns(data, patterns=None, symbol=None):
     """
-    first_bearish = data['Close'].shift(2) < data['Open'].shift(2)
-    second_small = abs(data['Close'].shift() - data['Open'].shift()) < (data['High'].shift() - data['Low'].shift()) * 0.3
-    third_bullish = data['Close'] > data['Open']
-    star = data['Close'].shift() < data['Open'].shift(2) and data['Close'].shift() > data['Close'].shift(2)
-    return first_bearish & second_small & third_bullish & star
+    Evaluate the pattern catalogue (default: all of PATTERNS) on one OHLCV
+    frame, or on a panel of field -> time x symbol DataFrames, and return
+    only the hits as an event table with columns timestamp, symbol, pattern,
+    direction (1/-1/0) and strength (the signal candle's range over the
+    average range of the previous STRENGTH_LOOKBACK bars).
+    """
+    close = data['Close']
+    if isinstance(close, pd.DataFrame):
+        index, symbols = close.index, list(close.columns)
+    else:
+        index, symbols = data.index, [symbol if symbol is not None else data.attrs.get('symbol', '')]
+
+    g = CandleGeometry(data)
+    with np.errstate(invalid='ignore'):
+        average_range = pd.DataFrame(g.range).rolling(STRENGTH_LOOKBACK, min_periods=1).mean().shift(1).to_numpy()
+        relative_range = g.range / average_range
+
+    names = list(patterns or PATTERNS)
+    rows, cols, codes = [], [], []
+    for code, name in enumerate(names):
+        with np.errstate(invalid='ignore'):
+            hit_rows, hit_cols = np.nonzero(PATTERNS[name][0](g))
+        rows.append(hit_rows)
+        cols.append(hit_cols)
+        codes.append(np.full(len(hit_rows), code, dtype=np.int16))
+    rows, cols, codes = np.concatenate(rows), np.concatenate(cols), np.concatenate(codes)
 
-# Add more patterns similarly...
+    order = np.lexsort((codes, cols, rows))
+    rows, cols, codes = rows[order], cols[order], codes[order]
+    directions = np.array([PATTERNS[name][1] for name in names], dtype=np.int8)
+    return pd.DataFrame({
+        'timestamp': index[rows],
+        'symbol': pd.Categorical.from_codes(cols, categories=pd.Index(symbols).astype(str)),
+        'pattern': pd.Categorical.from_codes(codes, categories=names),
+        'direction': directions[codes],
+        'strength': relative_range[rows, cols].astype(np.float32),
+    })
 
 def advanced_candlestick_analysis(data):
     """
@@ -1,52 +1,171 @@
 import pandas as pd
 import numpy as np
+from swing_points import SwingIndex
 
-def head_and_shoulders(data):
+# Fractal lookback used when a detector builds its own swing index
+PATTERN_SCALE = 5
+
+def _pivots(data, scale, swings):
+    if swings is None:
+        swings = SwingIndex(data, scales=(scale,))
+    return swings.pivots(scale)
+
+def _back(values, n):
     """
-    Simple detection: Three peaks, middle higher.
+    values[i - n] aligned to i (NaN for the first n pivots).
     """
-    peaks = (data['High'] > data['High'].shift()) & (data['High'] > data['High'].shift(-1))
-    left_shoulder = peaks.shift(2)
-    head = peaks.shift(1) & (data['High'] > data['High'].shift(2)) & (data['High'] > data['High'].shift())
-    right_shoulder = peaks
-    return left_shoulder & head & right_shoulder
+    out = np.full(len(values), np.nan)
+    if n < len(values):
+        out[n:] = values[:len(values) - n]
+    return out
 
-def double_top(data):
+def _last_four(pivots):
     """
-    Two similar highs.
+    (older high, newer high, older low, newer low) ending at each pivot.
     """
-    peaks = (data['High'] > data['High'].shift()) & (data['High'] > data['High'].shift(-1))
-    first_top = peaks.shift(1)
-    second_top = peaks
-    similar = abs(data['High'].shift(1) - data['High']) / data['High'] < 0.05
-    return first_top & second_top & similar
+    price, is_high = pivots['price'].to_numpy(), pivots['kind'].to_numpy() == 1
+    p0, p1, p2, p3 = price, _back(price, 1), _back(price, 2), _back(price, 3)
+    return np.where(is_high, p2, p3), np.where(is_high, p0, p1), np.where(is_high, p3, p2), np.where(is_high, p1, p0)
+
+def _head_and_shoulders(pivots, tolerance=0.03):
+    # right shoulder, neckline low, head, neckline low, left shoulder
+    price, is_high = pivots['price'].to_numpy(), pivots['kind'].to_numpy() == 1
+    right, head, left = price, _back(price, 2), _back(price, 4)
+    return is_high & (head > right) & (head > left) & (np.abs(right - left) <= tolerance * head)
+
+def _inverse_head_and_shoulders(pivots, tolerance=0.03):
+    price, is_low = pivots['price'].to_numpy(), pivots['kind'].to_numpy() == -1
+    right, head, left = price, _back(price, 2), _back(price, 4)
+    return is_low & (head < right) & (head < left) & (np.abs(right - left) <= tolerance * head)
+
+def _double_top(pivots, tolerance=0.02):
+    # Two highs within tolerance, the trough between them deeper than their difference twice over
+    price, is_high = pivots['price'].to_numpy(), pivots['kind'].to_numpy() == 1
+    second, trough, first = price, _back(price, 1), _back(price, 2)
+    gap = np.abs(second - first)
+    return is_high & (gap <= tolerance * np.fmax(first, second)) & (np.fmin(first, second) - trough > 2 * gap)
+
+def _double_bottom(pivots, tolerance=0.02):
+    price, is_low = pivots['price'].to_numpy(), pivots['kind'].to_numpy() == -1
+    second, peak, first = price, _back(price, 1), _back(price, 2)
+    gap = np.abs(second - first)
+    return is_low & (gap <= tolerance * np.fmin(first, second)) & (peak - np.fmax(first, second) > 2 * gap)
+
+def _ascending_triangle(pivots, tolerance=0.005):
+    high_a, high_b, low_a, low_b = _last_four(pivots)
+    return (np.abs(high_b - high_a) <= tolerance * high_a) & (low_b > low_a)
+
+def _descending_triangle(pivots, tolerance=0.005):
+    high_a, high_b, low_a, low_b = _last_four(pivots)
+    return (np.abs(low_b - low_a) <= tolerance * low_a) & (high_b < high_a)
 
-def ascending_triangle(data):
+def _symmetric_triangle(pivots, tolerance=0.005):
+    high_a, high_b, low_a, low_b = _last_four(pivots)
+    return (high_b < high_a * (1 - tolerance)) & (low_b > low_a * (1 + tolerance))
+
+def _rising_wedge(pivots, tolerance=0.0):
+    # Both sides rising, lows faster: the lines converge
+    high_a, high_b, low_a, low_b = _last_four(pivots)
+    return (high_b > high_a) & (low_b > low_a) & (low_b - low_a > (high_b - high_a) * (1 + tolerance))
+
+def _falling_wedge(pivots, tolerance=0.0):
+    high_a, high_b, low_a, low_b = _last_four(pivots)
+    return (high_b < high_a) & (low_b < low_a) & (high_a - high_b > (low_a - low_b) * (1 + tolerance))
+
+def _cup_and_handle(pivots, tolerance=0.02):
+    # left rim, cup bottom, right rim, handle low (shallower than half the cup)
+    price, is_low = pivots['price'].to_numpy(), pivots['kind'].to_numpy() == -1
+    handle, right_rim, bottom, left_rim = price, _back(price, 1), _back(price, 2), _back(price, 3)
+    depth = np.fmin(left_rim, right_rim) - bottom
+    return (is_low & (np.abs(right_rim - left_rim) <= tolerance * left_rim) & (depth > 0)
+            & (handle < right_rim) & (handle > bottom + depth / 2))
+
+# Pattern name -> (detector over a pivot frame, number of pivots it spans)
+CHART_PATTERNS = {
+    'head_and_shoulders': (_head_and_shoulders, 5),
+    'inverse_head_and_shoulders': (_inverse_head_and_shoulders, 5),
+    'double_top': (_double_top, 3),
+    'double_bottom': (_double_bottom, 3),
+    'ascending_triangle': (_ascending_triangle, 4),
+    'descending_triangle': (_descending_triangle, 4),
+    'symmetric_triangle': (_symmetric_triangle, 4),
+    'rising_wedge': (_rising_wedge, 4),
+    'falling_wedge': (_falling_wedge, 4),
+    'cup_and_handle': (_cup_and_handle, 4),
+}
+
+def _detect(data, name, scale, swings, **kwargs):
     """
-    Higher lows, horizontal resistance.
+    Boolean Series over data's bars, True on the bar that confirmed the
+    pattern's last pivot.
     """
-    resistance = data['High'].rolling(20).max()
-    support_trend = data['Low'].rolling(5).min()
-    return (data['High'] < resistance * 1.01) & (data['Low'] > support_trend)
+    pivots = _pivots(data, scale, swings)
+    result = pd.Series(False, index=data.index)
+    if pivots.empty:
+        return result
+    with np.errstate(invalid='ignore'):
+        hits = CHART_PATTERNS[name][0](pivots, **kwargs)
+    result.loc[result.index.isin(pivots.loc[hits, 'confirmed'])] = True
+    return result
 
-# Add more patterns: double bottom, cup and handle, etc.
+def head_and_shoulders(data, scale=PATTERN_SCALE, swings=None, tolerance=0.03):
+    """
+    Three swing highs with the middle one highest and the shoulders within
+    tolerance of each other, read from the swing index zigzag.
+    """
+    return _detect(data, 'head_and_shoulders', scale, swings, tolerance=tolerance)
+
+def double_top(data, scale=PATTERN_SCALE, swings=None, tolerance=0.02):
+    """
+    Two swing highs within tolerance with a clear trough between them.
+    """
+    return _detect(data, 'double_top', scale, swings, tolerance=tolerance)
+
+def double_bottom(data, scale=PATTERN_SCALE, swings=None, tolerance=0.02):
+    """
+    Two swing lows within tolerance with a clear peak between them.
+    """
+    return _detect(data, 'double_bottom', scale, swings, tolerance=tolerance)
 
-def cup_and_handle(data):
+def ascending_triangle(data, scale=PATTERN_SCALE, swings=None, tolerance=0.005):
     """
-    Cup: Rounding bottom, Handle: Small consolidation.
+    Higher lows, horizontal resistance.
+    """
+    return _detect(data, 'ascending_triangle', scale, swings, tolerance=tolerance)
+
+def cup_and_handle(data, scale=PATTERN_SCALE, swings=None, tolerance=0.02):
+    """
+    Cup: two rims within tolerance around a lower bottom. Handle: a
+    pullback from the right rim that stays in the cup's upper half.
     """
-    # Simplified: Look for U shape followed by flat
-    lows = data['Low'].rolling(20).min()
-    cup = data['Low'] > lows * 0.95
-    handle = (data['High'] - data['Low']) < (data['High'].shift() - data['Low'].shift()) * 0.5
-    return cup & handle.shift(-5)  # Approximate
+    return _detect(data, 'cup_and_handle', scale, swings, tolerance=tolerance)
 
-def rising_wedge(data):
+def rising_wedge(data, scale=PATTERN_SCALE, swings=None):
     """
     Converging trendlines, rising.
     """
-    # Simplified: Decreasing volume, converging highs/lows
-    high_trend = data['High'].rolling(10).max()
-    low_trend = data['Low'].rolling(10).min()
-    converging = (high_trend.diff() < 0) & (low_trend.diff() > 0)
-    return converging
+    return _detect(data, 'rising_wedge', scale, swings)
+
+def scan_chart_patterns(data=None, scale=PATTERN_SCALE, swings=None, patterns=None):
+    """
+    Run every structural detector over one swing index (built from data
+    when not given) and return the hits as a table: pattern, start (first
+    pivot), end (last pivot) and confirmed (bar that confirmed the last
+    pivot). Only the pivots are scanned, so long histories are cheap.
+    """
+    pivots = _pivots(data, scale, swings)
+    events = []
+    if not pivots.empty:
+        for name in (patterns or CHART_PATTERNS):
+            detector, span = CHART_PATTERNS[name]
+            with np.errstate(invalid='ignore'):
+                hits = np.flatnonzero(detector(pivots))
+            events.append(pd.DataFrame({
+                'pattern': name,
+                'start': pivots['timestamp'].iloc[hits - (span - 1)].array,
+                'end': pivots['timestamp'].iloc[hits].array,
+                'confirmed': pivots['confirmed'].iloc[hits].array,
+            }))
+    if not events:
+        return pd.DataFrame(columns=['pattern', 'start', 'end', 'confirmed'])
+    return pd.concat(events, ignore_index=True).sort_values(['confirmed', 'pattern'], kind='stable').reset_index(drop=True)
@@ -4,32 +4,228 @@ import numpy as np
 from datetime import datetime, timedelta
 import pytz
 import os
-import requests
 import json
+import threading
 from alpha_vantage.timeseries import TimeSeries
 # from polygon_api_client import RESTClient
 from twelvedata import TDClient
+import bar_store
+from fetch_cache import TTLCache, seconds_to_next_bar
+from hedged_fetch import HedgedFetcher
+import rate_limiter
+import option_snapshots
+import market_calendar
+from market_calendar import SESSION_CLOSE
+from resampler import BarResampler, bucket_starts
+from option_chain import parse_option_chain, chain_summary
+from rate_limiter import PRIORITY_INTERACTIVE, PRIORITY_SCHEDULED
+from http_session import http_get, NSE_BASE_URL
+from synthetic_data import generate_ohlcv
+
+# Local market simulator (see market_simulator.py) replacing Yahoo, Twelve Data and NSE when set
+MARKET_SIMULATOR_URL = os.getenv('MARKET_SIMULATOR_URL')
+TWELVE_DATA_BASE_URL = os.getenv('TWELVE_DATA_BASE_URL') or MARKET_SIMULATOR_URL
+
+def _yf_download(tickers, **kwargs):
+    """
+    yf.download, or the simulator's Yahoo chart endpoint when MARKET_SIMULATOR_URL is set.
+    """
+    if MARKET_SIMULATOR_URL:
+        return _simulator_download(tickers, **kwargs)
+    return yf.download(tickers, **kwargs)
+
+def parse_yahoo_chart(payload):
+    """
+    Convert a Yahoo v8 chart response into an OHLCV DataFrame.
+    """
+    result = (payload.get('chart') or {}).get('result') or []
+    if not result or not result[0].get('timestamp'):
+        return pd.DataFrame()
+    result = result[0]
+    quote = result['indicators']['quote'][0]
+    index = pd.to_datetime(result['timestamp'], unit='s', utc=True)
+    tz = (result.get('meta') or {}).get('exchangeTimezoneName')
+    if tz:
+        index = index.tz_convert(tz)
+    data = pd.DataFrame({
+        'Open': quote['open'],
+        'High': quote['high'],
+        'Low': quote['low'],
+        'Close': quote['close'],
+        'Volume': quote['volume']
+    }, index=index)
+    data.index.name = 'Datetime'
+    return data.dropna(how='all')
+
+def _simulator_download(tickers, period=None, start=None, end=None, interval='1d', **kwargs):
+    """
+    Fetch Yahoo-shaped chart responses from the simulator. Lists of tickers
+    come back with (ticker, field) columns like yf.download(group_by='ticker').
+    """
+    single = isinstance(tickers, str)
+    frames = {}
+    for ticker in ([tickers] if single else tickers):
+        params = {'interval': interval}
+        if start is not None:
+            params['period1'] = int(pd.Timestamp(start).timestamp())
+            params['period2'] = int(pd.Timestamp(end if end is not None else datetime.now()).timestamp())
+        else:
+            params['range'] = period or '1mo'
+        try:
+            response = http_get(f"{MARKET_SIMULATOR_URL}/v8/finance/chart/{ticker}", params=params, timeout=10)
+            if response.status_code == 200:
+                frame = parse_yahoo_chart(response.json())
+                if not frame.empty:
+                    frames[ticker] = frame
+        except Exception as e:
+            print(f"Simulator error for {ticker}: {e}")
+
+    if single:
+        return frames.get(tickers, pd.DataFrame())
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1)
+
+# Canonical OHLCV schema of every frame data_fetcher returns
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+OHLCV_PRICE_DTYPE = np.dtype(os.getenv('OHLCV_PRICE_DTYPE', 'float64'))  # float32 halves memory per symbol
+OHLCV_TZ = 'Asia/Kolkata'
+
+def _is_canonical(data):
+    index = data.index
+    return (list(data.columns) == OHLCV_COLUMNS
+            and isinstance(index, pd.DatetimeIndex) and str(index.tz) == OHLCV_TZ
+            and index.is_monotonic_increasing and index.is_unique
+            and all(data[col].dtype == OHLCV_PRICE_DTYPE for col in OHLCV_COLUMNS[:4])
+            and data['Volume'].dtype == np.int64)
+
+def normalize_ohlcv(data, source_tz=OHLCV_TZ):
+    """
+    Bring a provider frame into the canonical schema once at ingest: flat
+    Open/High/Low/Close/Volume columns (ticker levels and extra columns
+    dropped), a tz-aware IST index sorted with duplicate timestamps removed
+    (last wins), prices as OHLCV_PRICE_DTYPE and Volume as int64. Naive
+    timestamps are taken to be in source_tz. Rows without a Close are
+    dropped. Frames already in the schema are returned unchanged.
+    """
+    if data is None or data.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], tz=OHLCV_TZ))
+    if _is_canonical(data):
+        return data
+
+    if isinstance(data.columns, pd.MultiIndex):
+        # yfinance puts the field names on either level depending on group_by
+        level = next((i for i in range(data.columns.nlevels) if 'Close' in data.columns.get_level_values(i)), 0)
+        data = data.droplevel([i for i in range(data.columns.nlevels) if i != level], axis=1)
+    data = data.loc[:, ~data.columns.duplicated()]
+    if 'Close' not in data.columns:
+        return normalize_ohlcv(None)
+
+    index = pd.DatetimeIndex(pd.to_datetime(data.index))
+    index = index.tz_localize(source_tz) if index.tz is None else index
+    index = index.tz_convert(OHLCV_TZ)
+
+    close = data['Close']
+    frame = pd.DataFrame({
+        col: (data[col] if col in data.columns else close).to_numpy(dtype=OHLCV_PRICE_DTYPE)
+        for col in OHLCV_COLUMNS[:4]
+    }, index=index)
+    volume = data['Volume'] if 'Volume' in data.columns else pd.Series(0, index=data.index)
+    frame['Volume'] = pd.to_numeric(volume, errors='coerce').fillna(0).to_numpy().astype(np.int64)
+
+    frame = frame[~np.isnan(frame['Close'].values)]
+    if not frame.index.is_monotonic_increasing:
+        frame = frame.sort_index(kind='stable')
+    if not frame.index.is_unique:
+        frame = frame[~frame.index.duplicated(keep='last')]
+    return frame
+
+# Minutes after the close before provider bars for the session are treated as final
+STORE_SETTLE_MINUTES = int(os.getenv('STORE_SETTLE_MINUTES', '15'))
+
+def _store_is_current(symbol, interval, end_date):
+    """
+    True when an exchange symbol's partition was written after the last
+    completed session settled and no session has opened since, so a
+    download could not return anything new.
+    """
+    if not market_calendar.is_exchange_symbol(symbol) or market_calendar.is_market_open():
+        return False
+    written = bar_store.last_write_time(symbol, interval)
+    last_close = market_calendar.last_session_close(end_date)
+    return written is not None and last_close is not None and written >= last_close + timedelta(minutes=STORE_SETTLE_MINUTES)
+
+def _unchecked_gaps(symbol, interval, stored, start):
+    """
+    Sessions of an exchange symbol missing from the stored bars after start
+    and after the last gap check (an earlier download that came back short).
+    """
+    if not market_calendar.is_exchange_symbol(symbol):
+        return pd.DatetimeIndex([])
+    checked = bar_store.checked_through(symbol, interval)
+    if checked is not None:
+        start = max(start, bar_store.align_timestamp(checked, stored.index))
+    return market_calendar.find_gaps(stored.index[stored.index >= start], interval)
+
+def fetch_stored_bars(symbol, start_date, end_date, interval='1d'):
+    """
+    Read bars from the local bar store and download only what is missing.
+    The tail is topped up from the last stored bar (which is re-fetched in
+    case it was still forming); a full download only happens when the store
+    does not reach back to start_date yet. A full download that starts
+    later than start_date (a symbol listed since) still covers it. Sessions
+    missing inside the stored range are downloaded again once.
+    """
+    stored = bar_store.read_bars(symbol, interval)
+
+    fetch_start = start_date
+    full_range = True
+    if not stored.empty:
+        start = bar_store.align_timestamp(start_date, stored.index)
+        covered = bar_store.covered_from(symbol, interval)
+        covers_start = stored.index[0] <= start + timedelta(days=7) or (
+            covered is not None and bar_store.align_timestamp(covered, stored.index) <= start)
+        if covers_start:
+            full_range = False
+            fetch_start = checked = stored.index[-1]
+            gaps = _unchecked_gaps(symbol, interval, stored, start)
+            if len(gaps):
+                fetch_start = gaps[0]
+            elif _store_is_current(symbol, interval, end_date):
+                return normalize_ohlcv(bar_store.slice_bars(stored, start_date, end_date))
+
+    try:
+        new_data = _yf_download(symbol, start=fetch_start, end=end_date, interval=interval, progress=False)
+        new_data = normalize_ohlcv(new_data)
+        if not new_data.empty:
+            stored = bar_store.append_bars(symbol, interval, new_data)
+            if full_range:
+                bar_store.mark_covered_from(symbol, interval, start_date)
+            else:
+                # The range stored before this download has been checked for gaps
+                bar_store.mark_checked_through(symbol, interval, checked)
+    except Exception as e:
+        print(f"yfinance error for {symbol}: {e}")
+
+    return normalize_ohlcv(bar_store.slice_bars(stored, start_date, end_date))
 
 def get_historical_data(symbol, years=1):
     """
     Fetch historical data for the last year using multiple sources.
+    Daily bars are served from the local bar store and only the missing
+    tail is downloaded.
     """
     ist = pytz.timezone('Asia/Kolkata')
     end_date = datetime.now(ist)
     start_date = end_date - timedelta(days=years*365)
 
-    data = pd.DataFrame()
-
-    # Try yfinance first for all symbols (including Indian markets with .NS symbols)
-    try:
-        data = yf.download(symbol, start=start_date, end=end_date, interval='1d', progress=False)
-    except Exception as e:
-        print(f"yfinance error for {symbol}: {e}")
+    # Try the bar store topped up from yfinance (including Indian markets with .NS symbols)
+    data = fetch_stored_bars(symbol, start_date, end_date, interval='1d')
 
     # Fallback to mock data if all sources fail
     if data.empty:
         print(f"Using mock data for {symbol}")
-        data = generate_mock_data(start_date, end_date, symbol)
+        data = normalize_ohlcv(generate_mock_data(start_date, end_date, symbol))
 
     return data
 
@@ -37,39 +233,14 @@ def get_mock_historical_data(symbol, years=6):
     """
     Generate mock historical data for demonstration.
     """
-    dates = pd.date_range(end=datetime.now(), periods=years*365, freq='D')
-    np.random.seed(42)  # For reproducible mock data
-
-    base_price = {
-        'Sensex': 83754,  # Updated to current market level
-        'BankNifty': 52000,
-        'Nifty50': 24000,
-        'CrudeOil': 85
-    }.get(symbol, 100)
-
-    # Generate realistic price movements
-    price_changes = np.random.normal(0, 0.01, len(dates))  # Small daily changes
-    prices = base_price * (1 + np.cumsum(price_changes))
-
-    data = pd.DataFrame({
-        'Open': prices * (1 + np.random.normal(0, 0.005, len(dates))),
-        'High': prices * (1 + np.random.normal(0.005, 0.01, len(dates))),
-        'Low': prices * (1 - np.random.normal(0.005, 0.01, len(dates))),
-        'Close': prices,
-        'Volume': np.random.randint(100000, 1000000, len(dates))
-    }, index=dates)
-
-    # Ensure High >= Close >= Low >= Open
-    data['High'] = data[['High', 'Close', 'Open']].max(axis=1)
-    data['Low'] = data[['Low', 'Close', 'Open']].min(axis=1)
-
-    return data
-
-
+    end_date = datetime.now(pytz.timezone('Asia/Kolkata'))
+    start_date = end_date - timedelta(days=years*365)
+    return generate_ohlcv(symbol, interval='1d', start=start_date, end=end_date, seed=42, dtype=OHLCV_PRICE_DTYPE)
 
 def get_indian_market_data(index_name, start_date, end_date, intraday=False):
     """
-    Get Indian market data from NSE/BSE APIs or web scraping.
+    Get Indian market data from NSE/BSE APIs or web scraping, normalized
+    to the canonical OHLCV schema (empty when every source fails).
     """
     try:
         # Try NSE India API for historical data
@@ -80,11 +251,8 @@ def get_indian_market_data(index_name, start_date, end_date, intraday=False):
         elif index_name == 'NSEBANK':
             url = f"https://www.nseindia.com/api/historical/indicesHistory?indexType=NIFTY%20BANK&from={start_date.strftime('%d-%m-%Y')}&to={end_date.strftime('%d-%m-%Y')}"
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-
-        response = requests.get(url, headers=headers, timeout=10)
+        # Pooled keep-alive session (browser headers and NSE cookies handled there)
+        response = http_get(url, timeout=10)
         if response.status_code == 200:
             # Parse the response (this would need specific parsing logic for each exchange)
             # For now, return empty to trigger mock data
@@ -102,109 +270,33 @@ def get_indian_market_data(index_name, start_date, end_date, intraday=False):
         }
 
         if index_name in alt_symbols:
-            data = yf.download(alt_symbols[index_name], start=start_date, end=end_date, interval='1d' if not intraday else '5m')
+            data = normalize_ohlcv(_yf_download(alt_symbols[index_name], start=start_date, end=end_date, interval='1d' if not intraday else '5m'))
             if not data.empty:
                 return data
     except:
         pass
 
-    return pd.DataFrame()
+    return normalize_ohlcv(None)
 
 def generate_mock_data(start_date, end_date, symbol, intraday=False):
     """
     Generate realistic mock data for testing when APIs fail.
     """
-    ist = pytz.timezone('Asia/Kolkata')
-
-    if intraday:
-        # Generate intraday data (5-minute intervals during market hours)
-        dates = []
-        current = start_date.replace(hour=9, minute=15, second=0, microsecond=0)
-        market_close = start_date.replace(hour=15, minute=30, second=0, microsecond=0)
-
-        while current <= market_close:
-            if current.weekday() < 5:  # Monday to Friday
-                dates.append(current)
-            current += timedelta(minutes=5)
-
-        if not dates:
-            # If no market hours today, generate some data points
-            dates = pd.date_range(start=start_date, end=end_date, freq='5min')[:50]
-    else:
-        # Generate daily data
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-
-    if len(dates) == 0:
-        return pd.DataFrame()
+    interval = '5m' if intraday else '1d'
+    data = generate_ohlcv(symbol, interval=interval, start=start_date, end=end_date, seed=42, dtype=OHLCV_PRICE_DTYPE)
 
-    np.random.seed(42)  # For reproducible results
-
-    # Base prices for different symbols (updated for current market levels)
-    base_prices = {
-        '^BSESN': 83754,  # Updated Sensex base price to current market level
-        '^NSEI': 25000,   # Updated Nifty50 base price
-        '^NSEBANK': 52000, # Updated BankNifty base price
-        'CL=F': 70,       # Updated Crude Oil base price
-        'NIFTY50.NS': 25000,
-        'SENSEX.NS': 83754,  # Updated Sensex base price to current market level
-        'BANKNIFTY.NS': 52000
-    }
-
-    base_price = base_prices.get(symbol, 100)
-
-    # Generate OHLCV data with realistic volatility and mean reversion
-    n_points = len(dates)
-    prices = []
-    current_price = base_price
-    
-    for i in range(n_points):
-        if intraday:
-            # Smaller movements for intraday data
-            change = np.random.normal(0, base_price * 0.003)  # 0.3% volatility
-            # Strong mean reversion for intraday to keep price near base
-            reversion = (base_price - current_price) * 0.15
-        else:
-            # Larger movements for daily data
-            change = np.random.normal(0, base_price * 0.01)  # 1% daily volatility
-            # Moderate mean reversion for daily data
-            reversion = (base_price - current_price) * 0.05
-        
-        current_price = current_price + change + reversion
-        current_price = max(current_price, base_price * 0.8)  # Floor at 80% of base
-        current_price = min(current_price, base_price * 1.2)  # Cap at 120% of base
-        prices.append(current_price)
-
-    # Create OHLCV data
-    data = []
-    for i, price in enumerate(prices):
-        volatility = abs(np.random.normal(0, price * 0.01))
-        high = price + volatility
-        low = price - volatility
-        open_price = prices[i-1] if i > 0 else price
-        volume = np.random.randint(100000, 10000000)
-
-        data.append({
-            'Open': open_price,
-            'High': high,
-            'Low': low,
-            'Close': price,
-            'Volume': volume
-        })
+    if data.empty and intraday:
+        # No market hours in the window, use the most recent session instead
+        data = generate_ohlcv(symbol, interval=interval, end=end_date, periods=75, seed=42, dtype=OHLCV_PRICE_DTYPE)
 
-    df = pd.DataFrame(data, index=dates)
-    df.index.name = 'Date'
-
-    return df
+    return data
 
 def is_market_open():
     """
-    Check if Indian market is open (9:15 AM to 3:30 PM IST).
+    Check if the Indian market is open, using the exchange calendar
+    (holidays and special sessions included).
     """
-    ist = pytz.timezone('Asia/Kolkata')
-    now = datetime.now(ist)
-    market_open = now.replace(hour=9, minute=15, second=0, microsecond=0)
-    market_close = now.replace(hour=15, minute=30, second=0, microsecond=0)
-    return market_open <= now <= market_close and now.weekday() < 5  # Mon-Fri
+    return market_calendar.is_market_open()
 
 # Symbol mappings - Updated to use reliable Yahoo Finance .NS symbols
 symbols = {
@@ -302,46 +394,9 @@ def get_alpha_vantage_data(symbol, interval='5min', outputsize='compact'):
 def get_mock_data(symbol):
     """
     Generate mock data for demonstration when APIs fail.
+    Unseeded, so every call returns fresh data.
     """
-    dates = pd.date_range(end=datetime.now(), periods=100, freq='5min')
-    
-    # Use a different seed or no seed to get varied data each time
-    # This ensures fresh data that's closer to current market levels
-    
-    base_price = {
-        'Sensex': 83754,  # Updated to current market level
-        'BankNifty': 52000,
-        'Nifty50': 24000,
-        'CrudeOil': 85
-    }.get(symbol, 100)
-
-    # Generate realistic price movements with mean reversion to keep prices near base
-    prices = []
-    current_price = base_price
-    
-    for i in range(len(dates)):
-        # Small random change with mean reversion
-        change = np.random.normal(0, base_price * 0.002)  # Reduced volatility
-        # Mean reversion: pull price back towards base
-        reversion = (base_price - current_price) * 0.1
-        current_price = current_price + change + reversion
-        prices.append(current_price)
-    
-    prices = np.array(prices)
-
-    data = pd.DataFrame({
-        'Open': prices * (1 + np.random.normal(0, 0.0005, len(dates))),
-        'High': prices * (1 + np.random.normal(0.0005, 0.001, len(dates))),
-        'Low': prices * (1 - np.random.normal(0.0005, 0.001, len(dates))),
-        'Close': prices,
-        'Volume': np.random.randint(1000, 100000, len(dates))
-    }, index=dates)
-
-    # Ensure High >= Close >= Low >= Open (basic OHLC integrity)
-    data['High'] = data[['High', 'Close', 'Open']].max(axis=1)
-    data['Low'] = data[['Low', 'Close', 'Open']].min(axis=1)
-
-    return data
+    return generate_ohlcv(symbol, interval='5m', periods=100, dtype=OHLCV_PRICE_DTYPE)
 
 def get_polygon_data(symbol, period='1d', interval='5m'):
     """
@@ -382,7 +437,7 @@ def get_polygon_data(symbol, period='1d', interval='5m'):
                 'Volume': bar.volume
             } for bar in bars])
 
-            data['timestamp'] = pd.to_datetime(data['timestamp'], unit='ms')
+            data['timestamp'] = pd.to_datetime(data['timestamp'], unit='ms', utc=True)
             data.set_index('timestamp', inplace=True)
             return data
 
@@ -402,7 +457,7 @@ def get_fmp_data(symbol, period='1d', interval='5m'):
         fmp_symbol = fmp_symbols.get(symbol, symbol)
         url = f"https://financialmodelingprep.com/api/v3/historical-chart/{interval}/{fmp_symbol}?apikey={FMP_API_KEY}"
 
-        response = requests.get(url)
+        response = http_get(url, timeout=10)
         if response.status_code == 200:
             data = response.json()
             if data:
@@ -425,7 +480,7 @@ def get_twelve_data(symbol, period='1d', interval='5m'):
         return pd.DataFrame()
 
     try:
-        td = TDClient(apikey=TWELVE_DATA_API_KEY)
+        td = TDClient(apikey=TWELVE_DATA_API_KEY, base_url=TWELVE_DATA_BASE_URL)
         twelve_symbol = twelve_symbols.get(symbol, symbol)
 
         # Convert interval to Twelve Data format
@@ -475,48 +530,20 @@ def get_fo_data(symbol='NIFTY', expiry_date=None):
         expiry_str = expiry_date.strftime('%d%b%Y').upper()
 
         # NSE F&O data URL
-        url = f"https://www.nseindia.com/api/option-chain-indices?symbol={symbol}"
+        url = f"{NSE_BASE_URL}/api/option-chain-indices?symbol={symbol}"
 
         headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'application/json, text/plain, */*',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://www.nseindia.com/option-chain'
+            'Referer': f"{NSE_BASE_URL}/option-chain"
         }
 
-        response = requests.get(url, headers=headers, timeout=10)
+        # Reuses the cookie-primed NSE session instead of a fresh connection per poll
+        response = http_get(url, headers=headers, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
 
-            if 'records' in data and 'data' in data['records']:
-                fo_data = []
-
-                for record in data['records']['data']:
-                    # Extract relevant F&O data
-                    fo_record = {
-                        'strikePrice': record.get('strikePrice', 0),
-                        'expiryDate': record.get('expiryDate', ''),
-                        'CE': {
-                            'openInterest': record.get('CE', {}).get('openInterest', 0),
-                            'changeinOpenInterest': record.get('CE', {}).get('changeinOpenInterest', 0),
-                            'totalTradedVolume': record.get('CE', {}).get('totalTradedVolume', 0),
-                            'impliedVolatility': record.get('CE', {}).get('impliedVolatility', 0),
-                            'lastPrice': record.get('CE', {}).get('lastPrice', 0),
-                            'change': record.get('CE', {}).get('change', 0)
-                        },
-                        'PE': {
-                            'openInterest': record.get('PE', {}).get('openInterest', 0),
-                            'changeinOpenInterest': record.get('PE', {}).get('changeinOpenInterest', 0),
-                            'totalTradedVolume': record.get('PE', {}).get('totalTradedVolume', 0),
-                            'impliedVolatility': record.get('PE', {}).get('impliedVolatility', 0),
-                            'lastPrice': record.get('PE', {}).get('lastPrice', 0),
-                            'change': record.get('PE', {}).get('change', 0)
-                        }
-                    }
-                    fo_data.append(fo_record)
-
-                return pd.DataFrame(fo_data)
+            # Flat typed CE_*/PE_* columns, one row per expiry/strike
+            return parse_option_chain(data)
 
     except Exception as e:
         print(f"Failed to fetch F&O data for {symbol}: {e}")
@@ -533,15 +560,24 @@ def auto_update_fo_data(symbols=['NIFTY', 'BANKNIFTY'], update_interval_minutes=
     def update_worker():
         while True:
             try:
+                # Nothing changes while the exchange is shut: sleep until the next session
+                wait = market_calendar.seconds_until_next_session()
+                if wait > 0:
+                    print(f"Market closed, next F&O update at {market_calendar.next_session_open()}")
+                    time.sleep(wait)
+                    continue
+
                 print(f"Updating F&O data at {datetime.now()}")
 
                 for symbol in symbols:
                     fo_data = get_fo_data(symbol)
                     if not fo_data.empty:
-                        # Save to CSV for persistence
-                        filename = f"fo_data_{symbol.lower()}_{datetime.now().strftime('%Y%m%d')}.csv"
-                        fo_data.to_csv(filename, index=False)
-                        print(f"Updated F&O data for {symbol}: {len(fo_data)} records")
+                        # Append to the snapshot store (only rows changed since the last snapshot)
+                        written = option_snapshots.append_snapshot(symbol, fo_data)
+                        print(f"Updated F&O data for {symbol}: {len(fo_data)} records, {written} changed rows stored")
+                        nearest = fo_data['expiry'].iloc[0]
+                        stats = chain_summary(fo_data[fo_data['expiry'] == nearest]).get(nearest, {})
+                        print(f"{symbol} {nearest}: PCR {stats.get('pcr_oi', float('nan')):.2f}, max pain {stats.get('max_pain')}")
 
                 # Wait for next update
                 time.sleep(update_interval_minutes * 60)
@@ -556,18 +592,157 @@ def auto_update_fo_data(symbols=['NIFTY', 'BANKNIFTY'], update_interval_minutes=
 
     print(f"Started auto-update for F&O data (every {update_interval_minutes} minutes)")
 
-def get_realtime_data(symbol, period='1d', interval='5m'):
+def _alpha_vantage_fetch(symbol, period='1d', interval='5m'):
+    """
+    Adapt get_alpha_vantage_data to the (symbol, period, interval) provider signature.
+    """
+    av_interval = {
+        '1m': '1min',
+        '5m': '5min',
+        '15m': '15min',
+        '30m': '30min',
+        '1h': '60min'
+    }.get(interval, '5min')
+    return get_alpha_vantage_data(symbol, interval=av_interval)
+
+# Provider fallback chain: Polygon -> FMP -> Twelve Data -> Alpha Vantage,
+# hedged to the next provider after HEDGE_PERCENTILE of the current one's latency.
+# Providers without an API key are left out so they never touch the quota counters.
+HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', '90'))
+PROVIDER_TIMEOUT = float(os.getenv('PROVIDER_TIMEOUT', '10'))
+_provider_fetcher = HedgedFetcher([
+    (name, fetch_fn) for name, fetch_fn, api_key in [
+        ('polygon', get_polygon_data, POLYGON_API_KEY),
+        ('fmp', get_fmp_data, FMP_API_KEY),
+        ('twelve_data', get_twelve_data, TWELVE_DATA_API_KEY),
+        ('alpha_vantage', _alpha_vantage_fetch, API_KEY)
+    ] if api_key
+], hedge_percentile=HEDGE_PERCENTILE, timeout=PROVIDER_TIMEOUT, limiter=rate_limiter.limiter)
+
+def get_multi_source_data(symbol, period='1d', interval='5m', priority=PRIORITY_INTERACTIVE):
+    """
+    Fetch intraday data from the API providers, returning the first valid
+    frame. symbol is a symbol name such as 'Sensex' (see the *_symbols maps).
+    Providers out of quota for this priority are skipped.
+    """
+    return _provider_fetcher.fetch(symbol, period=period, interval=interval, priority=priority)
+
+# Shared cache for get_realtime_data keyed on (symbol, period, interval)
+REALTIME_CACHE_SIZE = int(os.getenv('REALTIME_CACHE_SIZE', '64'))
+_realtime_cache = TTLCache(max_size=REALTIME_CACHE_SIZE)
+
+def get_realtime_data(symbol, period='1d', interval='5m', priority=PRIORITY_INTERACTIVE):
     """
     Fetch real-time intraday data using multiple sources.
+    Results are cached until the next bar boundary and concurrent requests
+    for the same key share a single download. The returned frame is shared
+    between callers and must not be modified in place. priority selects the
+    rate-limit class for the quota-limited API providers.
+    """
+    key = (symbol, period, interval)
+    return _realtime_cache.get_or_load(
+        key,
+        lambda: _download_realtime_data(symbol, period, interval, priority),
+        seconds_to_next_bar(interval)
+    )
+
+# One incremental resampler per (symbol, base interval, target interval)
+_resamplers = {}
+_resamplers_lock = threading.Lock()
+
+def get_resampled_data(symbol, interval='15m', period='5d', base_interval='5m', priority=PRIORITY_INTERACTIVE):
+    """
+    Bars for a higher timeframe derived locally from the base interval, so
+    15m/1h/daily views share the one cached 5m download instead of each
+    costing a provider request. The last bar is flagged Partial while it
+    is still forming.
+    """
+    base = get_realtime_data(symbol, period=period, interval=base_interval, priority=priority)
+    if base.empty:
+        return base
+
+    key = (symbol, base_interval, interval)
+    with _resamplers_lock:
+        resampler = _resamplers.get(key)
+        if resampler is None:
+            # Clip bars to the NSE close only for symbols that trade on its calendar
+            session_close = SESSION_CLOSE if market_calendar.is_exchange_symbol(symbol) else None
+            resampler = BarResampler(interval, base_interval, session_close=session_close)
+            _resamplers[key] = resampler
+        resampler.update(base)
+        # Keep the resampled history to the base window
+        resampler.discard_before(bucket_starts(base.index[:1], interval)[0])
+        return resampler.bars
+
+def get_realtime_data_batch(tickers, period='1d', interval='5m', priority=PRIORITY_SCHEDULED):
+    """
+    Fetch real-time intraday data for several symbols in one provider call.
+    Returns a dict of ticker -> DataFrame. Goes through the realtime cache
+    like get_realtime_data: cached symbols are not downloaded again, and
+    symbols being downloaded by another caller are waited on rather than
+    fetched twice. Anything the batch download misses is fetched one
+    symbol at a time.
+    """
+    keys = [(ticker, period, interval) for ticker in tickers]
+    loaded = _realtime_cache.get_or_load_many(
+        keys,
+        lambda missing: _download_realtime_batch([key[0] for key in missing], period, interval, priority),
+        seconds_to_next_bar(interval)
+    )
+    frames = {}
+    for key in keys:
+        frame = loaded.get(key)
+        if frame is None:
+            # Another caller's download failed: try on our own
+            frame = get_realtime_data(key[0], period=period, interval=interval, priority=priority)
+        frames[key[0]] = frame
+    return frames
+
+def _download_realtime_batch(tickers, period='1d', interval='5m', priority=PRIORITY_SCHEDULED):
+    """
+    Download several symbols in one yfinance call. Returns a dict keyed
+    like the realtime cache; symbols the batch missed are downloaded one
+    at a time with _download_realtime_data.
+    """
+    frames = {}
+    try:
+        data = _yf_download(tickers, period=period, interval=interval, group_by='ticker', progress=False)
+        if not data.empty:
+            downloaded = data.columns.get_level_values(0)
+            for ticker in tickers:
+                if ticker not in downloaded:
+                    continue
+                # Tickers trade different hours, so drop the rows padded in by the shared index
+                frame = normalize_ohlcv(data[ticker].dropna(how='all'))
+                if not frame.empty:
+                    frame.attrs.update(symbol=ticker, interval=interval)
+                    frames[(ticker, period, interval)] = frame
+    except Exception as e:
+        print(f"yfinance batch error for {tickers}: {e}")
+
+    for ticker in tickers:
+        if (ticker, period, interval) not in frames:
+            frames[(ticker, period, interval)] = _download_realtime_data(ticker, period, interval, priority)
+    return frames
+
+def _download_realtime_data(symbol, period='1d', interval='5m', priority=PRIORITY_INTERACTIVE):
+    """
+    Download intraday data, falling back to mock data. The result is
+    normalized to the canonical OHLCV schema.
     """
     data = pd.DataFrame()
 
     # Try yfinance first for all symbols (including Indian markets with .NS symbols)
     try:
-        data = yf.download(symbol, period=period, interval=interval, progress=False)
+        data = _yf_download(symbol, period=period, interval=interval, progress=False)
     except Exception as e:
         print(f"yfinance error for {symbol}: {e}")
 
+    # Then the API providers, which are keyed by symbol name
+    if data.empty:
+        symbol_name = next((name for name, ticker in symbols.items() if ticker == symbol), symbol)
+        data = get_multi_source_data(symbol_name, period=period, interval=interval, priority=priority)
+
     # Fallback to mock data
     if data.empty:
         print(f"Using mock data for {symbol}")
@@ -576,4 +751,7 @@ def get_realtime_data(symbol, period='1d', interval='5m'):
         start_date = end_date - timedelta(days=1)
         data = generate_mock_data(start_date, end_date, symbol, intraday=True)
 
+    data = normalize_ohlcv(data)
+    # Identifies the bars in indicator_cache fingerprints
+    data.attrs.update(symbol=symbol, interval=interval)
     return data
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Bar length in seconds for the interval strings used across data_fetcher
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '2m': 120,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '60m': 3600,
+    '90m': 5400,
+    '1h': 3600,
+    '1d': 86400,
+    '5d': 5 * 86400,
+    '1wk': 7 * 86400,
+}
+
+def seconds_to_next_bar(interval, now=None, min_ttl=1.0):
+    """
+    Seconds until the next bar boundary for the given interval, so cached
+    data expires exactly when a new bar can appear.
+    """
+    step = INTERVAL_SECONDS.get(interval, 300)
+    now = time.time() if now is None else now
+    return max(step - (now % step), min_ttl)
+
+class _Flight:
+    """
+    One in-flight load that concurrent callers for the same key wait on.
+    """
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry and single-flight loading:
+    concurrent misses for the same key share one call to the loader.
+    """
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl):
+        """
+        Store a value that expires after ttl seconds.
+        """
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key, value, ttl):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader, ttl):
+        """
+        Return the cached value for key, calling loader() on a miss. Only one
+        caller runs the loader per key; the others block until it finishes
+        and receive the same result (or exception).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                return entry[1]
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._in_flight[key] = flight
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                del self._in_flight[key]
+            flight.event.set()
+            raise
+
+        with self._lock:
+            self._store(key, value, ttl)
+            del self._in_flight[key]
+        flight.value = value
+        flight.event.set()
+        return value
+
+    def get_or_load_many(self, keys, loader, ttl):
+        """
+        get_or_load for several keys with a single loader call, for
+        providers that download many symbols in one request. loader(missing)
+        receives the keys this caller has to load and returns a dict of
+        key -> value; keys it leaves out are not cached and come back as
+        None, while get_or_load calls waiting on them raise KeyError. Keys
+        another caller is already loading are waited on, and while the
+        loader runs concurrent get_or_load calls for any of its keys wait
+        for it instead of loading again. Returns a dict.
+        """
+        results, led, waiting = {}, {}, {}
+        with self._lock:
+            now = time.time()
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    results[key] = entry[1]
+                elif key in self._in_flight:
+                    waiting[key] = self._in_flight[key]
+                elif key not in led:
+                    led[key] = self._in_flight[key] = _Flight()
+
+        if led:
+            try:
+                values = loader(list(led))
+            except Exception as e:
+                with self._lock:
+                    for key, flight in led.items():
+                        flight.error = e
+                        del self._in_flight[key]
+                for flight in led.values():
+                    flight.event.set()
+                raise
+            with self._lock:
+                for key in led:
+                    if values.get(key) is not None:
+                        self._store(key, values[key], ttl)
+                    del self._in_flight[key]
+            for key, flight in led.items():
+                flight.value = results[key] = values.get(key)
+                if flight.value is None:
+                    flight.error = KeyError(key)
+                flight.event.set()
+
+        for key, flight in waiting.items():
+            flight.event.wait()
+            results[key] = flight.value if flight.error is None else None
+        return results
+
+    def invalidate(self, key=None):
+        """
+        Drop one key, or everything when key is None.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
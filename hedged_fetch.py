@@ -0,0 +1,106 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pandas as pd
+from rate_limiter import PRIORITY_INTERACTIVE
+
+def is_valid_frame(data):
+    """
+    A provider result is usable if it is a non-empty OHLCV frame.
+    """
+    return isinstance(data, pd.DataFrame) and not data.empty and 'Close' in data.columns
+
+class HedgedFetcher:
+    """
+    Fetch from a priority-ordered list of providers with hedged requests.
+
+    The primary provider is called first. If it has not answered after its
+    hedge delay (a percentile of its recent latencies) the next provider is
+    fired as well, and so on. A provider that fails or returns nothing
+    triggers the next one immediately. The first valid frame wins and
+    requests that have not started yet are cancelled; calls already running
+    cannot be interrupted, so they finish in the background and their
+    results are only used to update the latency history.
+
+    With a rate limiter, a provider without a free request slot counts as
+    failed, so the request routes straight to the next provider.
+    """
+    def __init__(self, providers, hedge_percentile=90, default_hedge_delay=1.5,
+                 timeout=10.0, max_workers=8, history=50, min_samples=5, limiter=None):
+        self.providers = list(providers)  # [(name, fetch_fn), ...]
+        self.limiter = limiter
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.timeout = timeout
+        self.min_samples = min_samples
+        self._latencies = {name: deque(maxlen=history) for name, _ in self.providers}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedged-fetch')
+
+    def hedge_delay(self, name):
+        """
+        Seconds to wait on a provider before hedging to the next one.
+        """
+        samples = self._latencies.get(name)
+        if not samples or len(samples) < self.min_samples:
+            return self.default_hedge_delay
+        return float(np.percentile(samples, self.hedge_percentile))
+
+    def _timed_call(self, name, fetch_fn, args, kwargs, priority, deadline):
+        # A slot granted after the fetch timed out would spend quota for nothing
+        if self.limiter is not None and not self.limiter.acquire(name, priority, deadline=deadline):
+            return pd.DataFrame()
+        start = time.monotonic()
+        result = fetch_fn(*args, **kwargs)
+        if is_valid_frame(result):
+            self._latencies[name].append(time.monotonic() - start)
+        return result
+
+    def fetch(self, *args, priority=PRIORITY_INTERACTIVE, **kwargs):
+        """
+        Call the providers with the given arguments and return the first
+        valid frame, or an empty DataFrame if none produced one in time.
+        priority is passed to the rate limiter.
+        """
+        deadline = time.monotonic() + self.timeout
+        pending = {}
+        next_provider = 0
+        hedge_at = 0.0
+
+        while True:
+            now = time.monotonic()
+            # Fire the next provider when nothing is running or the hedge timer expired
+            if next_provider < len(self.providers) and (not pending or now >= hedge_at):
+                name, fetch_fn = self.providers[next_provider]
+                next_provider += 1
+                future = self._executor.submit(self._timed_call, name, fetch_fn, args, kwargs, priority, deadline)
+                pending[future] = name
+                hedge_at = now + self.hedge_delay(name)
+
+            if not pending or now >= deadline:
+                break
+
+            wait_until = deadline
+            if next_provider < len(self.providers):
+                wait_until = min(wait_until, hedge_at)
+            done, _ = wait(pending, timeout=max(wait_until - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"{name} error: {e}")
+                    continue
+                if is_valid_frame(result):
+                    for other in pending:
+                        other.cancel()
+                    return result
+
+            # A failed provider should not hold up the next one
+            if done:
+                hedge_at = time.monotonic()
+
+        for other in pending:
+            other.cancel()
+        return pd.DataFrame()
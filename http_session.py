@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Default headers for every pooled session (NSE rejects non-browser clients)
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive'
+}
+
+# NSE (or the local market simulator standing in for it)
+NSE_BASE_URL = os.getenv('NSE_BASE_URL') or os.getenv('MARKET_SIMULATOR_URL') or 'https://www.nseindia.com'
+NSE_HOST = urlsplit(NSE_BASE_URL).netloc
+NSE_HOME_URL = f"{NSE_BASE_URL}/option-chain"
+NSE_COOKIE_TTL = int(os.getenv('NSE_COOKIE_TTL', '300'))  # Re-prime cookies after this many seconds
+NSE_PRIME_RETRY = int(os.getenv('NSE_PRIME_RETRY', '60'))  # Wait this long to prime again when NSE set no cookies
+
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '3'))
+HTTP_BACKOFF = float(os.getenv('HTTP_BACKOFF', '0.5'))
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_nse_lock = threading.Lock()
+_nse_primed_at = 0.0
+_nse_retry_at = 0.0
+
+def _new_session():
+    """
+    Session with a keep-alive connection pool and retry/backoff on
+    throttling and transient server errors.
+    """
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(BROWSER_HEADERS)
+    return session
+
+def get_session(url):
+    """
+    Return the pooled session for the URL's host, creating it on first use.
+    """
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _new_session()
+            _sessions[host] = session
+        return session
+
+def _nse_cookies_valid(session):
+    """
+    NSE cookies are usable if present, not past their own expiry and
+    younger than NSE_COOKIE_TTL. Sessions are per host, so every cookie in
+    the jar is an NSE cookie.
+    """
+    cookies = list(session.cookies)
+    if not cookies:
+        return False
+    now = time.time()
+    if any(c.expires is not None and c.expires <= now for c in cookies):
+        return False
+    return now - _nse_primed_at < NSE_COOKIE_TTL
+
+def _prime_nse_cookies(session, force=False):
+    """
+    Visit the NSE site once so the API calls carry its session cookies.
+    When the visit sets no cookies, requests go out without them until
+    NSE_PRIME_RETRY has passed instead of priming again every time.
+    """
+    global _nse_primed_at, _nse_retry_at
+    with _nse_lock:
+        if not force and _nse_cookies_valid(session):
+            return
+        if not list(session.cookies) and time.time() < _nse_retry_at:
+            return
+        session.get(NSE_HOME_URL, timeout=10)
+        _nse_primed_at = time.time()
+        _nse_retry_at = _nse_primed_at + NSE_PRIME_RETRY if not list(session.cookies) else 0.0
+
+def http_get(url, headers=None, timeout=10, **kwargs):
+    """
+    GET through the pooled session for the URL's host. NSE requests are
+    cookie-primed first and retried once with fresh cookies on 401/403.
+    """
+    session = get_session(url)
+    if urlsplit(url).netloc != NSE_HOST:
+        return session.get(url, headers=headers, timeout=timeout, **kwargs)
+
+    _prime_nse_cookies(session)
+    response = session.get(url, headers=headers, timeout=timeout, **kwargs)
+    if response.status_code in (401, 403):
+        _prime_nse_cookies(session, force=True)
+        response = session.get(url, headers=headers, timeout=timeout, **kwargs)
+    return response
@@ -0,0 +1,66 @@
+import functools
+import hashlib
+import os
+import pandas as pd
+from fetch_cache import TTLCache
+
+# Entries kept (least recently used evicted first) and how many trailing
+# rows go into a frame's fingerprint
+INDICATOR_CACHE_SIZE = int(os.getenv('INDICATOR_CACHE_SIZE', '256'))
+FINGERPRINT_TAIL_ROWS = int(os.getenv('FINGERPRINT_TAIL_ROWS', '5'))
+
+_cache = TTLCache(max_size=INDICATOR_CACHE_SIZE)
+
+def frame_fingerprint(data, tail=FINGERPRINT_TAIL_ROWS):
+    """
+    Cheap identity of a bar frame: symbol/interval (from data.attrs, when
+    set), length, first and last timestamp, columns and a hash of the last
+    few rows. A new bar or a revised forming bar changes it; the cost does
+    not grow with the frame.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if len(data):
+        rows = data.iloc[-tail:]
+        values = rows.to_numpy()
+        if values.dtype == object or not isinstance(rows.index, pd.DatetimeIndex):
+            digest.update(pd.util.hash_pandas_object(rows, index=True).values.tobytes())
+        else:
+            digest.update(values.tobytes())
+            digest.update(rows.index.as_unit('ns').asi8.tobytes())
+    first = data.index[0] if len(data) else None
+    last = data.index[-1] if len(data) else None
+    return (data.attrs.get('symbol'), data.attrs.get('interval'), len(data), str(first), str(last),
+            tuple(map(str, data.columns)), digest.hexdigest())
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+def memoize_indicator(func):
+    """
+    Cache func(data, *args, **kwargs) by the frame's fingerprint plus the
+    function and its parameters. Cached results are shared between callers,
+    so treat them as read-only.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(data, *args, **kwargs):
+        try:
+            key = (name, frame_fingerprint(data), _hashable(args), _hashable(kwargs))
+            hash(key)
+        except (TypeError, AttributeError):
+            return func(data, *args, **kwargs)
+        return _cache.get_or_load(key, lambda: func(data, *args, **kwargs), float('inf'))
+
+    wrapper.uncached = func
+    return wrapper
+
+def clear_indicator_cache():
+    """
+    Drop every cached indicator result.
+    """
+    _cache.invalidate()
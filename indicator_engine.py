@@ -0,0 +1,289 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+from indicator_cache import memoize_indicator
+
+# Indicator name -> (engine method, keyword arguments). Defaults match the
+# ta library's defaults, which analyze_symbol used.
+INDICATORS = {
+    'rsi': ('rsi', {'window': 14}),
+    'macd': ('macd', {'fast': 12, 'slow': 26}),
+    'macd_signal': ('macd_signal', {'fast': 12, 'slow': 26, 'signal': 9}),
+    'macd_diff': ('macd_diff', {'fast': 12, 'slow': 26, 'signal': 9}),
+    'bb_upper': ('bb_upper', {'window': 20, 'window_dev': 2}),
+    'bb_middle': ('sma', {'window': 20}),
+    'bb_lower': ('bb_lower', {'window': 20, 'window_dev': 2}),
+    'sma_20': ('sma', {'window': 20}),
+    'sma_50': ('sma', {'window': 50}),
+    'ema_20': ('ema', {'window': 20}),
+    'stoch_k': ('stoch_k', {'window': 14}),
+    'stoch_d': ('stoch_d', {'window': 14, 'smooth_window': 3}),
+    'williams_r': ('williams_r', {'lbp': 14}),
+    'adx': ('adx', {'window': 14}),
+    'cci': ('cci', {'window': 20, 'constant': 0.015}),
+    'mfi': ('mfi', {'window': 14}),
+    'roc': ('roc', {'window': 12}),
+    'atr': ('atr', {'window': 14}),
+}
+
+def _as_2d(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+def _shift(values, periods=1):
+    shifted = np.full(values.shape, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+def _rolling(values, window, reduce):
+    """
+    Rolling reduction over full windows (NaN until window rows are seen or
+    when a window contains NaN, like pandas with min_periods=window).
+    """
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = reduce(sliding_window_view(values, window, axis=0), axis=-1)
+    return out
+
+def _ewm(values, alpha, min_periods=0):
+    """
+    pandas ewm(alpha, adjust=False, min_periods).mean() column-wise. Blocks
+    that are NaN-free after a common leading run go through a single IIR
+    filter; anything else is handed to pandas, which knows how to weight
+    interior gaps.
+    """
+    valid = ~np.isnan(values)
+    start = int(np.argmax(valid.any(axis=1))) if valid.any() else len(values)
+    if start < len(values) and valid[start:].all():
+        out = np.full(values.shape, np.nan)
+        body = values[start:]
+        out[start] = body[0]
+        if len(body) > 1:
+            out[start + 1:], _ = lfilter([alpha], [1.0, alpha - 1.0], body[1:], axis=0, zi=(1 - alpha) * body[:1])
+        out[:start + max(min_periods, 1) - 1] = np.nan
+        return out
+    return pd.DataFrame(values).ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy()
+
+def _wilder(seed, values, window):
+    """
+    Wilder's recurrence s[i] = (s[i-1] * (window - 1) + x[i]) / window started
+    from seed. It is an EMA with alpha 1/window over [seed, x...].
+    """
+    return _ewm(np.vstack([seed[None, :], values]), 1.0 / window)
+
+class IndicatorEngine:
+    """
+    Computes a set of indicators over one OHLCV frame, building each shared
+    intermediate (close diff, true range, rolling highs/lows, moving
+    averages, EMA chains) once as a NumPy array. Intermediates are memoized
+    by name and parameters, so requesting e.g. stochastics, Williams %R and
+    Bollinger Bands together reuses the same rolling windows. Outputs match
+    the ta library. Columns may be Series or, for several symbols at once,
+    DataFrames with one column per symbol.
+    """
+    def __init__(self, data):
+        self.data = data
+        self._template = data['Close']
+        self._memo = {}
+
+    def _cached(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def wrap(self, values):
+        """
+        Give an (n, k) result array the index/columns of the input.
+        """
+        if isinstance(self._template, pd.DataFrame):
+            return pd.DataFrame(values, index=self._template.index, columns=self._template.columns)
+        return pd.Series(values[:, 0], index=self._template.index)
+
+    # Shared intermediates
+    def column(self, name):
+        return self._cached(('column', name), lambda: _as_2d(self.data[name]))
+
+    def close(self):
+        return self.column('Close')
+
+    def prev_close(self):
+        return self._cached('prev_close', lambda: _shift(self.close()))
+
+    def close_diff(self):
+        return self._cached('close_diff', lambda: self.close() - self.prev_close())
+
+    def typical_price(self):
+        return self._cached('typical_price', lambda: (self.column('High') + self.column('Low') + self.close()) / 3.0)
+
+    def true_range(self):
+        # fmax/fmin ignore the missing previous close, giving high - low on the first bar
+        return self._cached('true_range', lambda: np.fmax(self.column('High'), self.prev_close())
+                            - np.fmin(self.column('Low'), self.prev_close()))
+
+    def rolling_max(self, name, window):
+        return self._cached(('max', name, window), lambda: _rolling(self.column(name), window, np.max))
+
+    def rolling_min(self, name, window):
+        return self._cached(('min', name, window), lambda: _rolling(self.column(name), window, np.min))
+
+    def sma(self, window):
+        return self._cached(('sma', window), lambda: _rolling(self.close(), window, np.mean))
+
+    def rolling_std(self, window):
+        return self._cached(('std', window), lambda: _rolling(self.close(), window, np.std))
+
+    def ema(self, window):
+        return self._cached(('ema', window), lambda: _ewm(self.close(), 2.0 / (window + 1), window))
+
+    # Indicators
+    def rsi(self, window=14):
+        def compute():
+            diff = self.close_diff()
+            up = _ewm(np.where(diff > 0, diff, 0.0), 1.0 / window, window)
+            down = _ewm(np.where(diff < 0, -diff, 0.0), 1.0 / window, window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(down == 0, 100, 100 - (100 / (1 + up / down)))
+        return self._cached(('rsi', window), compute)
+
+    def macd(self, fast=12, slow=26):
+        return self._cached(('macd', fast, slow), lambda: self.ema(fast) - self.ema(slow))
+
+    def macd_signal(self, fast=12, slow=26, signal=9):
+        return self._cached(('macd_signal', fast, slow, signal),
+                            lambda: _ewm(self.macd(fast, slow), 2.0 / (signal + 1), signal))
+
+    def macd_diff(self, fast=12, slow=26, signal=9):
+        return self.macd(fast, slow) - self.macd_signal(fast, slow, signal)
+
+    def bb_upper(self, window=20, window_dev=2):
+        return self.sma(window) + window_dev * self.rolling_std(window)
+
+    def bb_lower(self, window=20, window_dev=2):
+        return self.sma(window) - window_dev * self.rolling_std(window)
+
+    def stoch_k(self, window=14):
+        def compute():
+            low = self.rolling_min('Low', window)
+            return 100 * (self.close() - low) / (self.rolling_max('High', window) - low)
+        return self._cached(('stoch_k', window), compute)
+
+    def stoch_d(self, window=14, smooth_window=3):
+        return _rolling(self.stoch_k(window), smooth_window, np.mean)
+
+    def williams_r(self, lbp=14):
+        high = self.rolling_max('High', lbp)
+        return -100 * (high - self.close()) / (high - self.rolling_min('Low', lbp))
+
+    def roc(self, window=12):
+        shifted = _shift(self.close(), window)
+        return ((self.close() - shifted) / shifted) * 100
+
+    def cci(self, window=20, constant=0.015):
+        def compute():
+            tp = self.typical_price()
+            mad = np.full(tp.shape, np.nan)
+            if len(tp) >= window:
+                windows = sliding_window_view(tp, window, axis=0)  # (n - window + 1, k, window)
+                mad[window - 1:] = np.abs(windows - windows.mean(axis=-1, keepdims=True)).mean(axis=-1)
+            return (tp - _rolling(tp, window, np.mean)) / (constant * mad)
+        return self._cached(('cci', window, constant), compute)
+
+    def mfi(self, window=14):
+        def compute():
+            tp = self.typical_price()
+            prev = _shift(tp)
+            direction = np.where(tp > prev, 1, np.where(tp < prev, -1, 0))
+            flow = tp * self.column('Volume') * direction
+            positive = _rolling(np.where(flow >= 0.0, flow, 0.0), window, np.sum)
+            negative = _rolling(np.where(flow < 0.0, -flow, 0.0), window, np.sum)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return 100 - (100 / (1 + positive / negative))
+        return self._cached(('mfi', window), compute)
+
+    def atr(self, window=14):
+        def compute():
+            tr = self.true_range()
+            atr = np.zeros(tr.shape)
+            if len(tr) >= window:
+                atr[window - 1:] = _wilder(tr[:window].mean(axis=0), tr[window:], window)
+            return atr
+        return self._cached(('atr', window), compute)
+
+    def _directional_index(self, window):
+        """
+        DX series as ta's ADXIndicator builds it: Wilder sums of true range
+        and directional movement seeded at bar window, with the last sum
+        left at zero.
+        """
+        def compute():
+            high, low = self.column('High'), self.column('Low')
+            up = high - _shift(high)
+            down = _shift(low) - low
+            pos = np.where((up > down) & (up > 0), up, 0.0)
+            neg = np.where((down > up) & (down > 0), down, 0.0)
+
+            m = len(high) - (window - 1)
+            sums = []
+            for movement in (self.true_range(), pos, neg):
+                smoothed = np.zeros((m, movement.shape[1]))
+                seed = movement[1:window + 1].sum(axis=0) / window
+                smoothed[:m - 1] = _wilder(seed, movement[window + 1:window + m - 1], window)
+                sums.append(smoothed)
+            trs, dip, din = sums
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                di_pos = np.where(trs != 0, 100 * dip / trs, 0.0)
+                di_neg = np.where(trs != 0, 100 * din / trs, 0.0)
+                total = di_pos + di_neg
+                return np.where(total != 0, 100 * np.abs((di_pos - di_neg) / total), 0.0)
+        return self._cached(('dx', window), compute)
+
+    def adx(self, window=14):
+        def compute():
+            close = self.close()
+            adx = np.zeros(close.shape)
+            if len(close) >= 2 * window:
+                dx = self._directional_index(window)
+                adx[2 * window - 1:] = _wilder(dx[:window].mean(axis=0), dx[window:-1], window)
+            return adx
+        return self._cached(('adx', window), compute)
+
+    def compute(self, names=None):
+        """
+        Compute the requested indicators (default: all of INDICATORS) and
+        return them as a dict of name -> Series (DataFrame for multi-symbol
+        input).
+        """
+        results = {}
+        for name in (names or INDICATORS):
+            method, kwargs = INDICATORS[name]
+            results[name] = self.wrap(getattr(self, method)(**kwargs))
+        return results
+
+    def latest(self, names=None):
+        """
+        Last value of each requested indicator, skipping the pandas wrapping
+        (single-symbol input).
+        """
+        values = {}
+        for name in (names or INDICATORS):
+            method, kwargs = INDICATORS[name]
+            values[name] = float(getattr(self, method)(**kwargs)[-1, 0])
+        return values
+
+@memoize_indicator
+def compute_indicators(data, names=None):
+    """
+    Compute several indicators over one OHLCV frame with shared intermediates.
+    Results are memoized per bar set (see indicator_cache).
+    """
+    return IndicatorEngine(data).compute(names)
+
+@memoize_indicator
+def latest_indicators(data, names=None):
+    """
+    Last value of each indicator for one symbol, memoized per bar set.
+    """
+    return IndicatorEngine(data).latest(names)
@@ -1,8 +1,8 @@
 import pandas as pd
-import numpy as np
 import ta
-from math import isnan
+from indicator_cache import memoize_indicator
 
+@memoize_indicator
 def macd_indicator(data, fast=12, slow=26, signal=9):
     """
     Calculate MACD indicator.
@@ -11,12 +11,13 @@ def macd_indicator(data, fast=12, slow=26, signal=9):
     if data.empty:
         return pd.Series(), pd.Series(), pd.Series()
 
-    macd_obj = ta.trend.MACD(data['Close'].squeeze(), window_fast=fast, window_slow=slow, window_sign=signal)
+    macd_obj = ta.trend.MACD(data['Close'], window_fast=fast, window_slow=slow, window_sign=signal)
     macd_line = macd_obj.macd()
     signal_line = macd_obj.macd_signal()
     histogram = macd_obj.macd_diff()
     return macd_line, signal_line, histogram
 
+@memoize_indicator
 def stochastic_oscillator(data, k_period=14, d_period=3):
     """
     Calculate Stochastic Oscillator.
@@ -25,10 +26,12 @@ def stochastic_oscillator(data, k_period=14, d_period=3):
     if data.empty:
         return pd.Series(), pd.Series()
 
-    k = ta.momentum.StochasticOscillator(data['High'].squeeze(), data['Low'].squeeze(), data['Close'].squeeze(), window=k_period, smooth_window=d_period).stoch()
-    d = ta.momentum.StochasticOscillator(data['High'].squeeze(), data['Low'].squeeze(), data['Close'].squeeze(), window=k_period, smooth_window=d_period).stoch_signal()
+    stoch = ta.momentum.StochasticOscillator(data['High'], data['Low'], data['Close'], window=k_period, smooth_window=d_period)
+    k = stoch.stoch()
+    d = stoch.stoch_signal()
     return k, d
 
+@memoize_indicator
 def on_balance_volume(data):
     """
     Calculate On-Balance Volume (OBV).
@@ -36,9 +39,10 @@ def on_balance_volume(data):
     if data.empty:
         return pd.Series()
 
-    obv = ta.volume.OnBalanceVolumeIndicator(data['Close'].squeeze(), data['Volume'].squeeze()).on_balance_volume()
+    obv = ta.volume.OnBalanceVolumeIndicator(data['Close'], data['Volume']).on_balance_volume()
     return obv
 
+@memoize_indicator
 def bollinger_bands(data, period=20, std_dev=2):
     """
     Calculate Bollinger Bands.
@@ -47,12 +51,13 @@ def bollinger_bands(data, period=20, std_dev=2):
     if data.empty:
         return pd.Series(), pd.Series(), pd.Series()
 
-    bb = ta.volatility.BollingerBands(data['Close'].squeeze(), window=period, window_dev=std_dev)
+    bb = ta.volatility.BollingerBands(data['Close'], window=period, window_dev=std_dev)
     upper = bb.bollinger_hband()
     middle = bb.bollinger_mavg()
     lower = bb.bollinger_lband()
     return upper, middle, lower
 
+@memoize_indicator
 def rsi_indicator(data, period=14):
     """
     Calculate RSI (Relative Strength Index).
@@ -61,13 +66,20 @@ def rsi_indicator(data, period=14):
     if data.empty:
         return pd.Series()
 
-    rsi = ta.momentum.RSIIndicator(data['Close'].squeeze(), window=period).rsi()
+    rsi = ta.momentum.RSIIndicator(data['Close'], window=period).rsi()
     return rsi
 
+@memoize_indicator
 def range_filter(data, period=20, multiplier=1.6):
     """
     Calculate Range Filter for buy/sell signals.
     Returns: range_filter, trend
+
+    The trend turns 1 when the close breaks above the previous close plus
+    the filter, -1 when it breaks below the previous close minus it, and
+    holds otherwise. It is computed as breakout events forward-filled, so
+    data may also be a multi-symbol frame whose 'High'/'Low'/'Close' are
+    DataFrames (one column per symbol); both outputs then have that shape.
     """
     if data.empty:
         return pd.Series(), pd.Series()
@@ -77,44 +89,26 @@ def range_filter(data, period=20, multiplier=1.6):
     range_ma = high_low_range.rolling(period).mean()
     range_filter = range_ma * multiplier
 
-    # Calculate trend
-    trend = pd.Series(index=data.index, dtype=float)
-    trend.iloc[0] = 0
-    for i in range(1, len(data)):
-        rf_val_raw = range_filter.iloc[i]
-        if isinstance(rf_val_raw, pd.Series):
-            rf_val = float(rf_val_raw.iloc[0]) if not rf_val_raw.empty and pd.notna(rf_val_raw.iloc[0]) else np.nan
-        else:
-            rf_val = float(rf_val_raw) if pd.notna(rf_val_raw) else np.nan
-
-        close_val_raw = data['Close'].iloc[i]
-        if isinstance(close_val_raw, pd.Series):
-            close_val = float(close_val_raw.iloc[0]) if not close_val_raw.empty and pd.notna(close_val_raw.iloc[0]) else np.nan
-        else:
-            close_val = float(close_val_raw) if pd.notna(close_val_raw) else np.nan
-
-        prev_close_val_raw = data['Close'].iloc[i-1]
-        if isinstance(prev_close_val_raw, pd.Series):
-            prev_close_val = float(prev_close_val_raw.iloc[0]) if not prev_close_val_raw.empty and pd.notna(prev_close_val_raw.iloc[0]) else np.nan
-        else:
-            prev_close_val = float(prev_close_val_raw) if pd.notna(prev_close_val_raw) else np.nan
-
-        if isnan(rf_val) or isnan(close_val) or isnan(prev_close_val):
-            trend.iloc[i] = trend.iloc[i-1]
-        elif close_val > prev_close_val + rf_val:
-            trend.iloc[i] = 1  # Uptrend
-        elif close_val < prev_close_val - rf_val:
-            trend.iloc[i] = -1  # Downtrend
-        else:
-            trend.iloc[i] = trend.iloc[i-1]  # Continue trend
+    # Calculate trend: breakout events, held until the next opposite one
+    close = data['Close']
+    prev_close = close.shift(1)
+    up = close > prev_close + range_filter
+    down = close < prev_close - range_filter
+    events = up.astype(float) - down.astype(float)
+    trend = events.where(up | down).ffill().fillna(0.0)
 
     return range_filter, trend
 
 def get_indicator_signals(data):
     """
     Get buy/sell signals from all indicators.
-    Returns a dictionary with signals.
+    Returns a dictionary with signals (a copy of the cached one, so callers
+    may modify it).
     """
+    return dict(_indicator_signals(data))
+
+@memoize_indicator
+def _indicator_signals(data):
     signals = {}
 
     # MACD
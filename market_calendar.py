@@ -0,0 +1,237 @@
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+import pytz
+from fetch_cache import INTERVAL_SECONDS
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# Regular NSE session (09:15 to 15:30 IST)
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=15)
+SESSION_CLOSE = pd.Timedelta(hours=15, minutes=30)
+
+# NSE equity/F&O trading holidays from the exchange circulars. Years not
+# listed here are treated as weekdays-only; add new years to this table or
+# to the MARKET_HOLIDAYS_FILE JSON.
+NSE_HOLIDAYS = {
+    '2025-02-26': 'Mahashivratri',
+    '2025-03-14': 'Holi',
+    '2025-03-31': 'Id-Ul-Fitr (Ramadan Eid)',
+    '2025-04-10': 'Shri Mahavir Jayanti',
+    '2025-04-14': 'Dr. Baba Saheb Ambedkar Jayanti',
+    '2025-04-18': 'Good Friday',
+    '2025-05-01': 'Maharashtra Day',
+    '2025-08-15': 'Independence Day',
+    '2025-08-27': 'Ganesh Chaturthi',
+    '2025-10-02': 'Mahatma Gandhi Jayanti / Dussehra',
+    '2025-10-21': 'Diwali Laxmi Pujan',
+    '2025-10-22': 'Diwali Balipratipada',
+    '2025-11-05': 'Prakash Gurpurb Sri Guru Nanak Dev',
+    '2025-12-25': 'Christmas',
+    '2026-01-15': 'Municipal Corporation Elections (Maharashtra)',
+    '2026-01-26': 'Republic Day',
+    '2026-03-03': 'Holi',
+    '2026-03-26': 'Shri Ram Navami',
+    '2026-03-31': 'Shri Mahavir Jayanti',
+    '2026-04-03': 'Good Friday',
+    '2026-04-14': 'Dr. Baba Saheb Ambedkar Jayanti',
+    '2026-05-01': 'Maharashtra Day',
+    '2026-05-28': 'Bakri Id',
+    '2026-06-26': 'Muharram',
+    '2026-09-14': 'Ganesh Chaturthi',
+    '2026-10-02': 'Mahatma Gandhi Jayanti',
+    '2026-10-20': 'Dussehra',
+    '2026-11-10': 'Diwali Balipratipada',
+    '2026-11-24': 'Prakash Gurpurb Sri Guru Nanak Dev',
+    '2026-12-25': 'Christmas',
+}
+
+# Special sessions (e.g. Muhurat trading) as date -> (open, close) IST.
+# These replace the regular session, even on a holiday or weekend.
+SPECIAL_SESSIONS = {
+    '2025-10-21': ('13:45', '14:45'),  # Muhurat trading
+}
+
+# Optional JSON file extending the tables:
+# {"holidays": {"2027-01-26": "Republic Day"}, "special_sessions": {"2026-11-08": ["18:00", "19:00"]}}
+MARKET_HOLIDAYS_FILE = os.getenv('MARKET_HOLIDAYS_FILE')
+
+def _load_holiday_file(path):
+    try:
+        with open(path) as f:
+            extra = json.load(f)
+        NSE_HOLIDAYS.update(extra.get('holidays', {}))
+        SPECIAL_SESSIONS.update({day: tuple(times) for day, times in extra.get('special_sessions', {}).items()})
+    except (OSError, ValueError) as e:
+        print(f"Could not load market holidays from {path}: {e}")
+
+if MARKET_HOLIDAYS_FILE:
+    _load_holiday_file(MARKET_HOLIDAYS_FILE)
+
+def to_ist(ts):
+    """
+    Timestamp in IST; naive values are taken to be IST already.
+    """
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        return ts.tz_localize(IST)
+    return ts.tz_convert(IST)
+
+def _now(now=None):
+    return to_ist(now if now is not None else datetime.now(IST))
+
+def is_intraday(interval):
+    return INTERVAL_SECONDS.get(interval, 300) < 86400
+
+@lru_cache(maxsize=None)
+def _year_sessions(year):
+    """
+    (opens, closes) of every session in a year as IST DatetimeIndexes.
+    """
+    days = pd.bdate_range(f"{year}-01-01", f"{year}-12-31")
+    holidays = pd.DatetimeIndex([d for d in NSE_HOLIDAYS if d.startswith(str(year))])
+    specials = {pd.Timestamp(d): t for d, t in SPECIAL_SESSIONS.items() if d.startswith(str(year))}
+    days = days[~days.isin(holidays) & ~days.isin(list(specials))]
+
+    opens = days + SESSION_OPEN
+    closes = days + SESSION_CLOSE
+    if specials:
+        special_days = pd.DatetimeIndex(list(specials))
+        opens = opens.append(special_days + pd.to_timedelta([f"{o}:00" for o, _ in specials.values()]))
+        closes = closes.append(special_days + pd.to_timedelta([f"{c}:00" for _, c in specials.values()]))
+        order = np.argsort(opens.values)
+        opens, closes = opens[order], closes[order]
+    return opens.tz_localize(IST), closes.tz_localize(IST)
+
+@lru_cache(maxsize=64)
+def _year_index(interval, year):
+    """
+    Precomputed bar-open timestamps for one interval over one year: every
+    bar from each session's open up to its close for intraday intervals,
+    one midnight-IST bar per session otherwise.
+    """
+    opens, closes = _year_sessions(year)
+    if not is_intraday(interval):
+        return opens.normalize()
+
+    step = np.int64(INTERVAL_SECONDS.get(interval, 300)) * 10**9
+    open_ns = opens.as_unit('ns').asi8
+    lengths = -(-(closes.as_unit('ns').asi8 - open_ns) // step)  # ceil: a partial last bar still opens
+    first_bar = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    stamps = np.repeat(open_ns, lengths) + step * (np.arange(lengths.sum()) - first_bar)
+    return pd.DatetimeIndex(stamps, tz='UTC').tz_convert(IST)
+
+def session_index(interval='5m', start=None, end=None, periods=None):
+    """
+    Bar timestamps of real exchange sessions for the given interval,
+    bounded by start/end, or the last `periods` bars up to end (default now).
+    Built from per-year indexes that are computed once and cached.
+    """
+    end = _now(end)
+    if start is not None:
+        start = to_ist(start)
+        parts = [_year_index(interval, year) for year in range(start.year, end.year + 1)]
+        index = parts[0].append(parts[1:]) if len(parts) > 1 else parts[0]
+        return index[(index >= start) & (index <= end)]
+
+    periods = periods or 0
+    parts = []
+    count = 0
+    year = end.year
+    while count < periods and year >= 1970:
+        part = _year_index(interval, year)
+        if year == end.year:
+            part = part[part <= end]
+        parts.insert(0, part)
+        count += len(part)
+        year -= 1
+    if not parts:
+        return pd.DatetimeIndex([], tz=IST)
+    index = parts[0].append(parts[1:]) if len(parts) > 1 else parts[0]
+    return index[len(index) - periods:]
+
+def session_bounds(day):
+    """
+    (open, close) of the session on a date, or None when the exchange is shut.
+    """
+    day = to_ist(day).normalize()
+    opens, closes = _year_sessions(day.year)
+    i = opens.normalize().searchsorted(day)
+    if i < len(opens) and opens[i].normalize() == day:
+        return opens[i], closes[i]
+    return None
+
+def is_trading_day(day=None):
+    return session_bounds(_now(day)) is not None
+
+def is_market_open(now=None):
+    """
+    True during a regular or special session (holidays aware).
+    """
+    now = _now(now)
+    bounds = session_bounds(now)
+    return bounds is not None and bounds[0] <= now <= bounds[1]
+
+def next_session_open(now=None):
+    """
+    Open of the first session starting after now.
+    """
+    now = _now(now)
+    for year in (now.year, now.year + 1):
+        opens = _year_sessions(year)[0]
+        i = opens.searchsorted(now, side='right')
+        if i < len(opens):
+            return opens[i]
+    return None
+
+def last_session_close(now=None):
+    """
+    Close of the most recent session that has already ended.
+    """
+    now = _now(now)
+    for year in (now.year, now.year - 1):
+        closes = _year_sessions(year)[1]
+        i = closes.searchsorted(now, side='right')
+        if i > 0:
+            return closes[i - 1]
+    return None
+
+def seconds_until_next_session(now=None):
+    """
+    Seconds to sleep before the exchange is next open (0 while it is open).
+    """
+    now = _now(now)
+    if is_market_open(now):
+        return 0.0
+    next_open = next_session_open(now)
+    if next_open is None:
+        return 0.0
+    return max((next_open - now).total_seconds(), 0.0)
+
+def find_gaps(index, interval='1d'):
+    """
+    Session bars between the first and last timestamp of index that are
+    missing from it. Daily bars are compared by date, so tz-naive yfinance
+    daily indexes work as-is.
+    """
+    if len(index) == 0:
+        return pd.DatetimeIndex([], tz=IST)
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize(IST)
+    else:
+        index = index.tz_convert(IST)
+
+    if not is_intraday(interval):
+        index = index.normalize()
+    expected = session_index(interval, start=index.min(), end=index.max())
+    return expected.difference(index)
+
+def is_exchange_symbol(symbol):
+    """
+    Whether a ticker trades on the NSE/BSE calendar.
+    """
+    return symbol.endswith(('.NS', '.BO')) or symbol in ('^NSEI', '^NSEBANK', '^BSESN')
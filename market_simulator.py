@@ -0,0 +1,389 @@
+"""
+Local market-data simulator that stands in for the live providers.
+
+Serves Yahoo chart-, Twelve Data- and NSE option-chain-shaped JSON plus a
+newline-delimited JSON tick stream, all generated from configurable regime
+models, with optional latency and error injection. Point the fetch layer
+at it with MARKET_SIMULATOR_URL, e.g.
+
+    python market_simulator.py --port 8765 --regime trend --latency-ms 80 --error-rate 0.05
+    MARKET_SIMULATOR_URL=http://127.0.0.1:8765 python trading_analysis.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+import requests
+from fetch_cache import INTERVAL_SECONDS
+from synthetic_data import BASE_PRICES, IST, generate_ohlcv
+
+# Regime models as generate_ohlcv parameters (fractions of base price per bar)
+REGIMES = {
+    'range': {'volatility': 0.003, 'reversion': 0.15, 'drift': 0.0},
+    'trend': {'volatility': 0.002, 'reversion': 0.0, 'drift': 0.0004},
+    'gap': {'volatility': 0.003, 'reversion': 0.05, 'drift': 0.0, 'gap': 0.015},
+    'volatility_burst': {'volatility': 0.002, 'reversion': 0.1, 'drift': 0.0, 'burst': 5.0},
+}
+
+# Yahoo range strings to bar counts at 5m granularity are derived from these day counts
+RANGE_DAYS = {'1d': 1, '5d': 5, '1mo': 22, '3mo': 66, '6mo': 130, '1y': 250, '2y': 500, '5y': 1250}
+
+# Option-chain underlyings served by /api/option-chain-indices
+OPTION_UNDERLYINGS = {'NIFTY': 25000, 'BANKNIFTY': 52000, 'FINNIFTY': 23500}
+
+class SimulatorConfig:
+    """
+    Regime and fault-injection settings for the simulator.
+    """
+    def __init__(self, regime='range', latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 error_status=503, drop_rate=0.0, seed=None, tick_interval_ms=250):
+        if regime not in REGIMES:
+            raise ValueError(f"Unknown regime {regime!r}, expected one of {sorted(REGIMES)}")
+        self.regime = regime
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.drop_rate = drop_rate
+        self.seed = seed
+        self.tick_interval_ms = tick_interval_ms
+
+def regime_bars(symbol, regime='range', interval='5m', periods=75, end=None, seed=None):
+    """
+    Generate bars for a regime: a mean-reverting range, a drifting trend,
+    overnight gaps, or a range with volatility bursts.
+    """
+    params = REGIMES[regime]
+    rng = np.random.default_rng(seed)
+
+    volatility = params['volatility']
+    if 'burst' in params:
+        # Roughly one burst window of ~12 bars per 100 bars
+        burst = rng.random(periods) < 0.01
+        window = np.convolve(burst, np.ones(12), mode='full')[:periods] > 0
+        volatility = np.where(window, volatility * params['burst'], volatility)
+
+    data = generate_ohlcv(symbol, interval=interval, end=end, periods=periods, seed=seed,
+                          volatility=volatility, reversion=params['reversion'],
+                          drift=params['drift'], clamp=None)
+    if data.empty or 'gap' not in params:
+        return data
+
+    # Shift every session after a day boundary by a random overnight gap
+    base = BASE_PRICES.get(symbol, 100)
+    new_day = np.r_[False, data.index.date[1:] != data.index.date[:-1]]
+    gaps = np.where(new_day, rng.normal(0, base * params['gap'], len(data)), 0.0)
+    offset = np.cumsum(gaps)
+    for col in ('Open', 'High', 'Low', 'Close'):
+        data[col] = data[col] + offset
+    return data
+
+def yahoo_chart_payload(symbol, data, interval, range_str):
+    """
+    Shape bars like the Yahoo v8 chart API response.
+    """
+    return {
+        'chart': {
+            'result': [{
+                'meta': {
+                    'symbol': symbol,
+                    'currency': 'INR',
+                    'exchangeTimezoneName': 'Asia/Kolkata',
+                    'timezone': 'IST',
+                    'gmtoffset': 19800,
+                    'dataGranularity': interval,
+                    'range': range_str,
+                    'regularMarketPrice': float(data['Close'].iloc[-1]) if not data.empty else None
+                },
+                'timestamp': data.index.as_unit('s').asi8.tolist() if len(data.index) else [],
+                'indicators': {
+                    'quote': [{
+                        'open': data['Open'].round(2).tolist() if not data.empty else [],
+                        'high': data['High'].round(2).tolist() if not data.empty else [],
+                        'low': data['Low'].round(2).tolist() if not data.empty else [],
+                        'close': data['Close'].round(2).tolist() if not data.empty else [],
+                        'volume': data['Volume'].tolist() if not data.empty else []
+                    }]
+                }
+            }],
+            'error': None
+        }
+    }
+
+def twelve_data_payload(symbol, data, interval):
+    """
+    Shape bars like the Twelve Data /time_series response (newest first).
+    """
+    values = [{
+        'datetime': ts.strftime('%Y-%m-%d %H:%M:%S'),
+        'open': f"{row.Open:.5f}",
+        'high': f"{row.High:.5f}",
+        'low': f"{row.Low:.5f}",
+        'close': f"{row.Close:.5f}",
+        'volume': str(int(row.Volume))
+    } for ts, row in zip(data.index[::-1], data.iloc[::-1].itertuples())]
+    return {
+        'meta': {'symbol': symbol, 'interval': interval, 'exchange_timezone': 'Asia/Kolkata', 'type': 'Index'},
+        'values': values,
+        'status': 'ok'
+    }
+
+def option_chain_payload(symbol, spot, rng, n_strikes=40, n_expiries=3, now=None):
+    """
+    Shape a synthetic option chain like the NSE option-chain-indices response.
+    Open interest peaks near the money, calls above spot and puts below.
+    """
+    now = now or datetime.now(IST)
+    step = 100 if spot > 40000 else 50
+    atm = round(spot / step) * step
+    strikes = atm + step * np.arange(-n_strikes // 2, n_strikes // 2)
+
+    days_ahead = (3 - now.weekday()) % 7 or 7
+    expiries = [(now + timedelta(days=days_ahead + 7 * i)).strftime('%d-%b-%Y') for i in range(n_expiries)]
+
+    records = []
+    for e, expiry in enumerate(expiries):
+        distance = (strikes - spot) / (step * 10)
+        ce_oi = rng.poisson(np.maximum(20000 * np.exp(-np.maximum(distance, -0.5) ** 2) / (e + 1), 1))
+        pe_oi = rng.poisson(np.maximum(20000 * np.exp(-np.minimum(distance, 0.5) ** 2) / (e + 1), 1))
+        iv = 12 + 4 * np.abs(distance) + rng.normal(0, 0.5, len(strikes))
+        ce_ltp = np.maximum(spot - strikes, 0) + spot * 0.004 * np.exp(-np.abs(distance)) * (e + 1)
+        pe_ltp = np.maximum(strikes - spot, 0) + spot * 0.004 * np.exp(-np.abs(distance)) * (e + 1)
+        for i, strike in enumerate(strikes):
+            records.append({
+                'strikePrice': int(strike),
+                'expiryDate': expiry,
+                'CE': {
+                    'strikePrice': int(strike), 'expiryDate': expiry, 'underlying': symbol,
+                    'openInterest': int(ce_oi[i]),
+                    'changeinOpenInterest': int(rng.integers(-2000, 2000)),
+                    'totalTradedVolume': int(rng.integers(0, 200000)),
+                    'impliedVolatility': round(float(iv[i]), 2),
+                    'lastPrice': round(float(ce_ltp[i]), 2),
+                    'change': round(float(rng.normal(0, 5)), 2),
+                    'underlyingValue': round(float(spot), 2)
+                },
+                'PE': {
+                    'strikePrice': int(strike), 'expiryDate': expiry, 'underlying': symbol,
+                    'openInterest': int(pe_oi[i]),
+                    'changeinOpenInterest': int(rng.integers(-2000, 2000)),
+                    'totalTradedVolume': int(rng.integers(0, 200000)),
+                    'impliedVolatility': round(float(iv[i]), 2),
+                    'lastPrice': round(float(pe_ltp[i]), 2),
+                    'change': round(float(rng.normal(0, 5)), 2),
+                    'underlyingValue': round(float(spot), 2)
+                }
+            })
+
+    return {
+        'records': {
+            'expiryDates': expiries,
+            'data': records,
+            'timestamp': now.strftime('%d-%b-%Y %H:%M:%S'),
+            'underlyingValue': round(float(spot), 2),
+            'strikePrices': [int(s) for s in strikes]
+        },
+        'filtered': {'data': [r for r in records if r['expiryDate'] == expiries[0]]}
+    }
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    """
+    Request handler; the server instance carries the SimulatorConfig.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _inject_faults(self):
+        """
+        Sleep for the configured latency and maybe fail the request.
+        Returns True if the request was answered with an injected fault.
+        """
+        config = self.server.config
+        delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if config.drop_rate and random.random() < config.drop_rate:
+            self.close_connection = True
+            self.connection.close()
+            return True
+        if config.error_rate and random.random() < config.error_rate:
+            self._send_json({'error': 'injected failure'}, status=config.error_status)
+            return True
+        return False
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+        if self._inject_faults():
+            return
+
+        if parts.path.startswith('/v8/finance/chart/'):
+            self._chart(parts.path.rsplit('/', 1)[-1], query)
+        elif parts.path == '/time_series':
+            self._time_series(query)
+        elif parts.path == '/technical_indicators':
+            self._send_json({'data': {}, 'status': 'ok'})
+        elif parts.path == '/api/option-chain-indices':
+            self._option_chain(query)
+        elif parts.path in ('/', '/option-chain'):
+            # NSE cookie-priming page
+            self._send_json({'status': 'ok'}, headers={'Set-Cookie': 'nsit=simulated; Path=/; Max-Age=600'})
+        elif parts.path == '/stream':
+            self._stream(query)
+        else:
+            self._send_json({'error': f'unknown path {parts.path}'}, status=404)
+
+    def _bars(self, symbol, interval, periods, end=None):
+        config = self.server.config
+        seed = None if config.seed is None else config.seed + zlib.crc32(symbol.encode('utf-8'))
+        return regime_bars(symbol, config.regime, interval=interval, periods=periods, end=end, seed=seed)
+
+    def _chart(self, symbol, query):
+        interval = query.get('interval', '1d')
+        step = INTERVAL_SECONDS.get(interval, 86400)
+        bars_per_day = max(int(22500 // step), 1) if step < 86400 else 1
+
+        if 'period1' in query:
+            start = pd.Timestamp(int(query['period1']), unit='s', tz='UTC')
+            end = pd.Timestamp(int(query.get('period2', time.time())), unit='s', tz='UTC')
+            days = max((end - start).days, 1)
+            periods = days * bars_per_day * 5 // 7 + bars_per_day
+            data = self._bars(symbol, interval, periods, end=end)
+            data = data[data.index >= start]
+        else:
+            range_str = query.get('range', '1d')
+            periods = RANGE_DAYS.get(range_str, 1) * bars_per_day
+            data = self._bars(symbol, interval, periods)
+
+        self._send_json(yahoo_chart_payload(symbol, data, interval, query.get('range', '')))
+
+    def _time_series(self, query):
+        symbol = query.get('symbol', 'X')
+        interval = {'1min': '1m', '5min': '5m', '15min': '15m', '30min': '30m', '1h': '1h', '1day': '1d'}.get(query.get('interval', '5min'), '5m')
+        periods = int(query.get('outputsize', 30))
+        data = self._bars(symbol, interval, periods)
+        self._send_json(twelve_data_payload(symbol, data, query.get('interval', '5min')))
+
+    def _option_chain(self, query):
+        symbol = query.get('symbol', 'NIFTY').upper()
+        spot_base = OPTION_UNDERLYINGS.get(symbol, 25000)
+        rng = np.random.default_rng(self.server.config.seed)
+        spot = spot_base * (1 + rng.normal(0, 0.003))
+        self._send_json(option_chain_payload(symbol, spot, rng))
+
+    def _stream(self, query):
+        """
+        Chunked newline-delimited JSON ticks until the client disconnects
+        or `count` ticks have been sent.
+        """
+        config = self.server.config
+        symbol = query.get('symbol', 'Nifty50')
+        count = int(query.get('count', 0))
+        interval_ms = float(query.get('interval_ms', config.tick_interval_ms))
+        params = REGIMES[config.regime]
+        base = BASE_PRICES.get(symbol, 100)
+        rng = np.random.default_rng(config.seed)
+        price = base
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        sent = 0
+        try:
+            while count == 0 or sent < count:
+                # Ticks move a fifth of a bar's volatility each
+                vol = params['volatility'] / 5
+                if 'burst' in params and rng.random() < 0.01:
+                    vol *= params['burst']
+                price += base * (params['drift'] / 5 + rng.normal(0, vol)) + (base - price) * params['reversion'] / 5
+                tick = {
+                    'symbol': symbol,
+                    'timestamp': datetime.now(IST).isoformat(),
+                    'price': round(price, 2),
+                    'size': int(rng.integers(1, 500))
+                }
+                line = (json.dumps(tick) + '\n').encode('utf-8')
+                self.wfile.write(f"{len(line):X}\r\n".encode('ascii') + line + b"\r\n")
+                self.wfile.flush()
+                sent += 1
+                time.sleep(interval_ms / 1000.0)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def start_simulator(host='127.0.0.1', port=0, **config):
+    """
+    Start the simulator on a background thread. Returns (server, base_url);
+    call server.shutdown() to stop it. port=0 picks a free port.
+    """
+    server = ThreadingHTTPServer((host, port), SimulatorHandler)
+    server.daemon_threads = True
+    server.config = SimulatorConfig(**config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def stream_ticks(base_url, symbol, count=0, interval_ms=None):
+    """
+    Iterate over ticks from a running simulator's /stream endpoint.
+    """
+    params = {'symbol': symbol, 'count': count}
+    if interval_ms is not None:
+        params['interval_ms'] = interval_ms
+    with requests.get(f"{base_url}/stream", params=params, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line:
+                yield json.loads(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Local market-data simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--regime', choices=sorted(REGIMES), default='range')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--tick-interval-ms', type=float, default=250)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), SimulatorHandler)
+    server.daemon_threads = True
+    server.config = SimulatorConfig(
+        regime=args.regime, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, error_status=args.error_status, drop_rate=args.drop_rate,
+        seed=args.seed, tick_interval_ms=args.tick_interval_ms
+    )
+    print(f"Market simulator ({args.regime}) listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
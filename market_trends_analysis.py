@@ -1,14 +1,14 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 from fpdf import FPDF
-import yfinance as yf
 from datetime import datetime, timedelta
+from data_fetcher import fetch_stored_bars
 
-# Fetch data from Yahoo Finance for past 6 years
+# Fetch data for past 6 years (local bar store, topped up from Yahoo Finance)
 def fetch_data(symbol, years=6):
     end_date = datetime.now()
     start_date = end_date - timedelta(days=years*365)
-    data = yf.download(symbol, start=start_date, end=end_date, interval='1d')
+    data = fetch_stored_bars(symbol, start_date, end_date, interval='1d')
     return data
 
 # Load datasets
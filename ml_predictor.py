@@ -4,42 +4,61 @@ from sklearn.ensemble import RandomForestClassifier, VotingClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 from sklearn.preprocessing import StandardScaler
-import joblib
-import os
+from sklearn.utils.class_weight import compute_class_weight
 from collections import Counter
+import json
+import multiprocessing
+import os
+import threading
+import time
+import model_registry
+from model_registry import current_version, load_model, migrate_legacy_model, publish_model
+
+# Trees added per warm-start step while training (one progress update each)
+TRAINING_CHUNK = int(os.getenv('MODEL_TRAINING_CHUNK', '30'))
+# Seconds between checks for a newer published model version
+MODEL_RELOAD_INTERVAL = float(os.getenv('MODEL_RELOAD_INTERVAL', '30'))
+# Seconds before restarting training that failed or whose trainer died (doubles per attempt)
+TRAINING_RETRY_BACKOFF = float(os.getenv('MODEL_TRAINING_RETRY_BACKOFF', '60'))
+TRAINING_RETRY_MAX = float(os.getenv('MODEL_TRAINING_RETRY_MAX', '3600'))
 
 class MLPredictor:
-    def __init__(self):
+    def __init__(self, train_if_missing=True):
         self.model = None
         self.scaler = None
         self.feature_names = None
+        self.metadata = None  # registry metadata of the loaded version
         self.confidence_threshold = 0.6  # Minimum confidence for strong signals
-        self.load_or_train_model()
+        self.load_or_train_model(train_if_missing)
 
-    def load_or_train_model(self):
+    def load_or_train_model(self, train_if_missing=True):
         """
-        Load existing model or train a new one if not found.
+        Load the current model version from the registry (memory-mapped),
+        migrating the legacy pickle files on first use, or train a new one
+        (unless train_if_missing is False, which leaves model as None).
         """
-        model_path = 'trading_model.pkl'
-        scaler_path = 'trading_scaler.pkl'
-        features_path = 'trading_features.pkl'
-
-        if os.path.exists(model_path) and os.path.exists(scaler_path) and os.path.exists(features_path):
-            try:
-                self.model = joblib.load(model_path)
-                self.scaler = joblib.load(scaler_path)
-                self.feature_names = joblib.load(features_path)
-                print("Model, scaler, and features loaded successfully.")
-            except Exception as e:
-                print(f"Error loading model: {e}")
-                self.train_model()
-        else:
-            print("Model files incomplete, training new model...")
+        try:
+            loaded = load_model()
+            if loaded is None and migrate_legacy_model():
+                print("Migrated legacy model files to the model registry.")
+                loaded = load_model()
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            loaded = None
+
+        if loaded is not None:
+            self.model, self.scaler, self.feature_names, self.metadata = loaded
+            print(f"Model version {self.metadata['version']} loaded successfully.")
+        elif train_if_missing:
+            print("No usable model version found, training new model...")
             self.train_model()
 
-    def train_model(self):
+    def train_model(self, n_estimators=300, progress=None, registry_dir=None):
         """
         Train enhanced ML model with advanced features and ensemble methods.
+        Trees are grown TRAINING_CHUNK at a time (warm start, same forest as
+        one fit) and progress(trees_done, n_estimators) is called after each
+        step. Returns the published version.
         """
         # Generate more sophisticated synthetic trading data
         np.random.seed(42)
@@ -102,11 +121,19 @@ class MLPredictor:
         X_test_scaled = self.scaler.transform(X_test)
 
         # Create ensemble model with multiple algorithms for higher accuracy
-        rf = RandomForestClassifier(n_estimators=300, max_depth=15, random_state=42, class_weight='balanced')
+        # 'balanced' weights computed up front: the preset warns under warm_start
+        classes = np.unique(y_train)
+        class_weight = dict(zip(classes, compute_class_weight('balanced', classes=classes, y=y_train)))
+        rf = RandomForestClassifier(n_estimators=0, max_depth=15, random_state=42, class_weight=class_weight, warm_start=True)
 
         # Train ensemble
         self.model = rf
-        self.model.fit(X_train_scaled, y_train)
+        while rf.n_estimators < n_estimators:
+            rf.set_params(n_estimators=min(rf.n_estimators + TRAINING_CHUNK, n_estimators))
+            rf.fit(X_train_scaled, y_train)
+            if progress:
+                progress(rf.n_estimators, n_estimators)
+        rf.set_params(warm_start=False)
 
         # Evaluate
         y_pred = self.model.predict(X_test_scaled)
@@ -115,11 +142,12 @@ class MLPredictor:
         print("Classification Report:")
         print(classification_report(y_test, y_pred, target_names=['Sell', 'Hold', 'Buy']))
 
-        # Save model and scaler
-        joblib.dump(self.model, 'trading_model.pkl')
-        joblib.dump(self.scaler, 'trading_scaler.pkl')
-        joblib.dump(list(X.columns), 'trading_features.pkl')
+        # Publish model and scaler as a new registry version
         self.feature_names = list(X.columns)
+        version = publish_model(self.model, self.scaler, self.feature_names,
+                                metrics={'accuracy': accuracy}, registry_dir=registry_dir)
+        self.metadata = {'version': version}
+        return version
 
     def predict(self, indicators_dict):
         """
@@ -130,15 +158,7 @@ class MLPredictor:
 
         # If feature_names is None, use basic prediction
         if self.feature_names is None:
-            # Simple rule-based prediction as fallback
-            rsi = indicators_dict.get('rsi', 50)
-            macd = indicators_dict.get('macd', 0)
-            if rsi < 30 and macd > 0:
-                return 'buy'
-            elif rsi > 70 and macd < 0:
-                return 'sell'
-            else:
-                return 'hold'
+            return rule_based_prediction(indicators_dict)[0]
 
         # Prepare input data with enhanced features
         enhanced_indicators = self._enhance_indicators(indicators_dict)
@@ -281,22 +301,175 @@ class MLPredictor:
         probabilities = self.model.predict_proba(input_data_scaled)[0]
         return max(probabilities)
 
+def rule_based_prediction(indicators):
+    """
+    (action, confidence) from RSI and momentum (MACD when momentum is
+    missing), used whenever no trained model is available.
+    """
+    rsi = indicators.get('rsi', 50)
+    momentum = indicators.get('momentum', indicators.get('macd', 0))
+    if rsi < 30 and momentum > 0:
+        return 'buy', 0.6
+    if rsi > 70 and momentum < 0:
+        return 'sell', 0.6
+    return 'hold', 0.5
+
+def _status_path(registry_dir=None):
+    return os.path.join(registry_dir or model_registry.MODEL_REGISTRY_DIR, 'training_status.json')
+
+def _lock_path(registry_dir=None):
+    return os.path.join(registry_dir or model_registry.MODEL_REGISTRY_DIR, 'training.lock')
+
+def _write_training_status(registry_dir, **status):
+    path = _status_path(registry_dir)
+    status['updated'] = time.time()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(status, f)
+    os.replace(tmp_path, path)
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def training_status(registry_dir=None):
+    """
+    State of background training as a dict: state ('idle', 'running',
+    'done' or 'failed'), progress (0-1), trees, n_estimators, version once
+    done, error once failed. Readable from any process.
+    """
+    multiprocessing.active_children()  # reap finished workers of this process
+    try:
+        with open(_status_path(registry_dir)) as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return {'state': 'idle', 'progress': 0.0}
+    if status.get('state') == 'running' and not _pid_alive(status.get('pid', 0)):
+        status.update(state='failed', error='training process exited')
+    return status
+
+def _training_worker(registry_dir, n_estimators):
+    """
+    Body of the training process: train, publish, report through the
+    status file and release the training lock.
+    """
+    started = time.time()
+
+    def report(trees, total):
+        _write_training_status(registry_dir, state='running', pid=os.getpid(), started=started,
+                               trees=trees, n_estimators=total, progress=trees / total)
+
+    try:
+        report(0, n_estimators)
+        version = MLPredictor(train_if_missing=False).train_model(n_estimators, progress=report, registry_dir=registry_dir)
+        _write_training_status(registry_dir, state='done', pid=os.getpid(), started=started,
+                               trees=n_estimators, n_estimators=n_estimators, progress=1.0, version=version)
+    except Exception as e:
+        _write_training_status(registry_dir, state='failed', pid=os.getpid(), started=started,
+                               progress=0.0, error=str(e))
+    finally:
+        try:
+            os.remove(_lock_path(registry_dir))
+        except OSError:
+            pass
+
+def start_background_training(n_estimators=300, registry_dir=None):
+    """
+    Train and publish a new model version in a separate process. The lock
+    file holds the trainer's pid, so only one process trains at a time
+    across Flask workers and Streamlit sessions; a lock left by a dead
+    trainer is taken over. Returns the Process, or None if training is
+    already running elsewhere.
+    """
+    registry_dir = registry_dir or model_registry.MODEL_REGISTRY_DIR
+    os.makedirs(registry_dir, exist_ok=True)
+    lock_path = _lock_path(registry_dir)
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            with open(lock_path) as f:
+                pid = int(f.read() or 0)
+            # An empty lock is a trainer still being started
+            stale = not _pid_alive(pid) if pid else time.time() - os.path.getmtime(lock_path) > 60
+        except (OSError, ValueError):
+            stale = False
+        if not stale:
+            return None
+        os.remove(lock_path)
+        return start_background_training(n_estimators, registry_dir)
+
+    process = multiprocessing.get_context('spawn').Process(
+        target=_training_worker, args=(registry_dir, n_estimators), daemon=True)
+    try:
+        process.start()
+    except Exception:
+        os.close(fd)
+        os.remove(lock_path)
+        raise
+    os.write(fd, str(process.pid).encode())
+    os.close(fd)
+    _write_training_status(registry_dir, state='running', pid=process.pid, started=time.time(),
+                           trees=0, n_estimators=n_estimators, progress=0.0)
+    print(f"Started background model training (pid {process.pid}).")
+    return process
+
 # Lazy global predictor instance to avoid heavy work at import time
 predictor = None
+_predictor_lock = threading.Lock()
+_last_version_check = 0.0
+_training_attempts = 0
+_next_training_attempt = 0.0
+
+def _ensure_training():
+    """
+    Start background training unless a live trainer is running or the
+    retry backoff has not elapsed. A lock left by a dead trainer is taken
+    over by start_background_training.
+    """
+    global _training_attempts, _next_training_attempt
+    if training_status()['state'] == 'running' or time.time() < _next_training_attempt:
+        return
+    _training_attempts += 1
+    _next_training_attempt = time.time() + min(TRAINING_RETRY_BACKOFF * 2 ** (_training_attempts - 1), TRAINING_RETRY_MAX)
+    start_background_training()
 
 def get_predictor():
     """
-    Return a singleton MLPredictor instance. Initialize lazily and handle
-    initialization errors gracefully so importing this module won't crash
-    the app during deploy.
+    Return the shared MLPredictor, or None while no model is available so
+    callers fall back to rule_based_prediction. A missing model is trained
+    in a background process instead of blocking this call; when no trainer
+    is running (it failed, died, or never started) training is started
+    again after a backoff of TRAINING_RETRY_BACKOFF seconds, doubled per
+    attempt up to TRAINING_RETRY_MAX. The registry is re-checked every MODEL_RELOAD_INTERVAL
+    seconds (every call while there is no model), and a newly published
+    version replaces the predictor in one assignment; callers holding the
+    old one keep using it.
     """
-    global predictor
-    if predictor is None:
+    global predictor, _last_version_check
+    if predictor is not None and time.time() - _last_version_check < MODEL_RELOAD_INTERVAL:
+        return predictor
+    with _predictor_lock:
+        if predictor is not None and time.time() - _last_version_check < MODEL_RELOAD_INTERVAL:
+            return predictor
+        _last_version_check = time.time()
         try:
-            predictor = MLPredictor()
+            version = current_version()
+            if version is None and migrate_legacy_model():
+                version = current_version()
+            if version is None:
+                _ensure_training()
+            elif predictor is None or (predictor.metadata or {}).get('version') != version:
+                loaded = MLPredictor(train_if_missing=False)
+                if loaded.model is not None:
+                    predictor = loaded
         except Exception as e:
-            # Log the error and keep predictor None. The app can continue
+            # Log the error and keep the current predictor. The app can continue
             # and fall back to rule-based logic when predictor is unavailable.
             print(f"Error initializing MLPredictor: {e}")
-            predictor = None
     return predictor
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import joblib
+import numpy as np
+import sklearn
+
+# Root of the versioned model artifacts (set MODEL_REGISTRY_DIR to relocate it)
+MODEL_REGISTRY_DIR = os.getenv('MODEL_REGISTRY_DIR', 'model_artifacts')
+# Hash every artifact file on load; off by default since it reads the whole
+# forest (sizes and the metadata version are always checked, hashes are
+# recorded at publish time and can be checked with verify_model)
+MODEL_VERIFY_CHECKSUMS = os.getenv('MODEL_VERIFY_CHECKSUMS', 'false').lower() == 'true'
+
+FOREST_ARRAYS = ('feature', 'threshold', 'left', 'right', 'missing_left', 'proba', 'roots')
+
+class ForestArtifact:
+    """
+    A fitted random forest flattened into plain arrays: the nodes of all
+    trees concatenated, with children as absolute node numbers and each
+    node's class probabilities. Saved as .npy files, so np.load(mmap_mode='r')
+    maps them instead of unpickling, and every process loading the same
+    version shares one copy through the page cache. (sklearn copies tree
+    nodes into private buffers when unpickling, so mmapping its pickle would
+    not share anything.) Leaves point to themselves, so walking max_depth
+    steps from the roots lands every sample on its leaf. NaN features follow
+    each node's missing_go_to_left like sklearn's own trees.
+    """
+    def __init__(self, arrays, classes, max_depth):
+        self.arrays = arrays
+        self.classes_ = np.asarray(classes)
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_model(cls, model):
+        features, thresholds, lefts, rights, missing_lefts, probas, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            value = tree.value[:, 0, :]
+            totals = value.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1.0
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+            lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+            missing_lefts.append(np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)), dtype=bool))
+            probas.append(value / totals)
+            roots.append(offset)
+            offset += tree.node_count
+        arrays = {
+            'feature': np.concatenate(features).astype(np.int32),
+            'threshold': np.concatenate(thresholds).astype(np.float64),
+            'left': np.concatenate(lefts).astype(np.int32),
+            'right': np.concatenate(rights).astype(np.int32),
+            'missing_left': np.concatenate(missing_lefts),
+            'proba': np.concatenate(probas).astype(np.float64),
+            'roots': np.asarray(roots, dtype=np.int32),
+        }
+        max_depth = max(estimator.tree_.max_depth for estimator in model.estimators_)
+        return cls(arrays, model.classes_, max_depth)
+
+    def save(self, directory):
+        for name in FOREST_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), self.arrays[name])
+
+    @classmethod
+    def load(cls, directory, classes, max_depth, mmap_mode='r'):
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in FOREST_ARRAYS if os.path.exists(os.path.join(directory, f"{name}.npy"))}
+        if 'missing_left' not in arrays:
+            # Versions published before NaN routing was stored sent NaN right
+            arrays['missing_left'] = np.zeros(len(arrays['feature']), dtype=bool)
+        return cls(arrays, classes, max_depth)
+
+    def apply(self, X):
+        """
+        Leaf node of every sample in every tree (samples x trees).
+        """
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        feature, threshold = self.arrays['feature'], self.arrays['threshold']
+        left, right, missing_left = self.arrays['left'], self.arrays['right'], self.arrays['missing_left']
+        node = np.broadcast_to(self.arrays['roots'], (len(X), len(self.arrays['roots'])))
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            value = X[rows, feature[node]]
+            go_left = (value <= threshold[node]) | (np.isnan(value) & missing_left[node])
+            node = np.where(go_left, left[node], right[node])
+        return node
+
+    def predict_proba(self, X):
+        return self.arrays['proba'][self.apply(X)].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _version_dir(version, registry_dir):
+    return os.path.join(registry_dir, version)
+
+def list_versions(registry_dir=None):
+    """
+    Published versions, oldest first.
+    """
+    registry_dir = registry_dir or MODEL_REGISTRY_DIR
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(name for name in os.listdir(registry_dir)
+                  if not name.startswith('.') and os.path.exists(os.path.join(registry_dir, name, 'metadata.json')))
+
+def current_version(registry_dir=None):
+    """
+    The version CURRENT points to, or None when nothing is published.
+    """
+    registry_dir = registry_dir or MODEL_REGISTRY_DIR
+    try:
+        with open(os.path.join(registry_dir, 'CURRENT')) as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version if version in list_versions(registry_dir) else None
+
+def publish_model(model, scaler, feature_names, metrics=None, registry_dir=None):
+    """
+    Store a fitted forest, its scaler and feature list as a new version and
+    make it current. The version directory is written under a temporary
+    name and renamed into place, then CURRENT is swapped atomically, so a
+    reader never sees a half-written version. Returns the version.
+    """
+    registry_dir = registry_dir or MODEL_REGISTRY_DIR
+    os.makedirs(registry_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime())
+    version, suffix = stamp, 1
+    while os.path.exists(_version_dir(version, registry_dir)):
+        suffix += 1
+        version = f"{stamp}-{suffix}"
+    tmp_dir = _version_dir(f".{version}.tmp", registry_dir)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    forest = ForestArtifact.from_model(model)
+    forest.save(tmp_dir)
+    joblib.dump(scaler, os.path.join(tmp_dir, 'scaler.joblib'))
+    files = {}
+    for name in sorted(os.listdir(tmp_dir)):
+        path = os.path.join(tmp_dir, name)
+        files[name] = {'sha256': _sha256(path), 'bytes': os.path.getsize(path)}
+    metadata = {
+        'version': version,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'model_class': type(model).__name__,
+        'params': {key: value for key, value in model.get_params().items()
+                   if isinstance(value, (int, float, str, bool, type(None)))},
+        'sklearn_version': sklearn.__version__,
+        'classes': forest.classes_.tolist(),
+        'max_depth': forest.max_depth,
+        'features': list(feature_names),
+        'metrics': metrics or {},
+        'files': files,
+    }
+    with open(os.path.join(tmp_dir, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_dir, _version_dir(version, registry_dir))
+
+    tmp_path = os.path.join(registry_dir, 'CURRENT.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(registry_dir, 'CURRENT'))
+    return version
+
+def read_metadata(version=None, registry_dir=None):
+    registry_dir = registry_dir or MODEL_REGISTRY_DIR
+    version = version or current_version(registry_dir)
+    if version is None:
+        return None
+    with open(os.path.join(_version_dir(version, registry_dir), 'metadata.json')) as f:
+        return json.load(f)
+
+def verify_model(version=None, registry_dir=None, checksums=True):
+    """
+    Check a version's files against its metadata (sizes, and sha256 when
+    checksums is True). Raises ValueError naming the first bad file.
+    """
+    registry_dir = registry_dir or MODEL_REGISTRY_DIR
+    metadata = read_metadata(version, registry_dir)
+    if metadata is None:
+        raise ValueError("No model version published")
+    if version is not None and metadata['version'] != version:
+        raise ValueError(f"Model metadata of {version} names version {metadata['version']}")
+    directory = _version_dir(metadata['version'], registry_dir)
+    for name, expected in metadata['files'].items():
+        path = os.path.join(directory, name)
+        if not os.path.exists(path) or os.path.getsize(path) != expected['bytes']:
+            raise ValueError(f"Model artifact {name} of {metadata['version']} is missing or truncated")
+        if checksums and _sha256(path) != expected['sha256']:
+            raise ValueError(f"Model artifact {name} of {metadata['version']} fails its checksum")
+    return metadata
+
+def load_model(version=None, registry_dir=None, verify_checksums=None):
+    """
+    Load a version (the current one by default) as (forest, scaler,
+    feature_names, metadata). The forest arrays are memory-mapped read-only
+    instead of unpickled, and only file sizes are checked unless
+    verify_checksums (default MODEL_VERIFY_CHECKSUMS) asks for hashing them,
+    which reads them in full. Returns None when nothing is published.
+    """
+    registry_dir = registry_dir or MODEL_REGISTRY_DIR
+    version = version or current_version(registry_dir)
+    if version is None:
+        return None
+    if verify_checksums is None:
+        verify_checksums = MODEL_VERIFY_CHECKSUMS
+    metadata = verify_model(version, registry_dir, checksums=verify_checksums)
+    directory = _version_dir(version, registry_dir)
+    forest = ForestArtifact.load(directory, metadata['classes'], metadata['max_depth'])
+    scaler = joblib.load(os.path.join(directory, 'scaler.joblib'))
+    return forest, scaler, metadata['features'], metadata
+
+def migrate_legacy_model(model_path='trading_model.pkl', scaler_path='trading_scaler.pkl',
+                         features_path='trading_features.pkl', registry_dir=None):
+    """
+    Publish the pickled model files used before the registry existed.
+    Returns the new version, or None when the files are missing.
+    """
+    if not all(os.path.exists(path) for path in (model_path, scaler_path, features_path)):
+        return None
+    model = joblib.load(model_path)
+    scaler = joblib.load(scaler_path)
+    feature_names = joblib.load(features_path)
+    return publish_model(model, scaler, feature_names, metrics={'migrated_from': model_path},
+                         registry_dir=registry_dir)
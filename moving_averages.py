@@ -1,18 +1,207 @@
+import numpy as np
 import pandas as pd
+from scipy.signal import lfilter
+
+def _close(data):
+    return data['Close'] if isinstance(data, pd.DataFrame) else data
+
+def _values(series):
+    return series.to_numpy(dtype=np.float64)
+
+def _wrap(values, like):
+    return pd.Series(values, index=like.index, name=like.name)
+
+def _window_sums(values, periods):
+    """
+    Trailing window sums for each period from one cumulative sum, as an
+    (n, len(periods)) array (NaN until a window is full). The cumulative sum
+    runs over values minus the first one, which keeps its magnitude (and
+    rounding) small for price series.
+    """
+    n = len(values)
+    offset = values[0] if n else 0.0
+    cumsum = np.concatenate([[0.0], np.cumsum(values - offset)])
+    sums = np.full((n, len(periods)), np.nan)
+    for j, period in enumerate(periods):
+        if 0 < period <= n:
+            sums[period - 1:, j] = cumsum[period:] - cumsum[:n - period + 1] + period * offset
+    return sums
+
+def sma_values(values, periods):
+    """
+    Simple moving averages of a 1-D array for several periods at once.
+    Windows containing NaN are NaN, as with pandas rolling().mean().
+    """
+    periods = list(periods)
+    missing = np.isnan(values)
+    if missing.any():
+        gaps = _window_sums(missing.astype(np.float64), periods)
+        sums = _window_sums(np.where(missing, 0.0, values), periods)
+        return np.where(gaps > 0, np.nan, sums / np.array(periods))
+    return _window_sums(values, periods) / np.array(periods)
+
+def ema_values(values, alpha, adjust=True):
+    """
+    Exponential moving average as pandas ewm(alpha, adjust).mean() through
+    IIR filters. With adjust=True the weighted sum and the sum of weights
+    are both filtered and divided. Series with NaN go through pandas.
+    """
+    if len(values) == 0:
+        return np.array([])
+    if np.isnan(values).any():
+        return pd.Series(values).ewm(alpha=alpha, adjust=adjust).mean().to_numpy()
+    decay = [1.0, alpha - 1.0]
+    if adjust:
+        weighted = lfilter([1.0], decay, values)
+        weights = lfilter([1.0], decay, np.ones(len(values)))
+        return weighted / weights
+    out = np.empty(len(values))
+    out[0] = values[0]
+    out[1:], _ = lfilter([alpha], decay, values[1:], zi=[(1 - alpha) * values[0]])
+    return out
+
+def wma_values(values, period):
+    """
+    Linearly weighted moving average: weight period on the newest bar down
+    to 1 on the oldest, as one convolution.
+    """
+    out = np.full(len(values), np.nan)
+    if 0 < period <= len(values):
+        kernel = np.arange(period, 0, -1, dtype=np.float64)
+        out[period - 1:] = np.convolve(values, kernel / kernel.sum(), mode='valid')
+    return out
 
 def simple_ma(data, period=50):
-    return data['Close'].rolling(period).mean()
+    close = _close(data)
+    return _wrap(sma_values(_values(close), [period])[:, 0], close)
+
+def multi_sma(data, periods=(5, 10, 20, 50, 100, 200)):
+    """
+    Several SMA lengths from a single cumulative sum, one column per period.
+    """
+    close = _close(data)
+    return pd.DataFrame(sma_values(_values(close), periods), index=close.index, columns=list(periods))
 
 def exponential_ma(data, period=50):
-    return data['Close'].ewm(span=period).mean()
+    close = _close(data)
+    return _wrap(ema_values(_values(close), 2.0 / (period + 1)), close)
 
 def weighted_ma(data, period=50):
-    weights = pd.Series(range(1, period+1))
-    return data['Close'].rolling(period).apply(lambda x: (x * weights).sum() / weights.sum(), raw=False)
+    close = _close(data)
+    return _wrap(wma_values(_values(close), period), close)
+
+def hull_ma(data, period=20):
+    """
+    Hull moving average: WMA(2 * WMA(n/2) - WMA(n)) over sqrt(n) bars.
+    """
+    close = _close(data)
+    values = _values(close)
+    raw = 2 * wma_values(values, max(period // 2, 1)) - wma_values(values, period)
+    hull = np.full(len(values), np.nan)
+    start = period - 1
+    if start < len(values):
+        hull[start:] = wma_values(raw[start:], max(int(np.sqrt(period)), 1))
+    return _wrap(hull, close)
+
+def double_ema(data, period=20):
+    """
+    DEMA: 2 * EMA - EMA(EMA).
+    """
+    close = _close(data)
+    alpha = 2.0 / (period + 1)
+    ema = ema_values(_values(close), alpha)
+    return _wrap(2 * ema - ema_values(ema, alpha), close)
+
+def triple_ema(data, period=20):
+    """
+    TEMA: 3 * EMA - 3 * EMA(EMA) + EMA(EMA(EMA)).
+    """
+    close = _close(data)
+    alpha = 2.0 / (period + 1)
+    ema1 = ema_values(_values(close), alpha)
+    ema2 = ema_values(ema1, alpha)
+    return _wrap(3 * ema1 - 3 * ema2 + ema_values(ema2, alpha), close)
+
+# Smallest cumulative coefficient product kaufman_ma divides by
+KAMA_MIN_SCALE = 1e-6
+
+def kaufman_ma(data, period=10, fast=2, slow=30, block=64):
+    """
+    Kaufman adaptive moving average. The efficiency ratio comes from window
+    sums; the recursion k[t] = a[t] * k[t-1] + b[t] has a coefficient that
+    changes every bar, so it is solved in blocks with cumulative products
+    (k = P * (k0 + cumsum(b / P))) instead of a per-bar loop. A block ends
+    before P falls below KAMA_MIN_SCALE, where dividing by it loses
+    precision (a = 0 for a fully efficient bar with fast=1 makes P zero);
+    such a bar is stepped directly.
+    """
+    close = _close(data)
+    values = _values(close)
+    n = len(values)
+    kama = np.full(n, np.nan)
+    if n <= period:
+        return _wrap(kama, close)
+
+    change = np.abs(values[period:] - values[:-period])
+    volatility = _window_sums(np.abs(np.diff(values)), [period])[period - 1:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        efficiency = np.where(volatility > 0, change / volatility, 0.0)
+    fast_sc, slow_sc = 2.0 / (fast + 1), 2.0 / (slow + 1)
+    sc = (efficiency * (fast_sc - slow_sc) + slow_sc) ** 2
+
+    a = 1.0 - sc
+    b = sc * values[period:]
+    level = values[period - 1]
+    kama[period - 1] = level
+    start = 0
+    while start < len(a):
+        scale = np.cumprod(a[start:start + block])
+        length = int(np.argmax(scale < KAMA_MIN_SCALE)) if scale[-1] < KAMA_MIN_SCALE else len(scale)
+        if length == 0:
+            level = a[start] * level + b[start]
+            kama[period + start] = level
+            start += 1
+            continue
+        scale = scale[:length]
+        segment = scale * (level + np.cumsum(b[start:start + length] / scale))
+        kama[period + start:period + start + length] = segment
+        level = segment[-1]
+        start += length
+    return _wrap(kama, close)
+
+def volume_weighted_ma(data, period=20):
+    """
+    VWMA: sum(close * volume) / sum(volume) over the window.
+    """
+    close = _close(data)
+    values, volume = _values(close), data['Volume'].to_numpy(dtype=np.float64)
+    sums = _window_sums(values * volume, [period])[:, 0]
+    volumes = _window_sums(volume, [period])[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _wrap(sums / volumes, close)
 
 def ma_crossover(data, short=50, long=200):
-    short_ma = simple_ma(data, short)
-    long_ma = simple_ma(data, long)
-    bullish_cross = (short_ma > long_ma) & (short_ma.shift() < long_ma.shift())
-    bearish_cross = (short_ma < long_ma) & (short_ma.shift() > long_ma.shift())
-    return bullish_cross, bearish_cross
+    short_ma, long_ma = sma_values(_values(_close(data)), [short, long]).T
+    prev_short, prev_long = np.r_[np.nan, short_ma[:-1]], np.r_[np.nan, long_ma[:-1]]
+    bullish_cross = (short_ma > long_ma) & (prev_short < prev_long)
+    bearish_cross = (short_ma < long_ma) & (prev_short > prev_long)
+    index = _close(data).index
+    return pd.Series(bullish_cross, index=index), pd.Series(bearish_cross, index=index)
+
+def crossovers(data, periods=(5, 10, 20, 50, 100, 200), averages=None):
+    """
+    Crossovers between every pair of moving averages at once. averages is
+    an (n x period) frame such as multi_sma returns (SMAs by default).
+    Returns one column per (short, long) pair: 1 where the shorter average
+    crosses above the longer, -1 where it crosses below, 0 otherwise.
+    """
+    if averages is None:
+        averages = multi_sma(data, periods)
+    columns = list(averages.columns)
+    values = averages.to_numpy(dtype=np.float64)
+    short, long = np.triu_indices(len(columns), k=1)
+    spread = values[:, short] - values[:, long]  # (n, pairs)
+    prev = np.vstack([np.full((1, spread.shape[1]), np.nan), spread[:-1]])
+    signal = np.where((spread > 0) & (prev < 0), 1, np.where((spread < 0) & (prev > 0), -1, 0))
+    pairs = pd.MultiIndex.from_arrays([[columns[i] for i in short], [columns[j] for j in long]], names=['short', 'long'])
+    return pd.DataFrame(signal, index=averages.index, columns=pairs)
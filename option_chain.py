@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+# Flat column suffix -> field name in each CE/PE leg of the NSE payload
+NSE_FIELDS = {
+    'open_interest': 'openInterest',
+    'change_oi': 'changeinOpenInterest',
+    'volume': 'totalTradedVolume',
+    'iv': 'impliedVolatility',
+    'last_price': 'lastPrice',
+    'change': 'change'
+}
+
+SIDES = ('CE', 'PE')
+INT_FIELDS = ('open_interest', 'change_oi', 'volume')
+
+BUILDUP_LABELS = ['Long Buildup', 'Short Buildup', 'Short Covering', 'Long Unwinding']
+
+def chain_columns():
+    """
+    Column order of a parsed chain: expiry, strike, then CE_* and PE_* fields.
+    """
+    return ['expiry', 'strike'] + [f"{side}_{col}" for side in SIDES for col in NSE_FIELDS]
+
+def parse_option_chain(payload):
+    """
+    Parse an NSE option-chain-indices response into one flat row per
+    expiry/strike with typed CE_* and PE_* columns. Legs missing from the
+    payload are zero-filled. Rows are sorted by expiry date, then strike.
+    """
+    records = payload.get('records', {}).get('data') if isinstance(payload, dict) else None
+    if not records:
+        return pd.DataFrame(columns=chain_columns())
+
+    fields = list(NSE_FIELDS.values())
+    empty = {}
+    rows = []
+    for record in records:
+        ce = record.get('CE') or empty
+        pe = record.get('PE') or empty
+        rows.append((record.get('expiryDate', ''), record.get('strikePrice', 0),
+                     *[ce.get(f, 0) for f in fields], *[pe.get(f, 0) for f in fields]))
+
+    chain = pd.DataFrame.from_records(rows, columns=chain_columns())
+    chain['expiry'] = chain['expiry'].astype(str)
+    chain['strike'] = chain['strike'].astype(np.float64)
+    for side in SIDES:
+        for col in NSE_FIELDS:
+            name = f"{side}_{col}"
+            if col in INT_FIELDS:
+                chain[name] = pd.to_numeric(chain[name], errors='coerce').fillna(0).astype(np.int64)
+            else:
+                chain[name] = pd.to_numeric(chain[name], errors='coerce').astype(np.float64)
+
+    expiry_dates = pd.to_datetime(chain['expiry'], format='%d-%b-%Y', errors='coerce')
+    order = np.lexsort((chain['strike'].values, expiry_dates.values))
+    chain = chain.iloc[order].reset_index(drop=True)
+    chain.attrs['underlying_value'] = payload.get('records', {}).get('underlyingValue')
+    return chain
+
+def to_long(chain):
+    """
+    One row per expiry/strike/side with unprefixed value columns.
+    """
+    parts = []
+    for side in SIDES:
+        part = chain[['expiry', 'strike']].copy()
+        part['side'] = side
+        for col in NSE_FIELDS:
+            part[col] = chain[f"{side}_{col}"].values
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+def _for_expiry(chain, expiry):
+    return chain if expiry is None else chain[chain['expiry'] == expiry]
+
+def put_call_ratio(chain, expiry=None):
+    """
+    Put-call ratio of open interest and of traded volume for each expiry.
+    """
+    chain = _for_expiry(chain, expiry)
+    totals = chain.groupby('expiry', sort=False)[['CE_open_interest', 'PE_open_interest', 'CE_volume', 'PE_volume']].sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            'pcr_oi': totals['PE_open_interest'] / totals['CE_open_interest'].replace(0, np.nan),
+            'pcr_volume': totals['PE_volume'] / totals['CE_volume'].replace(0, np.nan)
+        })
+
+def pain_curve(chain, expiry=None):
+    """
+    Total option-writer payout if each expiry settles at each listed strike.
+
+    For strikes K sorted ascending with call OI c and put OI p, settling at
+    K[j] pays K[j]*sum(c[:j+1]) - sum(c*K)[:j+1] to calls and
+    sum(p*K)[j:] - K[j]*sum(p[j:]) to puts, so the whole curve comes from
+    running sums instead of an all-strikes-by-all-strikes product.
+    """
+    chain = _for_expiry(chain, expiry)
+    strike = chain['strike'].values
+    calls = chain['CE_open_interest'].values.astype(np.float64)
+    puts = chain['PE_open_interest'].values.astype(np.float64)
+    groups = chain['expiry'].values
+
+    frame = pd.DataFrame({'expiry': groups, 'c': calls, 'ck': calls * strike, 'p': puts, 'pk': puts * strike})
+    by_expiry = frame.groupby('expiry', sort=False)
+    cum = by_expiry[['c', 'ck', 'p', 'pk']].cumsum()
+    total = by_expiry[['p', 'pk']].transform('sum')
+
+    # Put sums from j to the end of the expiry = group total - sum before j
+    puts_from = total['p'].values - cum['p'].values + puts
+    put_value_from = total['pk'].values - cum['pk'].values + puts * strike
+
+    pain = (strike * cum['c'].values - cum['ck'].values) + (put_value_from - strike * puts_from)
+    return pd.DataFrame({'expiry': groups, 'strike': strike, 'pain': pain}, index=chain.index)
+
+def max_pain(chain, expiry=None):
+    """
+    Max-pain strike (lowest total writer payout) for each expiry.
+    """
+    curve = pain_curve(chain, expiry)
+    if curve.empty:
+        return pd.Series(dtype=np.float64, name='max_pain')
+    lowest = curve.groupby('expiry', sort=False)['pain'].idxmin()
+    return pd.Series(curve.loc[lowest.values, 'strike'].values, index=lowest.index, name='max_pain')
+
+def oi_walls(chain, top=3, expiry=None):
+    """
+    The top strikes by open interest for calls (resistance) and puts
+    (support) in each expiry.
+    """
+    long_chain = to_long(_for_expiry(chain, expiry))
+    ranked = long_chain.sort_values('open_interest', ascending=False, kind='stable')
+    walls = ranked.groupby(['expiry', 'side'], sort=False).head(top)
+    return walls[['expiry', 'side', 'strike', 'open_interest', 'change_oi']].reset_index(drop=True)
+
+def classify_buildup(chain):
+    """
+    Label every CE and PE leg from its price and OI change:
+    price up + OI up = Long Buildup, price down + OI up = Short Buildup,
+    price up + OI down = Short Covering, price down + OI down = Long Unwinding.
+    Anything flat is Neutral. Adds CE_buildup and PE_buildup columns.
+    """
+    result = chain.copy()
+    for side in SIDES:
+        price_up = chain[f"{side}_change"].values > 0
+        price_down = chain[f"{side}_change"].values < 0
+        oi_up = chain[f"{side}_change_oi"].values > 0
+        oi_down = chain[f"{side}_change_oi"].values < 0
+        result[f"{side}_buildup"] = np.select(
+            [price_up & oi_up, price_down & oi_up, price_up & oi_down, price_down & oi_down],
+            BUILDUP_LABELS, default='Neutral')
+    return result
+
+def chain_summary(chain, top=3):
+    """
+    PCR, max pain and OI walls for every expiry in one dict.
+    """
+    if chain.empty:
+        return {}
+    pcr = put_call_ratio(chain)
+    pain = max_pain(chain)
+    walls = oi_walls(chain, top=top)
+    summary = {}
+    for expiry in pcr.index:
+        expiry_walls = walls[walls['expiry'] == expiry]
+        summary[expiry] = {
+            'pcr_oi': pcr.at[expiry, 'pcr_oi'],
+            'pcr_volume': pcr.at[expiry, 'pcr_volume'],
+            'max_pain': pain.get(expiry),
+            'call_walls': expiry_walls.loc[expiry_walls['side'] == 'CE', 'strike'].tolist(),
+            'put_walls': expiry_walls.loc[expiry_walls['side'] == 'PE', 'strike'].tolist()
+        }
+    return summary
@@ -0,0 +1,175 @@
+import glob
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pytz
+from datetime import datetime
+from option_chain import NSE_FIELDS, to_long
+
+# Root of the option-chain snapshot store (set OPTION_SNAPSHOT_DIR to relocate it);
+# simulated chains are kept apart from real ones like simulated bars in bar_store
+OPTION_SNAPSHOT_DIR = os.getenv('OPTION_SNAPSHOT_DIR') or ('fo_snapshots_simulator' if os.getenv('MARKET_SIMULATOR_URL') else 'fo_snapshots')
+SNAPSHOT_COMPRESSION = os.getenv('SNAPSHOT_COMPRESSION', 'zstd')
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# One row per strike/expiry/side per snapshot
+KEY_COLUMNS = ['expiry', 'strike', 'side']
+VALUE_COLUMNS = list(NSE_FIELDS)
+
+# Last stored state per symbol, used to write only changed rows
+_last_state = {}
+_lock = threading.Lock()
+
+def _typed(rows):
+    """
+    Apply the store's column types.
+    """
+    rows['expiry'] = rows['expiry'].astype(str)
+    rows['strike'] = rows['strike'].astype(np.float64)
+    rows['side'] = rows['side'].astype(str)
+    for col in ('open_interest', 'change_oi', 'volume'):
+        rows[col] = rows[col].fillna(0).astype(np.int64)
+    rows['iv'] = rows['iv'].astype(np.float32)
+    for col in ('last_price', 'change'):
+        rows[col] = rows[col].astype(np.float64)
+    return rows
+
+def chain_to_rows(fo_data):
+    """
+    Turn a get_fo_data chain (flat CE_*/PE_* columns per strike) into one
+    row per expiry/strike/side.
+    """
+    if fo_data.empty:
+        return pd.DataFrame(columns=KEY_COLUMNS + VALUE_COLUMNS)
+    return _typed(to_long(fo_data))
+
+def _day_dir(symbol, day):
+    return os.path.join(OPTION_SNAPSHOT_DIR, f"symbol={symbol.upper()}", f"date={day.strftime('%Y%m%d')}")
+
+def _day_files(symbol, start_day, end_day):
+    files = []
+    for day in pd.date_range(start_day, end_day, freq='D'):
+        files.extend(sorted(glob.glob(os.path.join(_day_dir(symbol, day), '*.parquet'))))
+    return files
+
+def _latest_rows(rows):
+    """
+    Keep the most recent row for every expiry/strike/side.
+    """
+    if rows.empty:
+        return rows
+    rows = rows.sort_values('snapshot_time', kind='stable')
+    return rows.drop_duplicates(KEY_COLUMNS, keep='last').reset_index(drop=True)
+
+def append_snapshot(symbol, fo_data, snapshot_time=None):
+    """
+    Append one option-chain snapshot. Only rows that are new or changed
+    since the previous snapshot of the day are written, as a compressed
+    Parquet part file. Returns the number of rows written.
+    """
+    snapshot_time = pd.Timestamp(snapshot_time or datetime.now(IST))
+    if snapshot_time.tzinfo is None:
+        snapshot_time = snapshot_time.tz_localize(IST)
+    snapshot_time = snapshot_time.tz_convert(IST)
+    day = snapshot_time.normalize()
+
+    rows = fo_data if 'side' in fo_data.columns else chain_to_rows(fo_data)
+    if rows.empty:
+        return 0
+
+    with _lock:
+        state = _last_state.get(symbol)
+        if state is None or state[0] != day:
+            # First snapshot of the day in this process: rebuild state from disk
+            previous = read_snapshots(symbol, start=day, end=snapshot_time)
+            state = (day, _latest_rows(previous))
+
+        previous = state[1]
+        if previous.empty:
+            changed = rows
+        else:
+            merged = rows.merge(previous[KEY_COLUMNS + VALUE_COLUMNS], on=KEY_COLUMNS, how='left',
+                                suffixes=('', '_prev'), indicator=True)
+            differs = merged['_merge'] == 'left_only'
+            for col in VALUE_COLUMNS:
+                # NaN (common for iv/last_price on far strikes) equals NaN here
+                current, prior = merged[col].to_numpy(), merged[col + '_prev'].to_numpy()
+                differs |= ~((current == prior) | (pd.isna(current) & pd.isna(prior)))
+            changed = rows[differs.values]
+
+        if not changed.empty:
+            changed = changed.copy()
+            changed.insert(0, 'snapshot_time', snapshot_time)
+            path = _day_dir(symbol, day)
+            os.makedirs(path, exist_ok=True)
+            # Microseconds plus a counter: a part never replaces an earlier one
+            stem = f"part-{snapshot_time.strftime('%H%M%S%f')}"
+            filename, count = os.path.join(path, f"{stem}.parquet"), 1
+            while os.path.exists(filename):
+                filename = os.path.join(path, f"{stem}-{count}.parquet")
+                count += 1
+            changed.to_parquet(filename + '.tmp', compression=SNAPSHOT_COMPRESSION, index=False)
+            os.replace(filename + '.tmp', filename)
+            previous = _latest_rows(pd.concat([previous, changed], ignore_index=True) if not previous.empty else changed)
+
+        _last_state[symbol] = (day, previous)
+        return len(changed)
+
+def read_snapshots(symbol, start=None, end=None, strike_min=None, strike_max=None, expiry=None):
+    """
+    Read stored change rows for a time range (default: today) and optional
+    strike range / expiry. Only the day directories in range are opened and
+    the strike/time filters are pushed down into the Parquet reader.
+    """
+    now = datetime.now(IST)
+    start = pd.Timestamp(start) if start is not None else pd.Timestamp(now).normalize()
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp(now)
+    if start.tzinfo is None:
+        start = start.tz_localize(IST)
+    if end.tzinfo is None:
+        end = end.tz_localize(IST)
+
+    files = _day_files(symbol, start.tz_convert(IST).normalize().tz_localize(None),
+                       end.tz_convert(IST).normalize().tz_localize(None))
+    if not files:
+        return pd.DataFrame(columns=['snapshot_time'] + KEY_COLUMNS + VALUE_COLUMNS)
+
+    filters = [('snapshot_time', '>=', start), ('snapshot_time', '<=', end)]
+    if strike_min is not None:
+        filters.append(('strike', '>=', float(strike_min)))
+    if strike_max is not None:
+        filters.append(('strike', '<=', float(strike_max)))
+    if expiry is not None:
+        filters.append(('expiry', '==', expiry))
+
+    return pd.read_parquet(files, filters=filters)
+
+def chain_at(symbol, when=None, strike_min=None, strike_max=None):
+    """
+    Reconstruct the full option chain as of a point in time.
+    """
+    when = pd.Timestamp(when or datetime.now(IST))
+    if when.tzinfo is None:
+        when = when.tz_localize(IST)
+    rows = read_snapshots(symbol, start=when.tz_convert(IST).normalize(), end=when,
+                          strike_min=strike_min, strike_max=strike_max)
+    return _latest_rows(rows)
+
+def oi_evolution(symbol, day=None, strike_min=None, strike_max=None, expiry=None, field='open_interest'):
+    """
+    A session's evolution of one field: snapshot times down the index and
+    (expiry, strike, side) across the columns, forward-filled between the
+    snapshots in which each contract changed.
+    """
+    day = pd.Timestamp(day or datetime.now(IST))
+    if day.tzinfo is None:
+        day = day.tz_localize(IST)
+    day = day.tz_convert(IST).normalize()
+    rows = read_snapshots(symbol, start=day, end=day + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1),
+                          strike_min=strike_min, strike_max=strike_max, expiry=expiry)
+    if rows.empty:
+        return pd.DataFrame()
+    panel = rows.pivot_table(index='snapshot_time', columns=KEY_COLUMNS, values=field, aggfunc='last')
+    return panel.ffill()
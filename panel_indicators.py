@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from indicator_engine import INDICATORS, IndicatorEngine
+
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def build_panel(frames, fields=PANEL_FIELDS):
+    """
+    Align per-symbol OHLCV frames on the union of their timestamps. Returns
+    field -> (time x symbol) DataFrame; a symbol has NaN rows where it has
+    no bar (before listing, halts, missing data).
+    """
+    symbols = list(frames)
+    index = frames[symbols[0]].index if symbols else pd.DatetimeIndex([])
+    for symbol in symbols[1:]:
+        if not frames[symbol].index.equals(index):
+            index = index.union(frames[symbol].index)
+
+    arrays = {field: np.full((len(index), len(symbols)), np.nan) for field in fields}
+    for j, symbol in enumerate(symbols):
+        data = frames[symbol]
+        rows = index.get_indexer(data.index)
+        for field in fields:
+            if field in data:
+                arrays[field][rows, j] = data[field].to_numpy(dtype=np.float64)
+    return {field: pd.DataFrame(values, index=index, columns=symbols) for field, values in arrays.items()}
+
+def _field(panel, field):
+    values = panel[field]
+    if isinstance(values, pd.DataFrame):
+        return values.to_numpy(dtype=np.float64)
+    return np.asarray(values, dtype=np.float64)
+
+def _pack(panel):
+    """
+    Move each symbol's bars (rows with a Close) to the top of its column,
+    padding the tail with the last bar. Every column then starts at row 0
+    with no gaps, which is the same series the symbol would have on its
+    own, and the dense block keeps the engine on its single-filter path.
+    Indicators are causal, so the padding never affects real rows.
+    """
+    close = _field(panel, 'Close')
+    valid = ~np.isnan(close)
+    counts = valid.sum(axis=0)
+    order = np.argsort(~valid, axis=0, kind='stable')  # valid rows first, in time order
+    rows = np.arange(len(close))[:, None]
+    order = np.where(rows < counts, order, order[np.maximum(counts - 1, 0), np.arange(close.shape[1])])
+    packed = {field: np.take_along_axis(_field(panel, field), order, axis=0)
+              for field in PANEL_FIELDS if field in panel}
+    return packed, order, rows < counts
+
+def _unpack(values, order, valid, shape):
+    out = np.full(shape, np.nan)
+    columns = np.broadcast_to(np.arange(shape[1]), shape)
+    out[order[valid], columns[valid]] = values[valid]
+    return out
+
+def panel_indicators(panel, names=None):
+    """
+    Compute indicators for every symbol of a panel at once: a dict of
+    field -> (time x symbol) DataFrame as build_panel returns (or arrays).
+    Each symbol is computed over its own bars only, so symbols with
+    different listing dates or gaps give the same values they would alone,
+    with NaN at timestamps where they have no bar. Returns
+    name -> (time x symbol) DataFrame (arrays for array input).
+    """
+    close = panel['Close']
+    shape = np.shape(close)
+    packed, order, valid = _pack(panel)
+    live = valid[0]  # symbols with at least one bar
+    engine = IndicatorEngine({field: values[:, live] for field, values in packed.items()})
+
+    results = {}
+    for name in (names or INDICATORS):
+        method, kwargs = INDICATORS[name]
+        values = np.full(shape, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values[:, live] = getattr(engine, method)(**kwargs)
+        values = _unpack(values, order, valid, shape)
+        if isinstance(close, pd.DataFrame):
+            values = pd.DataFrame(values, index=close.index, columns=close.columns)
+        results[name] = values
+    return results
+
+def latest_panel(panel, names=None):
+    """
+    Each symbol's indicators as of its own last bar: a symbol x indicator
+    DataFrame, the shape a universe scan ranks or filters.
+    """
+    close = panel['Close']
+    packed, order, valid = _pack(panel)
+    live = valid[0]
+    last = valid.sum(axis=0) - 1
+    engine = IndicatorEngine({field: values[:, live] for field, values in packed.items()})
+
+    latest = {}
+    for name in (names or INDICATORS):
+        method, kwargs = INDICATORS[name]
+        values = np.full(np.shape(close)[1], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values[live] = getattr(engine, method)(**kwargs)[last[live], np.arange(live.sum())]
+        latest[name] = values
+    symbols = close.columns if isinstance(close, pd.DataFrame) else None
+    return pd.DataFrame(latest, index=symbols)
@@ -0,0 +1,290 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from swing_points import SwingIndex
+
+# Histogram resolution of a volume profile (bins are merged, never added)
+PROFILE_BINS = 200
+VALUE_AREA = 0.7
+
+# Swings closer than this fraction of price are one level
+LEVEL_TOLERANCE = 0.003
+# Bars a LevelEngine keeps; levels cover between one and two windows of bars
+LEVEL_WINDOW_BARS = int(os.getenv('LEVEL_WINDOW_BARS', '2000'))
+# Rebuild the profile when its bins are this many times wider than the held bars need
+LEVEL_MAX_COARSENING = 4
+
+class VolumeProfile:
+    """
+    Volume-at-price histogram over a fixed number of equal bins. Each bar's
+    volume is spread evenly over its low-high range. When a price falls
+    outside the grid the bin width is doubled (adjacent bins merged) until
+    it fits, so memory and query cost stay bounded by `bins`. Bars up to the
+    last one seen are skipped, so a rolling window can be fed as a whole; a
+    bar with the same timestamp as the last one replaces it (forming bars).
+    The grid never narrows again: a bar that stretched the range (even a
+    forming bar later revised back) leaves the bins coarse until the profile
+    is rebuilt from its bars, which LevelEngine does when that happens.
+    """
+    def __init__(self, data=None, bins=PROFILE_BINS):
+        self.bins = bins
+        self.volume = np.zeros(bins)
+        self.lower = None
+        self.width = None
+        self._last = None  # (timestamp, low, high, volume) of the last bar
+        if data is not None:
+            self.update(data)
+
+    @property
+    def edges(self):
+        return self.lower + self.width * np.arange(self.bins + 1)
+
+    @property
+    def centers(self):
+        return self.lower + self.width * (np.arange(self.bins) + 0.5)
+
+    def _fit(self, low, high):
+        if self.lower is None:
+            span = high - low
+            self.width = span / (self.bins - 1) if span > 0 else max(abs(high), 1.0) * 1e-4
+            self.lower = low - self.width / 2
+            return
+        # Empty bins may be dropped; only the occupied range must stay covered
+        occupied = np.flatnonzero(self.volume)
+        if len(occupied):
+            low = min(low, self.lower + self.width * occupied[0])
+            high = max(high, self.lower + self.width * (occupied[-1] + 1))
+        if low >= self.lower and high <= self.lower + self.width * self.bins:
+            return
+        factor = 1
+        while True:
+            width = self.width * factor
+            # Aligned to the old edges so every old bin lands inside one new bin
+            lower = self.lower + np.floor((low - self.lower) / width) * width
+            if lower + width * self.bins >= high:
+                break
+            factor *= 2
+        offset = int(round((lower - self.lower) / self.width))
+        index = (np.arange(self.bins) - offset) // factor
+        keep = self.volume != 0
+        self.volume = np.bincount(index[keep], weights=self.volume[keep], minlength=self.bins)
+        self.lower, self.width = lower, width
+
+    def _add(self, low, high, volume, sign=1.0):
+        """
+        Spread volume over [low, high] with exact bin overlaps: the volume
+        below each edge is a piecewise-linear function of the edge.
+        """
+        low, high, volume = np.asarray(low, float), np.asarray(high, float), np.asarray(volume, float)
+        ok = ~(np.isnan(low) | np.isnan(high) | np.isnan(volume))
+        low, high, volume = low[ok], high[ok], volume[ok]
+        span = high - low
+        point = span <= 0
+        if point.any():
+            index = np.clip(((low[point] - self.lower) // self.width).astype(int), 0, self.bins - 1)
+            self.volume += sign * np.bincount(index, weights=volume[point], minlength=self.bins)
+        low, high, density = low[~point], high[~point], volume[~point] / span[~point]
+        if len(low):
+            # below(x) = sum over bars with low < x of d * (x - low)
+            #          - sum over bars with high < x of d * (x - high)
+            edges = self.edges
+            below = np.zeros(len(edges))
+            for ends, weight in ((low, 1.0), (high, -1.0)):
+                order = np.argsort(ends)
+                cum_density = np.concatenate([[0.0], np.cumsum(density[order])])
+                cum_moment = np.concatenate([[0.0], np.cumsum(density[order] * ends[order])])
+                k = np.searchsorted(ends[order], edges)
+                below += weight * (edges * cum_density[k] - cum_moment[k])
+            self.volume += sign * np.diff(below)
+
+    def update(self, bars):
+        """
+        Add bars (a DataFrame with High/Low/Volume).
+        """
+        if bars.empty:
+            return
+        bars = bars.sort_index()
+        if self._last is not None:
+            # Bars before the last one are already counted; the last one is replaced
+            bars = bars[bars.index >= self._last[0]]
+            if bars.empty:
+                return
+            if bars.index[0] == self._last[0]:
+                self._add(*self._last[1:], sign=-1.0)
+        low, high = bars['Low'].to_numpy(float), bars['High'].to_numpy(float)
+        if np.isnan(low).all():
+            return
+        self._fit(np.nanmin(low), np.nanmax(high))
+        volume = bars['Volume'].to_numpy(float)
+        self._add(low, high, volume)
+        self._last = (bars.index[-1], low[-1:], high[-1:], volume[-1:])
+
+    def poc(self):
+        """
+        Point of control: center of the highest-volume bin.
+        """
+        return float(self.centers[np.argmax(self.volume)]) if self.volume.any() else np.nan
+
+    def value_area(self, fraction=VALUE_AREA):
+        """
+        (low, high) of the highest-volume bins holding `fraction` of all volume.
+        """
+        total = self.volume.sum()
+        if total <= 0:
+            return np.nan, np.nan
+        order = np.argsort(self.volume)[::-1]
+        count = int(np.searchsorted(np.cumsum(self.volume[order]), fraction * total)) + 1
+        chosen = order[:count]
+        return float(self.lower + self.width * chosen.min()), float(self.lower + self.width * (chosen.max() + 1))
+
+    def to_frame(self):
+        return pd.DataFrame({'price': self.centers, 'volume': self.volume})
+
+def cluster_levels(prices, kinds=None, times=None, tolerance=LEVEL_TOLERANCE):
+    """
+    Group swing prices into horizontal levels: sorted prices split wherever
+    the gap to the next exceeds tolerance * price. Returns one row per level
+    (price = mean of its swings, touches, highs, lows, last_touch), ranked
+    by touches then recency.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) == 0:
+        return pd.DataFrame(columns=['price', 'touches', 'highs', 'lows', 'last_touch'])
+    kinds = np.zeros(len(prices), dtype=int) if kinds is None else np.asarray(kinds)
+    order = np.argsort(prices, kind='stable')
+    sorted_prices = prices[order]
+    # Split at gaps wider than the tolerance, then cut long chains of close
+    # swings into bands no wider than the tolerance
+    chain = np.concatenate([[0], np.cumsum(np.diff(sorted_prices) > tolerance * sorted_prices[1:])])
+    chain_low = sorted_prices[np.r_[0, np.flatnonzero(np.diff(chain)) + 1]][chain]
+    band = np.floor((sorted_prices - chain_low) / (tolerance * chain_low)).astype(np.int64)
+    group = np.concatenate([[0], np.cumsum((np.diff(chain) != 0) | (np.diff(band) != 0))])
+
+    frame = pd.DataFrame({'group': group, 'price': sorted_prices,
+                          'high': kinds[order] == 1, 'low': kinds[order] == -1})
+    if times is not None:
+        frame['time'] = pd.Series(times).iloc[order].reset_index(drop=True)
+    grouped = frame.groupby('group')
+    levels = pd.DataFrame({
+        'price': grouped['price'].mean(),
+        'touches': grouped.size(),
+        'highs': grouped['high'].sum(),
+        'lows': grouped['low'].sum(),
+        'last_touch': grouped['time'].max() if times is not None else np.nan,
+    })
+    return levels.sort_values(['touches', 'last_touch'], ascending=False, kind='stable').reset_index(drop=True)
+
+class LevelEngine:
+    """
+    Horizontal price levels of one symbol, maintained per bar: a bounded
+    volume profile (POC, value area) and swing points clustered into ranked
+    levels with touch counts. Queries read cached results that are rebuilt
+    only after an update, so the dashboard can ask for levels repeatedly
+    without recomputing anything from the bars. The last `window` bars are
+    held; once twice that many have been seen, or when the profile's bins
+    have grown much coarser than the held range needs, the profile and
+    swings are rebuilt from the last `window` bars. One engine may be shared
+    across threads: updates and queries take its lock.
+    """
+    def __init__(self, data=None, bins=PROFILE_BINS, scale=5, tolerance=LEVEL_TOLERANCE,
+                 window=LEVEL_WINDOW_BARS):
+        self.bins = bins
+        self.scale = scale
+        self.tolerance = tolerance
+        self.window = window
+        self._lock = threading.RLock()
+        self._bars = None
+        self._reset()
+        if data is not None:
+            self.update(data)
+
+    def _reset(self):
+        self.profile = VolumeProfile(bins=self.bins)
+        self.swings = SwingIndex(scales=(self.scale,))
+        self._levels = None
+        self._prices = None
+
+    def _too_coarse(self):
+        if self.profile.width is None:
+            return False
+        span = np.nanmax(self._bars['High'].to_numpy(float)) - np.nanmin(self._bars['Low'].to_numpy(float))
+        return span > 0 and self.profile.width > LEVEL_MAX_COARSENING * span / (self.bins - 1)
+
+    def update(self, bars):
+        if bars.empty:
+            return
+        with self._lock:
+            bars = bars.sort_index()
+            if self._bars is None:
+                self._bars = bars
+            else:
+                # Same rule as the profile: older bars are skipped, the last one is replaced
+                bars = bars[bars.index >= self._bars.index[-1]]
+                if bars.empty:
+                    return
+                self._bars = pd.concat([self._bars[self._bars.index < bars.index[0]], bars])
+            if len(self._bars) > 2 * self.window:
+                self._bars = self._bars.iloc[-self.window:]
+                bars = self._bars
+                self._reset()
+            self.profile.update(bars)
+            self.swings.update(bars)
+            if self._too_coarse():
+                self._reset()
+                self.profile.update(self._bars)
+                self.swings.update(self._bars)
+            self._levels = None
+            self._prices = None
+
+    def levels(self, top=None):
+        """
+        Clustered swing levels, most touched first.
+        """
+        with self._lock:
+            if self._levels is None:
+                swings = self.swings.swings(self.scale)
+                self._levels = cluster_levels(swings['price'], swings['kind'], swings['timestamp'], self.tolerance)
+            levels = self._levels
+        return levels if top is None else levels.head(top)
+
+    def level_prices(self):
+        """
+        Sorted level prices as an array (cached).
+        """
+        with self._lock:
+            if self._prices is None:
+                self._prices = np.sort(self.levels()['price'].to_numpy(dtype=np.float64))
+            return self._prices
+
+    def nearest(self, price):
+        """
+        (support, resistance): the closest level at or below and above price.
+        """
+        prices = self.level_prices()
+        i = int(np.searchsorted(prices, price, side='right'))
+        support = float(prices[i - 1]) if i > 0 else np.nan
+        resistance = float(prices[i]) if i < len(prices) else np.nan
+        return support, resistance
+
+    def summary(self, price=None, top=5):
+        with self._lock:
+            poc = self.profile.poc()
+            value_low, value_high = self.profile.value_area()
+            summary = {'poc': poc, 'value_area_low': value_low, 'value_area_high': value_high,
+                       'levels': self.levels(top)['price'].tolist()}
+            if price is not None:
+                summary['support'], summary['resistance'] = self.nearest(price)
+        return summary
+
+def levels_around(close, levels):
+    """
+    For each bar, the nearest level at or below and above its previous
+    close, as (support, resistance) Series. levels is an array of prices or
+    a LevelEngine.
+    """
+    prices = levels.level_prices() if isinstance(levels, LevelEngine) else np.sort(np.asarray(levels, dtype=np.float64))
+    reference = close.shift().fillna(close).to_numpy(dtype=np.float64)
+    padded = np.concatenate([[np.nan], prices, [np.nan]])
+    i = np.searchsorted(prices, reference, side='right')
+    return pd.Series(padded[i], index=close.index), pd.Series(padded[i + 1], index=close.index)
@@ -1,22 +1,37 @@
 import pandas as pd
 
-def price_rejection(data, threshold=0.02):
+def _reference_levels(data, levels):
+    """
+    (resistance, support) per bar: rolling highs/lows by default, or the
+    nearest given horizontal levels above/below the previous close.
+    """
+    if levels is None:
+        return find_support_resistance(data)
+    support, resistance = levels_around(data['Close'], levels)
+    return resistance, support
+
+def price_rejection(data, threshold=0.02, levels=None):
     """
     Price rejection: Touches level but reverses.
+    levels: optional level prices (or a price_levels.LevelEngine) to test
+    against instead of the rolling highs/lows.
     """
-    highs, lows = find_support_resistance(data)
+    highs, lows = _reference_levels(data, levels)
     rejection_up = (data['High'] > highs * (1 - threshold)) & (data['Close'] < highs * (1 - threshold))
     rejection_down = (data['Low'] < lows * (1 + threshold)) & (data['Close'] > lows * (1 + threshold))
     return rejection_up, rejection_down
 
-def price_acceptance(data, threshold=0.02):
+def price_acceptance(data, threshold=0.02, levels=None):
     """
     Price acceptance: Breaks and holds.
+    levels: optional level prices (or a price_levels.LevelEngine) to test
+    against instead of the rolling highs/lows.
     """
-    highs, lows = find_support_resistance(data)
+    highs, lows = _reference_levels(data, levels)
     acceptance_up = (data['Close'] > highs * (1 + threshold)) & (data['Close'].shift() > highs.shift() * (1 + threshold))
     acceptance_down = (data['Close'] < lows * (1 - threshold)) & (data['Close'].shift() < lows.shift() * (1 - threshold))
     return acceptance_up, acceptance_down
 
 # Import for S/R
 from support_resistance import find_support_resistance
+from price_levels import levels_around
@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: quota file updates are not locked across processes
+    fcntl = None
+
+# Priority classes: scheduled refreshes may queue for a token and use the
+# whole quota, ad-hoc UI requests never wait and leave a reserve untouched
+PRIORITY_SCHEDULED = 'scheduled'
+PRIORITY_INTERACTIVE = 'interactive'
+
+# Free-tier limits as (requests per minute, requests per day); None = unlimited.
+# Override with e.g. RATE_LIMIT_TWELVE_DATA=8/800
+PROVIDER_LIMITS = {
+    'polygon': (5, None),
+    'fmp': (None, 250),
+    'twelve_data': (8, 800),
+    'alpha_vantage': (5, 25),
+}
+
+QUOTA_FILE = os.getenv('QUOTA_FILE', 'provider_quota.json')
+INTERACTIVE_RESERVE = float(os.getenv('INTERACTIVE_RESERVE', '0.2'))  # Share of each quota kept for scheduled work
+SCHEDULED_MAX_WAIT = float(os.getenv('SCHEDULED_MAX_WAIT', '15'))
+
+def _parse_limit(value):
+    per_minute, _, per_day = value.partition('/')
+    return (int(per_minute) if per_minute.strip() else None,
+            int(per_day) if per_day.strip() else None)
+
+def _utc_day():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at rate_per_minute.
+    """
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.refill_per_second = rate_per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def seconds_until(self, tokens):
+        """
+        Seconds until the bucket holds at least `tokens` tokens.
+        """
+        self.refill()
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.refill_per_second
+
+class RateLimiter:
+    """
+    Per-provider token buckets plus daily quota counters persisted to
+    QUOTA_FILE so a restart does not forget how much of the day's quota has
+    been used.
+    """
+    def __init__(self, limits=None, quota_file=QUOTA_FILE, interactive_reserve=INTERACTIVE_RESERVE):
+        limits = dict(PROVIDER_LIMITS if limits is None else limits)
+        for provider in list(limits):
+            override = os.getenv(f"RATE_LIMIT_{provider.upper()}")
+            if override:
+                limits[provider] = _parse_limit(override)
+
+        self.limits = limits
+        self.quota_file = quota_file
+        self.interactive_reserve = interactive_reserve
+        self._buckets = {p: TokenBucket(per_minute) for p, (per_minute, _) in limits.items() if per_minute}
+        self._condition = threading.Condition()
+        self._day = _utc_day()
+        self._usage = self._load_usage()
+
+    def _load_usage(self):
+        try:
+            with open(self.quota_file) as f:
+                saved = json.load(f)
+            if saved.get('day') == self._day:
+                return saved.get('usage', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save_usage(self):
+        tmp_path = f"{self.quota_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'day': self._day, 'usage': self._usage}, f)
+            os.replace(tmp_path, self.quota_file)
+        except OSError as e:
+            print(f"Could not persist provider quota usage: {e}")
+
+    @contextmanager
+    def _quota_file_lock(self):
+        """
+        Exclusive lock on QUOTA_FILE's companion .lock file. Flask,
+        Streamlit and the main loop each have their own limiter, so the
+        file, not the in-memory counters, is the source of truth: usage is
+        re-read, checked and incremented while holding this lock.
+        """
+        try:
+            handle = open(self.quota_file + '.lock', 'a')
+        except OSError:
+            handle = None
+        try:
+            if handle is not None and fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
+        finally:
+            if handle is not None:
+                handle.close()  # closing releases the lock
+
+    def _roll_day(self):
+        today = _utc_day()
+        if today != self._day:
+            self._day = today
+            self._usage = {}
+
+    def _daily_allowance(self, provider, priority):
+        per_day = self.limits.get(provider, (None, None))[1]
+        if per_day is None:
+            return None
+        if priority == PRIORITY_INTERACTIVE:
+            return int(per_day * (1 - self.interactive_reserve))
+        return per_day
+
+    def _minute_floor(self, bucket, priority):
+        # Interactive requests may only spend tokens above the reserve
+        if priority == PRIORITY_INTERACTIVE:
+            return 1.0 + bucket.capacity * self.interactive_reserve
+        return 1.0
+
+    def remaining(self, provider):
+        """
+        Requests left today for a provider (None if it has no daily quota).
+        """
+        with self._condition:
+            self._roll_day()
+            per_day = self.limits.get(provider, (None, None))[1]
+            if per_day is None:
+                return None
+            self._usage = self._load_usage()
+            return max(per_day - self._usage.get(provider, 0), 0)
+
+    def acquire(self, provider, priority=PRIORITY_INTERACTIVE, timeout=None, deadline=None):
+        """
+        Take one request slot for provider. Scheduled requests wait up to
+        timeout (default SCHEDULED_MAX_WAIT) for the per-minute bucket;
+        interactive requests never wait. deadline (a time.monotonic()
+        value) caps the wait further, so a caller with its own timeout
+        never gets a slot after it has given up. Returns False when the
+        caller should route to another provider instead.
+        """
+        if provider not in self.limits:
+            return True
+        if timeout is None:
+            timeout = SCHEDULED_MAX_WAIT if priority == PRIORITY_SCHEDULED else 0.0
+        wait_deadline = time.monotonic() + timeout
+        if deadline is not None:
+            wait_deadline = min(wait_deadline, deadline)
+
+        with self._condition:
+            while True:
+                with self._quota_file_lock():
+                    self._roll_day()
+                    self._usage = self._load_usage()  # includes other processes' calls
+                    allowance = self._daily_allowance(provider, priority)
+                    if allowance is not None and self._usage.get(provider, 0) >= allowance:
+                        return False  # Waiting will not help until tomorrow
+
+                    bucket = self._buckets.get(provider)
+                    wait_for = 0.0
+                    if bucket is not None:
+                        wait_for = bucket.seconds_until(self._minute_floor(bucket, priority))
+
+                    if wait_for == 0.0:
+                        if bucket is not None:
+                            bucket.tokens -= 1
+                        self._usage[provider] = self._usage.get(provider, 0) + 1
+                        self._save_usage()
+                        return True
+
+                remaining = wait_deadline - time.monotonic()
+                if remaining <= 0 or wait_for > remaining:
+                    return False
+                self._condition.wait(wait_for)
+
+# Shared limiter for all provider fetches in this process
+limiter = RateLimiter()
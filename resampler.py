@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from fetch_cache import INTERVAL_SECONDS
+from market_calendar import IST, SESSION_OPEN, SESSION_CLOSE
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def _ist_index(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        return index.tz_localize(IST)
+    return index.tz_convert(IST)
+
+def bucket_starts(index, interval, origin=SESSION_OPEN):
+    """
+    Start of the target bar each timestamp falls into. Intraday buckets are
+    anchored to origin (the 09:15 IST session open) each day, so 15m/1h bars
+    line up with the exchange's own; daily buckets start at midnight IST.
+    """
+    index = _ist_index(index)
+    days = index.normalize()
+    if INTERVAL_SECONDS[interval] >= INTERVAL_SECONDS['1d']:
+        return days
+    step = np.int64(INTERVAL_SECONDS[interval]) * 10**9
+    day_ns = days.as_unit('ns').asi8 + origin.value
+    since_open = index.as_unit('ns').asi8 - day_ns
+    return pd.DatetimeIndex(day_ns + (since_open // step) * step, tz='UTC').tz_convert(IST)
+
+def resample_bars(data, interval, base_interval='5m', origin=SESSION_OPEN, session_close=SESSION_CLOSE):
+    """
+    Aggregate base bars into a higher timeframe: first Open, max High,
+    min Low, last Close, summed Volume. The Partial column marks bars whose
+    period (clipped to session_close, when given) extends past the end of
+    the last base bar, i.e. bars that are still forming.
+    """
+    if data.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS + ['Partial'])
+
+    data = data.sort_index()
+    index = _ist_index(data.index)
+    starts = bucket_starts(index, interval, origin).as_unit('ns').asi8
+
+    # Base bars are sorted, so each bucket is a contiguous run
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:] - 1, len(starts) - 1]
+
+    result = pd.DataFrame({
+        'Open': data['Open'].values[first],
+        'High': np.maximum.reduceat(data['High'].values, first),
+        'Low': np.minimum.reduceat(data['Low'].values, first),
+        'Close': data['Close'].values[last],
+        'Volume': np.add.reduceat(data['Volume'].values, first) if 'Volume' in data else 0
+    }, index=pd.DatetimeIndex(starts[first], tz='UTC').tz_convert(IST))
+
+    step = np.int64(INTERVAL_SECONDS[interval]) * 10**9
+    bucket_end = starts[first] + step
+    if session_close is not None:
+        day_ns = result.index.normalize().as_unit('ns').asi8
+        bucket_end = np.minimum(bucket_end, day_ns + session_close.value)
+    base_end = index[-1].as_unit('ns').value + np.int64(INTERVAL_SECONDS[base_interval]) * 10**9
+    result['Partial'] = bucket_end > base_end
+    return result
+
+class BarResampler:
+    """
+    Incrementally maintained higher-timeframe bars. Finished bars are kept;
+    only the base bars of the last (possibly still forming) bucket are held
+    and re-aggregated when new base bars arrive, so an update costs the size
+    of that bucket rather than the whole history. Base bars older than the
+    last bucket are assumed final and ignored.
+    """
+    def __init__(self, interval, base_interval='5m', origin=SESSION_OPEN, session_close=SESSION_CLOSE):
+        self.interval = interval
+        self.base_interval = base_interval
+        self.origin = origin
+        self.session_close = session_close
+        self._finished = pd.DataFrame(columns=OHLCV_COLUMNS + ['Partial'])
+        self._pending = pd.DataFrame()
+
+    @property
+    def bars(self):
+        """
+        All resampled bars, the last one flagged Partial while it forms.
+        """
+        if self._pending.empty:
+            return self._finished
+        tail = resample_bars(self._pending, self.interval, self.base_interval, self.origin, self.session_close)
+        if self._finished.empty:
+            return tail
+        return pd.concat([self._finished, tail])
+
+    def update(self, new_bars):
+        """
+        Feed base bars (a whole window or just the newest ones). Returns the
+        resampled bars that changed, i.e. from the last held bucket onwards.
+        """
+        if new_bars.empty:
+            return self._finished.iloc[:0]
+        new_bars = new_bars.sort_index()
+        new_bars = new_bars.set_axis(_ist_index(new_bars.index))
+
+        if not self._pending.empty:
+            pending_start = bucket_starts(self._pending.index[:1], self.interval, self.origin)[0]
+            new_bars = new_bars[new_bars.index >= pending_start]
+            if new_bars.empty:
+                return self._finished.iloc[:0]
+            # Revised base bars replace the held ones
+            base = pd.concat([self._pending[self._pending.index < new_bars.index[0]], new_bars])
+        else:
+            base = new_bars
+
+        changed = resample_bars(base, self.interval, self.base_interval, self.origin, self.session_close)
+        last_start = changed.index[-1]
+        finished = changed.iloc[:-1]
+        if not finished.empty:
+            if not self._finished.empty:
+                finished = pd.concat([self._finished[self._finished.index < finished.index[0]], finished])
+            self._finished = finished
+        self._pending = base[bucket_starts(base.index, self.interval, self.origin) >= last_start]
+        return changed
+
+    def discard_before(self, ts):
+        """
+        Drop finished bars that start before ts.
+        """
+        if not self._finished.empty:
+            self._finished = self._finished[self._finished.index >= ts]
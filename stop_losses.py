@@ -1,19 +1,143 @@
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from support_resistance import calculate_atr
 
-def initial_stop_loss(data, atr_multiplier=1.5):
+# Bars a simulated trade is held at most before a time exit
+STOP_HORIZON = 100
+# Entries simulated per block (bounds the entries x horizon working arrays)
+SIMULATION_BLOCK = 4096
+
+def initial_stop_loss(data, atr_multiplier=1.5, atr=None):
     """
-    Initial SL based on ATR.
+    Initial SL based on ATR. Pass atr (a Series or a number) when it is
+    already computed, e.g. by the indicator engine.
     """
-    from support_resistance import calculate_atr
-    atr = calculate_atr(data)
+    if atr is None:
+        atr = calculate_atr(data)
     sl_long = data['Close'] - atr * atr_multiplier
     sl_short = data['Close'] + atr * atr_multiplier
     return sl_long, sl_short
 
 def trailing_stop_loss(data, initial_sl, trail_percent=0.05):
     """
-    Trailing SL.
+    Trailing SL for a long position held from the first bar: the highest of
+    the initial stop and close * (1 - trail_percent) seen so far, so it only
+    ever moves up.
+    """
+    trail = data['Close'].to_numpy(dtype=np.float64) * (1 - trail_percent)
+    initial = np.broadcast_to(np.asarray(initial_sl, dtype=np.float64), trail.shape)
+    return pd.Series(np.fmax.accumulate(np.fmax(initial, trail)), index=data.index)
+
+def stop_candidates(data, method='atr', multiplier=3.0, percent=0.05, period=22, atr=None, direction=1):
+    """
+    The stop level each bar would justify on its own, before ratcheting:
+    atr: close -/+ multiplier * ATR; percent: close * (1 -/+ percent);
+    chandelier: highest high (lowest low for shorts) of `period` bars
+    -/+ multiplier * ATR. direction is 1 for longs, -1 for shorts.
+    """
+    close = data['Close']
+    if method == 'percent':
+        return close * (1 - direction * percent)
+    if atr is None:
+        atr = calculate_atr(data)
+    if method == 'atr':
+        return close - direction * multiplier * atr
+    if method == 'chandelier':
+        extreme = data['High'].rolling(period, min_periods=1).max() if direction == 1 else data['Low'].rolling(period, min_periods=1).min()
+        return extreme - direction * multiplier * atr
+    raise ValueError(f"Unknown stop method: {method}")
+
+def trailing_stop(data, method='atr', direction=1, **kwargs):
+    """
+    Ratcheting trailing stop for a position opened on the first bar: the
+    running maximum (minimum for shorts) of stop_candidates.
+    """
+    candidates = stop_candidates(data, method=method, direction=direction, **kwargs).to_numpy(dtype=np.float64)
+    accumulate = np.fmax.accumulate if direction == 1 else np.fmin.accumulate
+    return pd.Series(accumulate(candidates), index=data.index)
+
+def _entry_positions(data, entries):
+    """
+    Bar positions of entries given as a boolean mask, integer positions or
+    timestamps. Raises KeyError for a timestamp that is not a bar or a
+    position outside the data.
+    """
+    if isinstance(entries, pd.Series) and entries.dtype == bool:
+        return np.flatnonzero(entries.to_numpy())
+    entries = np.asarray(entries)
+    if entries.dtype == bool:
+        return np.flatnonzero(entries)
+    if np.issubdtype(entries.dtype, np.integer):
+        positions = entries.astype(np.int64)
+        bad = (positions < 0) | (positions >= len(data))
+        if bad.any():
+            raise KeyError(f"Entry positions outside the data: {positions[bad][:5].tolist()}")
+        return positions
+    times = pd.DatetimeIndex(entries)
+    positions = data.index.get_indexer(times)
+    if (positions < 0).any():
+        raise KeyError(f"Entry times not in the data: {list(times[positions < 0][:5])}")
+    return positions
+
+def simulate_stops(data, entries, direction=1, method='atr', horizon=STOP_HORIZON, **kwargs):
+    """
+    Simulate many trades at once. Each entry (bar positions, timestamps or
+    a boolean mask) buys (direction 1) or sells short (-1) at that bar's
+    close. From the next bar on, the stop is the best of the stop at entry
+    and the candidates (stop_candidates) of every bar since, and it is hit
+    when the bar's Low (High for shorts) reaches it. A gap through the stop
+    fills at the open. Trades still open after `horizon` bars, or at the end
+    of the data, exit at the last close.
+
+    All entries are evaluated together on entries x horizon windows with a
+    cumulative max, no per-trade loop. Returns one row per entry: entry_time,
+    entry_price, exit_time, exit_price, bars_held, stopped, return_pct.
     """
-    trail_amount = data['Close'] * trail_percent
-    trailing_sl = data['Close'] - trail_amount
-    return pd.Series([max(sl, trail) for sl, trail in zip(initial_sl, trailing_sl)], index=data.index)
+    positions = _entry_positions(data, entries)
+    n = len(data)
+    sign = float(direction)
+    pad = np.full(horizon, np.nan)
+    # Work in "long" space: shorts are mirrored by negating prices
+    close = np.concatenate([sign * data['Close'].to_numpy(dtype=np.float64), pad])
+    opens = np.concatenate([sign * data['Open'].to_numpy(dtype=np.float64), pad])
+    adverse = data['Low'] if direction == 1 else data['High']
+    adverse = np.concatenate([sign * adverse.to_numpy(dtype=np.float64), pad])
+    candidates = np.concatenate([sign * stop_candidates(data, method=method, direction=direction, **kwargs).to_numpy(dtype=np.float64), pad])
+
+    # Row e of each view is bars e .. e + horizon
+    close_w = sliding_window_view(close, horizon + 1)
+    open_w = sliding_window_view(opens, horizon + 1)
+    adverse_w = sliding_window_view(adverse, horizon + 1)
+    candidate_w = sliding_window_view(candidates, horizon + 1)
+
+    exit_offset = np.zeros(len(positions), dtype=np.int64)
+    exit_price = np.zeros(len(positions))
+    stopped = np.zeros(len(positions), dtype=bool)
+    for start in range(0, len(positions), SIMULATION_BLOCK):
+        rows = positions[start:start + SIMULATION_BLOCK]
+        # Stop in force during bar e + j: best candidate of bars e .. e + j - 1
+        stop = np.fmax.accumulate(candidate_w[rows, :-1], axis=1)
+        hit = adverse_w[rows, 1:] <= stop
+        any_hit = hit.any(axis=1)
+        first = np.where(any_hit, hit.argmax(axis=1), 0)
+        picked = np.arange(len(rows))
+
+        # No stop: the last available close within the horizon
+        last = np.minimum(n - 1 - rows, horizon)
+        fill = np.fmin(open_w[rows, 1:][picked, first], stop[picked, first])
+        exit_offset[start:start + len(rows)] = np.where(any_hit, first + 1, last)
+        exit_price[start:start + len(rows)] = np.where(any_hit, fill, close_w[rows, last])
+        stopped[start:start + len(rows)] = any_hit
+
+    entry_price = sign * close[positions]
+    exit_price = sign * exit_price
+    return pd.DataFrame({
+        'entry_time': data.index[positions],
+        'entry_price': entry_price,
+        'exit_time': data.index[positions + exit_offset],
+        'exit_price': exit_price,
+        'bars_held': exit_offset,
+        'stopped': stopped,
+        'return_pct': sign * (exit_price - entry_price) / entry_price * 100,
+    })
@@ -0,0 +1,384 @@
+import json
+import math
+import os
+from collections import deque
+
+NAN = float('nan')
+
+def _div(a, b):
+    """
+    a / b with NumPy's semantics for a zero divisor (inf or nan, no exception).
+    """
+    if b == 0:
+        return NAN if a == 0 or math.isnan(a) else math.copysign(math.inf, a)
+    return a / b
+
+_REGISTRY = {}
+
+def _dump(value):
+    if isinstance(value, StreamingIndicator):
+        return value.snapshot()
+    if isinstance(value, deque):
+        return {'deque': [_dump(v) for v in value], 'maxlen': value.maxlen}
+    if isinstance(value, dict):
+        return {'dict': {k: _dump(v) for k, v in value.items()}}
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+def _load(value):
+    if isinstance(value, dict):
+        if 'type' in value:
+            return StreamingIndicator.from_snapshot(value)
+        if 'deque' in value:
+            return deque((_load(v) for v in value['deque']), maxlen=value['maxlen'])
+        if 'dict' in value:
+            return {k: _load(v) for k, v in value['dict'].items()}
+    return value
+
+class StreamingIndicator:
+    """
+    Base class for incremental indicators. update(bar) takes one finished
+    bar (a mapping with Open/High/Low/Close/Volume) and returns the
+    indicator's current value in O(1). snapshot() returns a JSON-safe dict
+    that from_snapshot() turns back into an identical indicator.
+    """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _REGISTRY[cls.__name__] = cls
+
+    def snapshot(self):
+        return {'type': type(self).__name__, 'state': {k: _dump(v) for k, v in vars(self).items()}}
+
+    @staticmethod
+    def from_snapshot(snapshot):
+        cls = _REGISTRY[snapshot['type']]
+        obj = cls.__new__(cls)
+        for key, value in snapshot['state'].items():
+            setattr(obj, key, _load(value))
+        return obj
+
+class EWM(StreamingIndicator):
+    """
+    pandas ewm(alpha, adjust=False, min_periods).mean(), one value at a time.
+    Missing values leave the average unchanged.
+    """
+    def __init__(self, alpha, min_periods=0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.count = 0
+        self.mean = NAN
+
+    def update(self, x):
+        if not math.isnan(x):
+            self.mean = x if self.count == 0 else self.alpha * x + (1 - self.alpha) * self.mean
+            self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        return self.mean if self.count >= max(self.min_periods, 1) else NAN
+
+class RollingSum(StreamingIndicator):
+    """
+    Sum of the last `window` values. The running total is rebuilt from the
+    window every `window` updates so add/subtract rounding cannot drift.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.updates = 0
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.total = math.fsum(self.values)
+        return self.total if len(self.values) == self.window else NAN
+
+class RollingExtreme(StreamingIndicator):
+    """
+    Rolling max (or min) over `window` values with a monotonic deque:
+    amortized O(1) per update.
+    """
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.mode = mode
+        self.candidates = deque()  # (position, value), best value at the left
+        self.position = 0
+
+    def update(self, x):
+        better = (lambda a, b: a >= b) if self.mode == 'max' else (lambda a, b: a <= b)
+        while self.candidates and better(x, self.candidates[-1][1]):
+            self.candidates.pop()
+        self.candidates.append((self.position, x))
+        if self.candidates[0][0] <= self.position - self.window:
+            self.candidates.popleft()
+        self.position += 1
+        return self.candidates[0][1] if self.position >= self.window else NAN
+
+class RSI(StreamingIndicator):
+    def __init__(self, window=14):
+        self.prev_close = None
+        self.up = EWM(1.0 / window, window)
+        self.down = EWM(1.0 / window, window)
+
+    def update(self, bar):
+        close = bar['Close']
+        diff = close - self.prev_close if self.prev_close is not None else NAN
+        self.prev_close = close
+        up = self.up.update(diff if diff > 0 else 0.0)
+        down = self.down.update(-diff if diff < 0 else 0.0)
+        if math.isnan(down):
+            return NAN
+        return 100.0 if down == 0 else 100 - (100 / (1 + up / down))
+
+class MACD(StreamingIndicator):
+    """
+    Returns (macd, signal, histogram).
+    """
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EWM(2.0 / (fast + 1), fast)
+        self.slow = EWM(2.0 / (slow + 1), slow)
+        self.signal = EWM(2.0 / (signal + 1), signal)
+
+    def update(self, bar):
+        macd = self.fast.update(bar['Close']) - self.slow.update(bar['Close'])
+        signal = self.signal.update(macd)
+        return macd, signal, macd - signal
+
+class BollingerBands(StreamingIndicator):
+    """
+    Returns (upper, middle, lower) from running sums of the window's prices
+    and squared prices (offset by the first price to limit cancellation).
+    """
+    def __init__(self, window=20, window_dev=2):
+        self.window = window
+        self.window_dev = window_dev
+        self.offset = None
+        self.sums = RollingSum(window)
+        self.squares = RollingSum(window)
+
+    def update(self, bar):
+        if self.offset is None:
+            self.offset = bar['Close']
+        x = bar['Close'] - self.offset
+        total = self.sums.update(x)
+        squares = self.squares.update(x * x)
+        if math.isnan(total):
+            return NAN, NAN, NAN
+        mean = total / self.window
+        std = math.sqrt(max(squares / self.window - mean * mean, 0.0))
+        middle = mean + self.offset
+        return middle + self.window_dev * std, middle, middle - self.window_dev * std
+
+class ATR(StreamingIndicator):
+    """
+    Average true range with Wilder smoothing, 0 until `window` bars are seen
+    (the ta convention).
+    """
+    def __init__(self, window=14):
+        self.window = window
+        self.prev_close = None
+        self.count = 0
+        self.seed = 0.0
+        self.atr = 0.0
+
+    def update(self, bar):
+        high, low = bar['High'], bar['Low']
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high, self.prev_close) - min(low, self.prev_close)
+        self.prev_close = bar['Close']
+        self.count += 1
+        if self.count < self.window:
+            self.seed += tr
+        elif self.count == self.window:
+            self.atr = (self.seed + tr) / self.window
+        else:
+            self.atr = tr / self.window + (1 - 1.0 / self.window) * self.atr
+        return self.atr
+
+class ADX(StreamingIndicator):
+    """
+    Average directional index as ta computes it: Wilder-smoothed true range
+    and directional movement from bar `window`, DX averaged over `window`
+    bars, then Wilder-smoothed. 0 until bar 2 * window - 1.
+    """
+    def __init__(self, window=14):
+        self.window = window
+        self.prev = None  # (high, low, close)
+        self.count = 0
+        self.sums = [0.0, 0.0, 0.0]  # true range, +DM, -DM
+        self.dx_seed = []
+        self.adx = 0.0
+
+    def update(self, bar):
+        high, low, close = bar['High'], bar['Low'], bar['Close']
+        prev = self.prev
+        self.prev = (high, low, close)
+        t = self.count
+        self.count += 1
+        if prev is None:
+            return self.adx
+
+        tr = max(high, prev[2]) - min(low, prev[2])
+        up, down = high - prev[0], prev[1] - low
+        movement = (tr, up if up > down and up > 0 else 0.0, down if down > up and down > 0 else 0.0)
+        w = self.window
+        if t <= w:
+            self.sums = [s + m / w for s, m in zip(self.sums, movement)]
+            if t < w:
+                return self.adx
+        else:
+            self.sums = [m / w + (1 - 1.0 / w) * s for s, m in zip(self.sums, movement)]
+
+        trs, dip, din = self.sums
+        di_pos = 100 * dip / trs if trs != 0 else 0.0
+        di_neg = 100 * din / trs if trs != 0 else 0.0
+        total = di_pos + di_neg
+        dx = 100 * abs((di_pos - di_neg) / total) if total != 0 else 0.0
+
+        if t < 2 * w:
+            self.dx_seed.append(dx)
+            if t == 2 * w - 1:
+                self.adx = sum(self.dx_seed) / w
+                self.dx_seed = []
+        else:
+            self.adx = dx / w + (1 - 1.0 / w) * self.adx
+        return self.adx
+
+class Stochastic(StreamingIndicator):
+    """
+    Returns (%K, %D).
+    """
+    def __init__(self, window=14, smooth_window=3):
+        self.highs = RollingExtreme(window, 'max')
+        self.lows = RollingExtreme(window, 'min')
+        self.recent_k = deque(maxlen=smooth_window)
+
+    def update(self, bar):
+        high = self.highs.update(bar['High'])
+        low = self.lows.update(bar['Low'])
+        k = 100 * _div(bar['Close'] - low, high - low) if not math.isnan(high) else NAN
+        self.recent_k.append(k)
+        full = len(self.recent_k) == self.recent_k.maxlen
+        d = sum(self.recent_k) / len(self.recent_k) if full else NAN
+        return k, d
+
+class MFI(StreamingIndicator):
+    def __init__(self, window=14):
+        self.prev_tp = None
+        self.positive = RollingSum(window)
+        self.negative = RollingSum(window)
+
+    def update(self, bar):
+        tp = (bar['High'] + bar['Low'] + bar['Close']) / 3.0
+        direction = 0
+        if self.prev_tp is not None:
+            direction = 1 if tp > self.prev_tp else (-1 if tp < self.prev_tp else 0)
+        self.prev_tp = tp
+        flow = tp * bar['Volume'] * direction
+        positive = self.positive.update(flow if flow >= 0 else 0.0)
+        negative = self.negative.update(-flow if flow < 0 else 0.0)
+        if math.isnan(positive):
+            return NAN
+        return 100 - _div(100, 1 + _div(positive, negative))
+
+class CCI(StreamingIndicator):
+    """
+    Commodity channel index. The rolling mean is O(1); the mean absolute
+    deviation has no recursive form and costs O(window) per bar.
+    """
+    def __init__(self, window=20, constant=0.015):
+        self.window = window
+        self.constant = constant
+        self.prices = RollingSum(window)
+
+    def update(self, bar):
+        tp = (bar['High'] + bar['Low'] + bar['Close']) / 3.0
+        total = self.prices.update(tp)
+        if math.isnan(total):
+            return NAN
+        mean = total / self.window
+        mad = sum(abs(x - mean) for x in self.prices.values) / self.window
+        return _div(tp - mean, self.constant * mad)
+
+class OBV(StreamingIndicator):
+    def __init__(self):
+        self.prev_close = None
+        self.obv = 0.0
+
+    def update(self, bar):
+        close = bar['Close']
+        falling = self.prev_close is not None and close < self.prev_close
+        self.obv += -bar['Volume'] if falling else bar['Volume']
+        self.prev_close = close
+        return self.obv
+
+# Name -> indicator factory for IndicatorSet
+STREAMING_INDICATORS = {
+    'rsi': RSI,
+    'macd': MACD,
+    'bollinger': BollingerBands,
+    'atr': ATR,
+    'adx': ADX,
+    'stochastic': Stochastic,
+    'mfi': MFI,
+    'cci': CCI,
+    'obv': OBV,
+}
+
+class IndicatorSet(StreamingIndicator):
+    """
+    The streaming indicators of one symbol. Pass the bar timestamp to
+    update() and a repeated timestamp is treated as a revision of the
+    still-forming bar: state is rolled back to before that bar and the new
+    values applied, so the set can be fed every tick. The rollback
+    checkpoint is a snapshot, which costs O(window) once per new bar.
+    """
+    def __init__(self, names=None):
+        self.indicators = {name: STREAMING_INDICATORS[name]() for name in (names or STREAMING_INDICATORS)}
+        self.last_time = None
+        self.checkpoint = None
+        self.values = {}
+
+    def update(self, bar, timestamp=None):
+        if timestamp is not None:
+            key = str(timestamp)
+            if key == self.last_time and self.checkpoint is not None:
+                self.indicators = _load(self.checkpoint)
+            else:
+                self.checkpoint = _dump(self.indicators)
+            self.last_time = key
+        self.values = {name: indicator.update(bar) for name, indicator in self.indicators.items()}
+        return self.values
+
+    def warm_up(self, data):
+        """
+        Feed a historical OHLCV frame bar by bar.
+        """
+        columns = {col: data[col].to_numpy(dtype=float) for col in ('Open', 'High', 'Low', 'Close', 'Volume') if col in data}
+        for i, timestamp in enumerate(data.index):
+            self.update({col: values[i] for col, values in columns.items()}, timestamp)
+        return self.values
+
+    def save(self, path):
+        """
+        Write the state to a JSON file (atomically) so a restarted process
+        can resume with load() instead of recomputing the history.
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path):
+        with open(path) as f:
+            return StreamingIndicator.from_snapshot(json.load(f))
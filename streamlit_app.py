@@ -3,8 +3,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from data_fetcher import get_realtime_data, symbols, is_market_open
+from market_calendar import next_session_open
 from trading_analysis import analyze_symbol
-import ta  # For RSI in chart
+from indicator_engine import compute_indicators
+from price_levels import LevelEngine
+from ml_predictor import training_status
 import streamlit.components.v1 as components
 import time
 from datetime import datetime
@@ -35,6 +38,16 @@ if market_open:
     st.sidebar.success(f"🟢 Market OPEN - {current_time.strftime('%I:%M %p IST')}")
 else:
     st.sidebar.error(f"🔴 Market CLOSED - {current_time.strftime('%I:%M %p IST')}")
+    next_open = next_session_open()
+    if next_open is not None:
+        st.sidebar.caption(f"Next session: {next_open.strftime('%a %d %b, %I:%M %p IST')}")
+
+# Background model training progress (rule-based signals until it finishes)
+model_training = training_status()
+if model_training['state'] == 'running':
+    st.sidebar.progress(model_training['progress'], text=f"🧠 Training ML model: {model_training.get('trees', 0)}/{model_training.get('n_estimators', '?')} trees")
+elif model_training['state'] == 'failed':
+    st.sidebar.warning(f"ML model training failed: {model_training.get('error')}")
 
 # Auto-refresh logic
 if auto_refresh and market_open:
@@ -42,6 +55,16 @@ if auto_refresh and market_open:
     time.sleep(refresh_interval)
     st.rerun()
 
+# Key price levels, kept across reruns
+@st.cache_resource
+def level_engine(symbol):
+    """
+    One LevelEngine per symbol for the life of the server, shared by every
+    session (it locks its own updates); each rerun only feeds it the bars it
+    has not seen, and it keeps just the last LEVEL_WINDOW_BARS of them.
+    """
+    return LevelEngine()
+
 # TradingView chart integration
 def get_tradingview_symbol(symbol_name):
     """Get TradingView symbol format for different assets"""
@@ -522,26 +545,25 @@ if st.button("Analyze"):
             if not rt_data.empty:
                 fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), gridspec_kw={'height_ratios': [3, 1]})
 
+                # Memoized per bar set, so reruns of the page reuse them
+                chart = compute_indicators(rt_data, ['sma_20', 'sma_50', 'bb_upper', 'bb_lower', 'rsi'])
+
                 # Price chart with moving averages
                 ax1.plot(rt_data['Close'], label='Close Price', color='blue', linewidth=2)
-                sma_20 = ta.trend.SMAIndicator(rt_data['Close'].squeeze(), window=20).sma_indicator()
-                sma_50 = ta.trend.SMAIndicator(rt_data['Close'].squeeze(), window=50).sma_indicator()
-                ax1.plot(sma_20, label='SMA 20', color='orange', linestyle='--')
-                ax1.plot(sma_50, label='SMA 50', color='red', linestyle='--')
+                ax1.plot(chart['sma_20'], label='SMA 20', color='orange', linestyle='--')
+                ax1.plot(chart['sma_50'], label='SMA 50', color='red', linestyle='--')
 
                 # Add Bollinger Bands
-                bb_indicator = ta.volatility.BollingerBands(rt_data['Close'].squeeze())
-                ax1.plot(bb_indicator.bollinger_hband(), label='BB Upper', color='gray', alpha=0.7)
-                ax1.plot(bb_indicator.bollinger_lband(), label='BB Lower', color='gray', alpha=0.7)
-                ax1.fill_between(rt_data.index, bb_indicator.bollinger_hband(), bb_indicator.bollinger_lband(), alpha=0.1, color='gray')
+                ax1.plot(chart['bb_upper'], label='BB Upper', color='gray', alpha=0.7)
+                ax1.plot(chart['bb_lower'], label='BB Lower', color='gray', alpha=0.7)
+                ax1.fill_between(rt_data.index, chart['bb_upper'], chart['bb_lower'], alpha=0.1, color='gray')
 
                 ax1.set_title(f"{symbol_name} Advanced Technical Analysis")
                 ax1.legend()
                 ax1.grid(True, alpha=0.3)
 
                 # RSI chart
-                rsi = ta.momentum.RSIIndicator(rt_data['Close'].squeeze()).rsi()
-                ax2.plot(rsi, label='RSI', color='purple', linewidth=2)
+                ax2.plot(chart['rsi'], label='RSI', color='purple', linewidth=2)
                 ax2.axhline(y=70, color='red', linestyle='--', alpha=0.7, label='Overbought (70)')
                 ax2.axhline(y=30, color='green', linestyle='--', alpha=0.7, label='Oversold (30)')
                 ax2.axhline(y=50, color='gray', linestyle=':', alpha=0.5, label='Neutral (50)')
@@ -552,6 +574,16 @@ if st.button("Analyze"):
                 plt.tight_layout()
                 st.pyplot(fig)
 
+                # Key price levels, maintained incrementally across reruns
+                engine = level_engine(symbols[symbol_name])
+                engine.update(rt_data)
+                levels = engine.summary(rt_data['Close'].iloc[-1])
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("POC", f"{levels['poc']:.2f}")
+                col2.metric("Value Area", f"{levels['value_area_low']:.2f} - {levels['value_area_high']:.2f}")
+                col3.metric("Support", f"{levels['support']:.2f}")
+                col4.metric("Resistance", f"{levels['resistance']:.2f}")
+
             # Market regime and trend analysis
             st.subheader("🌊 Market Analysis")
             col1, col2, col3 = st.columns(3)
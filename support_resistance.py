@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from swing_points import SwingIndex
 
 def find_support_resistance(data, window=20):
     """
@@ -9,6 +10,23 @@ def find_support_resistance(data, window=20):
     lows = data['Low'].rolling(window=window).min()
     return highs, lows
 
+def swing_support_resistance(data, scale=5, swings=None):
+    """
+    Support and resistance from the swing index: the price of the latest
+    confirmed swing low and swing high, stepped forward from the bar that
+    confirmed each swing (so no bar sees a swing before it is known).
+    """
+    if swings is None:
+        swings = SwingIndex(data, scales=(scale,))
+    levels = []
+    for kind in (1, -1):
+        confirmed = swings.swings(scale, kind=kind)
+        level = pd.Series(confirmed['price'].values, index=pd.DatetimeIndex(confirmed['confirmed']))
+        level = level[~level.index.duplicated(keep='last')]
+        levels.append(level.reindex(data.index, method='ffill') if len(level) else pd.Series(np.nan, index=data.index))
+    resistance, support = levels
+    return support, resistance
+
 def dynamic_support_resistance(data, atr_period=14):
     """
     Dynamic S/R using ATR.
@@ -0,0 +1,129 @@
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+
+# Default fractal lookbacks (bars on each side of a swing)
+SWING_SCALES = (2, 5, 10)
+
+# Held bars beyond 2 * max(scales): a bar fed again this far back is re-evaluated in full
+SWING_REVISION_BARS = 5
+
+SWING_COLUMNS = ['position', 'timestamp', 'price', 'kind', 'confirmed']
+
+def fractal_swings(high, low, scale):
+    """
+    Swing highs/lows of two price arrays at one lookback: a high above the
+    `scale` highs before it and at least the `scale` highs after it (lows
+    mirrored). Rolling extremes make this O(n). Returns (positions, kinds,
+    prices) sorted by position, kind 1 for highs and -1 for lows; bars
+    without `scale` bars after them are not swings yet.
+    """
+    high = pd.Series(np.asarray(high, dtype=np.float64))
+    low = pd.Series(np.asarray(low, dtype=np.float64))
+    before_high = high.shift(1).rolling(scale).max().to_numpy()
+    before_low = low.shift(1).rolling(scale).min().to_numpy()
+    after_high = high[::-1].reset_index(drop=True).shift(1).rolling(scale).max().to_numpy()[::-1]
+    after_low = low[::-1].reset_index(drop=True).shift(1).rolling(scale).min().to_numpy()[::-1]
+
+    high, low = high.to_numpy(), low.to_numpy()
+    highs = np.flatnonzero((high > before_high) & (high >= after_high))
+    lows = np.flatnonzero((low < before_low) & (low <= after_low))
+    positions = np.concatenate([highs, lows])
+    kinds = np.concatenate([np.ones(len(highs), dtype=np.int8), -np.ones(len(lows), dtype=np.int8)])
+    prices = np.concatenate([high[highs], low[lows]])
+    order = np.argsort(positions, kind='stable')
+    return positions[order], kinds[order], prices[order]
+
+class SwingIndex:
+    """
+    Swing highs and lows of one symbol at several fractal lookbacks, kept
+    up to date as bars arrive. Only the last 2 * max(scales) +
+    SWING_REVISION_BARS bars are held: update() re-evaluates just the bars
+    whose swing status can still change, so appending a bar costs O(max
+    scale) instead of a rescan.
+    Pattern detectors (chart_patterns, support_resistance) query swings()
+    and pivots() rather than the bars.
+    """
+    def __init__(self, data=None, scales=SWING_SCALES):
+        self.scales = tuple(sorted(scales))
+        self.count = 0  # bars seen; positions are 0-based bar numbers
+        self._times = pd.DatetimeIndex([])
+        self._high = np.array([])
+        self._low = np.array([])
+        self._swings = {scale: {col: [] for col in SWING_COLUMNS} for scale in self.scales}
+        if data is not None:
+            self.update(data)
+
+    def update(self, new_bars):
+        """
+        Feed bars (history, just the newest, or a growing window fed again
+        as a whole). Bars at or after the first new timestamp replace held
+        ones, so revised bars can be fed again; bars older than the held
+        tail are ignored. Only swings with `scale` held bars before them are
+        re-evaluated, so a revision more than SWING_REVISION_BARS bars back
+        does not change swings it would have moved near the held edge.
+        """
+        if new_bars.empty:
+            return
+        new_bars = new_bars.sort_index()
+        keep = len(self._times)
+        if keep:
+            new_bars = new_bars[new_bars.index >= self._times[0]]
+            if new_bars.empty:
+                return
+            keep = int(self._times.searchsorted(new_bars.index[0]))
+        start = self.count - len(self._times)  # position of the first held bar
+        self.count = start + keep + len(new_bars)
+
+        times = pd.DatetimeIndex(new_bars.index)
+        if keep:
+            times = self._times[:keep].append(times)
+        high = np.concatenate([self._high[:keep], new_bars['High'].to_numpy(dtype=np.float64)])
+        low = np.concatenate([self._low[:keep], new_bars['Low'].to_numpy(dtype=np.float64)])
+
+        stamps = times.as_unit('ns').asi8  # stored as int64, converted back in swings()
+        for scale in self.scales:
+            # Bars that lacked `scale` bars after them (or were replaced) may
+            # change; only those with `scale` held bars before can be recomputed
+            first = max(start + keep - scale, start + scale)
+            swings = self._swings[scale]
+            cut = bisect_left(swings['position'], first)
+            for col in SWING_COLUMNS:
+                del swings[col][cut:]
+            positions, kinds, prices = fractal_swings(high, low, scale)
+            positions = positions + start
+            fresh = positions >= first
+            for pos, kind, price in zip(positions[fresh], kinds[fresh], prices[fresh]):
+                swings['position'].append(int(pos))
+                swings['timestamp'].append(stamps[pos - start])
+                swings['price'].append(float(price))
+                swings['kind'].append(int(kind))
+                swings['confirmed'].append(stamps[pos - start + scale])
+
+        held = 2 * self.scales[-1] + SWING_REVISION_BARS
+        self._times, self._high, self._low = times[-held:], high[-held:], low[-held:]
+
+    def swings(self, scale, kind=None):
+        """
+        Confirmed swings at one lookback as a DataFrame (position, timestamp,
+        price, kind, confirmed = time of the bar that confirmed it).
+        """
+        frame = pd.DataFrame(self._swings[scale], columns=SWING_COLUMNS)
+        for col in ('timestamp', 'confirmed'):
+            frame[col] = pd.DatetimeIndex(frame[col].to_numpy(dtype=np.int64), tz='UTC').tz_convert(self._times.tz)
+        if kind is not None:
+            frame = frame[frame['kind'] == kind].reset_index(drop=True)
+        return frame
+
+    def pivots(self, scale):
+        """
+        Zigzag of alternating highs and lows: of consecutive swings of the
+        same kind only the most extreme is kept.
+        """
+        frame = self.swings(scale)
+        if frame.empty:
+            return frame
+        run = (frame['kind'] != frame['kind'].shift()).cumsum()
+        signed = frame['price'] * frame['kind']
+        best = signed.groupby(run).idxmax()
+        return frame.loc[best.values].reset_index(drop=True)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytz
+from scipy.signal import lfilter
+from fetch_cache import INTERVAL_SECONDS
+from market_calendar import session_index
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# Base prices for mock data, keyed by symbol name and by ticker (updated for current market levels)
+BASE_PRICES = {
+    'Sensex': 83754,
+    'BankNifty': 52000,
+    'Nifty50': 25000,
+    'CrudeOil': 70,
+    '^BSESN': 83754,
+    '^NSEI': 25000,
+    '^NSEBANK': 52000,
+    'CL=F': 70,
+    'NIFTY50.NS': 25000,
+    'SENSEX.NS': 83754,
+    'BANKNIFTY.NS': 52000
+}
+
+# (volatility per bar, mean reversion per bar, wick size) as fractions of price
+INTRADAY_PARAMS = (0.003, 0.15, 0.002)
+DAILY_PARAMS = (0.01, 0.05, 0.01)
+
+def generate_ohlcv(symbol, interval='5m', start=None, end=None, periods=None, seed=None,
+                   base_price=None, volatility=None, reversion=None, wick=None, drift=0.0,
+                   clamp=0.2, dtype=np.float64):
+    """
+    Generate mock OHLCV bars with array operations only.
+
+    Closes follow a mean-reverting random walk around the symbol's base
+    price, clamped to +/-clamp of it (None disables the clamp). Each bar
+    opens at the previous close and gets wicks beyond its body so
+    High >= max(Open, Close) and Low <= min(Open, Close). volatility may be
+    a per-bar array and drift adds a per-bar trend, both as fractions of
+    the base price. Pass a seed for reproducible output.
+    """
+    # Precomputed exchange session index (holidays and special sessions included)
+    index = session_index(interval, start=start, end=end, periods=periods if periods is not None else 100)
+    n = len(index)
+    if n == 0:
+        return pd.DataFrame()
+
+    intraday = INTERVAL_SECONDS.get(interval, 300) < INTERVAL_SECONDS['1d']
+    default_vol, default_rev, default_wick = INTRADAY_PARAMS if intraday else DAILY_PARAMS
+    base = base_price if base_price is not None else BASE_PRICES.get(symbol, 100)
+    volatility = default_vol if volatility is None else volatility
+    reversion = default_rev if reversion is None else reversion
+    wick = default_wick if wick is None else wick
+
+    rng = np.random.default_rng(seed)
+
+    # Deviation from base follows d[t] = (1 - reversion) * d[t-1] + shock[t]
+    shocks = rng.normal(base * drift, base * np.asarray(volatility), n)
+    deviation = lfilter([1.0], [1.0, -(1.0 - reversion)], shocks)
+    close = base + deviation
+    if clamp is not None:
+        close = np.clip(close, base * (1 - clamp), base * (1 + clamp))
+
+    open_ = np.empty(n)
+    open_[0] = close[0]
+    open_[1:] = close[:-1]
+
+    wicks = np.abs(rng.normal(0, close * wick, (2, n)))
+    high = np.maximum(open_, close) + wicks[0]
+    low = np.minimum(open_, close) - wicks[1]
+    volume = rng.integers(100000, 10000000, n, dtype=np.int64)
+
+    df = pd.DataFrame({
+        'Open': open_.astype(dtype, copy=False),
+        'High': high.astype(dtype, copy=False),
+        'Low': low.astype(dtype, copy=False),
+        'Close': close.astype(dtype, copy=False),
+        'Volume': volume
+    }, index=index)
+    df.index.name = 'Date'
+    return df
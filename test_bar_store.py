@@ -0,0 +1,97 @@
+from datetime import timedelta
+import pandas as pd
+import pytest
+import bar_store
+import data_fetcher
+from synthetic_data import generate_ohlcv
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(bar_store, 'BAR_STORE_DIR', str(tmp_path / 'bars'))
+
+def test_append_read_and_slice():
+    bars = generate_ohlcv('Nifty50', interval='1d', periods=40, seed=1)
+    assert bar_store.read_bars('^NSEI').empty and bar_store.last_bar_time('^NSEI') is None
+    bar_store.append_bars('^NSEI', '1d', bars.iloc[:30])
+    # The last bar is replaced by its completed version, later bars appended
+    revised = bars.iloc[29:].copy()
+    revised['Close'] += 1
+    merged = bar_store.append_bars('^NSEI', '1d', revised)
+    assert merged.index.equals(bars.index)
+    assert merged['Close'].iloc[29] == bars['Close'].iloc[29] + 1
+    assert bar_store.read_bars('^NSEI', '1d').equals(merged)
+    assert bar_store.last_bar_time('^NSEI') == bars.index[-1]
+    window = bar_store.read_bars('^NSEI', '1d', start=bars.index[5], end=bars.index[9].tz_localize(None))
+    assert window.index.equals(bars.index[5:10])
+
+def test_naive_partition_is_migrated():
+    bars = generate_ohlcv('Nifty50', interval='1d', periods=10, seed=2)
+    naive = bars.set_axis(bars.index.tz_localize(None))
+    bar_store.write_bars('^NSEI', '1d', naive.iloc[:5])
+    merged = bar_store.append_bars('^NSEI', '1d', bars.iloc[5:])
+    assert merged.index.equals(bars.index)
+
+def test_covered_from_keeps_the_earliest_start():
+    assert bar_store.covered_from('^NSEI') is None
+    start = pd.Timestamp('2024-01-01', tz='Asia/Kolkata')
+    bar_store.mark_covered_from('^NSEI', '1d', start)
+    bar_store.mark_covered_from('^NSEI', '1d', start + timedelta(days=30))
+    assert bar_store.covered_from('^NSEI') == start
+    bar_store.mark_covered_from('^NSEI', '1d', start - timedelta(days=30))
+    assert bar_store.covered_from('^NSEI') == start - timedelta(days=30)
+
+def test_late_listing_is_not_downloaded_again(monkeypatch):
+    # The symbol only has bars for the last 40 days of a one-year request
+    bars = generate_ohlcv('Nifty50', interval='1d', periods=40, seed=3)
+    calls = []
+    def fake_download(symbol, start=None, end=None, **kwargs):
+        calls.append(start)
+        return bar_store.slice_bars(bars, start, end).tz_convert('UTC')
+    monkeypatch.setattr(data_fetcher, '_yf_download', fake_download)
+    monkeypatch.setattr(data_fetcher, '_store_is_current', lambda *args: False)
+    end = bars.index[-1] + timedelta(hours=1)
+    start = end - timedelta(days=365)
+    first = data_fetcher.fetch_stored_bars('NEWCO.NS', start, end)
+    second = data_fetcher.fetch_stored_bars('NEWCO.NS', start, end)
+    assert calls[0] == start
+    # Only the tail is topped up on the second call
+    assert calls[1] == bars.index[-1]
+    assert first.index.equals(bars.index) and second.index.equals(bars.index)
+
+def test_missing_sessions_are_fetched_again_once(monkeypatch):
+    bars = generate_ohlcv('Nifty50', interval='1d', periods=40, seed=4)
+    provider = {'bars': bars.iloc[:30].drop(bars.index[[10, 11]])}
+    calls = []
+    def fake_download(symbol, start=None, end=None, **kwargs):
+        calls.append(start)
+        return bar_store.slice_bars(provider['bars'], start, end)
+    monkeypatch.setattr(data_fetcher, '_yf_download', fake_download)
+    monkeypatch.setattr(data_fetcher, '_store_is_current', lambda *args: False)
+    end = bars.index[-1] + timedelta(hours=1)
+    start = bars.index[0]
+    # The first download came back two sessions short, and the provider never has them
+    assert len(data_fetcher.fetch_stored_bars('^NSEI', start, end)) == 28
+    assert len(data_fetcher.fetch_stored_bars('^NSEI', start, end)) == 28
+    assert len(data_fetcher.fetch_stored_bars('^NSEI', start, end)) == 28
+    # The gap was requested again once, then only the tail
+    assert calls[1:] == [bars.index[10], bars.index[29]]
+
+    # A short tail top-up is requested again once the provider has the bars
+    provider['bars'] = bars.drop(bars.index[[10, 11, 33]])
+    assert len(data_fetcher.fetch_stored_bars('^NSEI', start, end)) == 37
+    provider['bars'] = bars.drop(bars.index[[10, 11]])
+    assert len(data_fetcher.fetch_stored_bars('^NSEI', start, end)) == 38
+    assert calls[3:] == [bars.index[29], bars.index[33]]
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_append_read_and_slice, test_naive_partition_is_migrated,
+                 test_covered_from_keeps_the_earliest_start, test_late_listing_is_not_downloaded_again,
+                 test_missing_sessions_are_fetched_again_once):
+        with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(bar_store, 'BAR_STORE_DIR', tmp)
+            if test in (test_late_listing_is_not_downloaded_again, test_missing_sessions_are_fetched_again_once):
+                test(monkeypatch)
+            else:
+                test()
+    print('Bar store tests complete.')
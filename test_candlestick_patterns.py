@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from candlestick_patterns import PATTERNS, hammer, morning_star, doji, bullish_engulfing, scan_patterns
+from panel_indicators import build_panel
+from synthetic_data import generate_ohlcv
+
+def bars(rows):
+    index = pd.date_range('2026-01-05 09:15', periods=len(rows), freq='5min', tz='Asia/Kolkata')
+    return pd.DataFrame(rows, columns=['Open', 'High', 'Low', 'Close'], index=index).assign(Volume=1000)
+
+def test_hammer_and_morning_star():
+    data = bars([
+        [110, 111, 99, 100],    # long bearish
+        [99, 100.5, 97, 98.5],  # small body below the first close
+        [98.5, 107, 98, 106],   # bullish, closes above the first body's midpoint
+        [106, 106.5, 101, 102],  # falling close
+        [100, 100.6, 95, 100.5],  # hammer: long lower shadow, tiny upper shadow, after a fall
+    ])
+    assert morning_star(data).tolist() == [False, False, True, False, False]
+    assert hammer(data).tolist() == [False, False, False, False, True]
+    # The same candle after a rise is a hanging man, not a hammer
+    assert not hammer(data.iloc[[0, 1, 2, 4]]).any()
+
+def test_one_candle_has_one_direction():
+    frames = {name: generate_ohlcv(name, interval='5m', periods=2000, seed=i)
+              for i, name in enumerate(['Sensex', 'Nifty50', 'BankNifty'])}
+    events = scan_patterns(build_panel(frames))
+    for bearish, bullish in (('hanging_man', 'hammer'), ('shooting_star', 'inverted_hammer')):
+        hits = events[events['pattern'] == bearish][['timestamp', 'symbol']]
+        other = events[events['pattern'] == bullish][['timestamp', 'symbol']]
+        assert len(hits) > 0 and len(other) > 0
+        assert hits.merge(other).empty
+    directions = events[events['direction'] != 0].groupby(['timestamp', 'symbol'], observed=True)['direction']
+    assert (directions.nunique() == 1).all()
+
+def test_matches_original_definitions():
+    data = generate_ohlcv('Nifty50', interval='5m', periods=400, seed=5)
+    body = (data['Close'] - data['Open']).abs()
+    assert (doji(data) == (body / (data['High'] - data['Low']) < 0.1)).all()
+    prev_bearish = data['Close'].shift() < data['Open'].shift()
+    engulfing = (data['Open'] < data['Close'].shift()) & (data['Close'] > data['Open'].shift())
+    assert (bullish_engulfing(data) == (prev_bearish & (data['Close'] > data['Open']) & engulfing)).all()
+
+def test_scan_event_table():
+    frames = {name: generate_ohlcv(name, interval='5m', periods=300, seed=i, end='2026-01-09 15:30')
+              for i, name in enumerate(['Sensex', 'Nifty50', 'BankNifty'])}
+    events = scan_patterns(build_panel(frames))
+    assert list(events.columns) == ['timestamp', 'symbol', 'pattern', 'direction', 'strength']
+    assert events['timestamp'].is_monotonic_increasing
+    for name, data in frames.items():
+        single = scan_patterns(data, symbol=name)
+        mine = events[events['symbol'] == name].reset_index(drop=True)
+        assert len(mine) == len(single) > 0
+        assert (mine['pattern'].astype(str).values == single['pattern'].astype(str).values).all()
+        assert np.allclose(mine['strength'], single['strength'], equal_nan=True)
+        doji_times = single.loc[single['pattern'] == 'doji', 'timestamp']
+        assert doji_times.isin(data.index[doji(data)]).all() and len(doji_times) == doji(data).sum()
+    assert set(events['pattern'].cat.categories) == set(PATTERNS)
+
+if __name__ == "__main__":
+    test_hammer_and_morning_star()
+    test_one_candle_has_one_direction()
+    test_matches_original_definitions()
+    test_scan_event_table()
+    print('Candlestick pattern tests complete.')
@@ -0,0 +1,115 @@
+import threading
+import time
+import pandas as pd
+import pytest
+import data_fetcher
+from fetch_cache import TTLCache
+from resampler import resample_bars
+from synthetic_data import generate_ohlcv
+
+def _raw(ticker, periods=30):
+    """
+    Bars as a provider returns them: UTC index, extra column.
+    """
+    bars = generate_ohlcv('Nifty50', interval='5m', periods=periods, seed=len(ticker))
+    bars.index = bars.index.tz_convert('UTC')
+    bars['Adj Close'] = bars['Close']
+    return bars
+
+def fake_providers(monkeypatch):
+    """
+    Give data_fetcher a fresh cache and a recording fake yfinance; returns
+    the list of download calls.
+    """
+    calls = []
+    available = {'^NSEI', '^NSEBANK', '^BSESN'}
+
+    def fake_download(tickers, **kwargs):
+        calls.append(tickers)
+        time.sleep(0.1)
+        if isinstance(tickers, str):
+            return _raw(tickers) if tickers in available else pd.DataFrame()
+        present = [t for t in tickers if t in available]
+        if not present:
+            return pd.DataFrame()
+        return pd.concat({t: _raw(t) for t in present}, axis=1)
+
+    monkeypatch.setattr(data_fetcher, '_realtime_cache', TTLCache())
+    monkeypatch.setattr(data_fetcher, '_yf_download', fake_download)
+    monkeypatch.setattr(data_fetcher, 'get_multi_source_data', lambda *args, **kwargs: pd.DataFrame())
+    return calls
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    return fake_providers(monkeypatch)
+
+def test_batch_frames_match_single_fetches(fetcher):
+    frames = data_fetcher.get_realtime_data_batch(['^NSEI', '^NSEBANK'])
+    assert fetcher == [['^NSEI', '^NSEBANK']]
+    for ticker, frame in frames.items():
+        assert frame.attrs == {'symbol': ticker, 'interval': '5m'}
+        assert list(frame.columns) == data_fetcher.OHLCV_COLUMNS
+    data_fetcher._realtime_cache.invalidate()
+    single = data_fetcher.get_realtime_data('^NSEI')
+    assert single.equals(frames['^NSEI']) and single.attrs == frames['^NSEI'].attrs
+
+def test_batch_uses_cache_and_falls_back_per_symbol(fetcher):
+    cached = data_fetcher.get_realtime_data('^BSESN')
+    frames = data_fetcher.get_realtime_data_batch(['^BSESN', '^NSEI', 'UNKNOWN'])
+    assert frames['^BSESN'] is cached
+    # One batch for the uncached symbols, then a single fetch for the one it missed
+    assert fetcher == ['^BSESN', ['^NSEI', 'UNKNOWN'], 'UNKNOWN']
+    assert not frames['UNKNOWN'].empty  # mock fallback
+    assert frames['UNKNOWN'].attrs['symbol'] == 'UNKNOWN'
+
+def test_concurrent_single_fetch_waits_for_batch(fetcher):
+    results = {}
+    batch = threading.Thread(target=lambda: results.update(data_fetcher.get_realtime_data_batch(['^NSEI', '^NSEBANK'])))
+    batch.start()
+    time.sleep(0.03)
+    single = data_fetcher.get_realtime_data('^NSEBANK')
+    batch.join()
+    assert fetcher == [['^NSEI', '^NSEBANK']]
+    assert single is results['^NSEBANK']
+
+def test_realtime_falls_back_to_providers_then_mock(fetcher, monkeypatch):
+    provider_calls = []
+    monkeypatch.setattr(data_fetcher, 'get_multi_source_data',
+                        lambda name, **kwargs: provider_calls.append(name) or _raw(name, periods=10))
+    data = data_fetcher.get_realtime_data('NIFTY50.NS')
+    assert provider_calls == ['Nifty50'] and len(data) == 10
+    assert str(data.index.tz) == 'Asia/Kolkata'
+
+def test_resampled_data_follows_the_cached_base(fetcher, monkeypatch):
+    bars = generate_ohlcv('Nifty50', interval='5m', periods=100, seed=8)
+    served = {'count': 60}
+    monkeypatch.setattr(data_fetcher, '_yf_download', lambda tickers, **kwargs: fetcher.append(tickers)
+                        or bars.iloc[:served['count']].tz_convert('UTC'))
+    monkeypatch.setattr(data_fetcher, '_resamplers', {})
+    first = data_fetcher.get_resampled_data('^NSEI', interval='15m')
+    again = data_fetcher.get_resampled_data('^NSEI', interval='15m')
+    # Both reads come from the one cached 5m download
+    assert fetcher == ['^NSEI'] and again.equals(first)
+    assert first.equals(resample_bars(bars.iloc[:60], '15m')) and first['Partial'].iloc[-1]
+
+    # The next base bars extend the same resampler
+    resampler = data_fetcher._resamplers[('^NSEI', '5m', '15m')]
+    served['count'] = 100
+    data_fetcher._realtime_cache.invalidate()
+    latest = data_fetcher.get_resampled_data('^NSEI', interval='15m')
+    assert data_fetcher._resamplers[('^NSEI', '5m', '15m')] is resampler
+    expected = resample_bars(bars, '15m')
+    assert latest.equals(expected)
+    # The bar that was forming is now complete
+    assert not latest.loc[first.index[-1], 'Partial']
+
+if __name__ == "__main__":
+    for test in (test_batch_frames_match_single_fetches, test_batch_uses_cache_and_falls_back_per_symbol,
+                 test_concurrent_single_fetch_waits_for_batch):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(fake_providers(monkeypatch))
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_realtime_falls_back_to_providers_then_mock(fake_providers(monkeypatch), monkeypatch)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_resampled_data_follows_the_cached_base(fake_providers(monkeypatch), monkeypatch)
+    print('Data fetcher tests complete.')
@@ -0,0 +1,85 @@
+import threading
+import time
+import pytest
+from fetch_cache import TTLCache, seconds_to_next_bar
+
+def test_single_flight():
+    cache = TTLCache(max_size=8)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'bars'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('SENSEX.NS', loader, 60))) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ['bars'] * 10
+
+def test_lru_eviction_and_expiry():
+    cache = TTLCache(max_size=2)
+    cache.put('a', 1, 60)
+    cache.put('b', 2, 60)
+    cache.get('a')
+    cache.put('c', 3, 60)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    cache.put('d', 4, 0.05)
+    time.sleep(0.1)
+    assert cache.get('d') is None
+
+def test_ttl_aligned_to_bar():
+    # 12:03:20 -> next 5 minute bar at 12:05:00
+    assert seconds_to_next_bar('5m', now=12 * 3600 + 200) == 100
+
+def test_get_or_load_many_shares_flights():
+    cache = TTLCache(max_size=8)
+    cache.put('a', 'cached', 60)
+    batches = []
+    single_calls = []
+
+    def batch_loader(keys):
+        batches.append(sorted(keys))
+        time.sleep(0.2)
+        return {key: f"batch-{key}" for key in keys if key != 'c'}
+
+    results = {}
+    batch = threading.Thread(target=lambda: results.update(cache.get_or_load_many(['a', 'b', 'c'], batch_loader, 60)))
+    batch.start()
+    time.sleep(0.05)
+    # A single-key load of a key in the running batch waits for it
+    assert cache.get_or_load('b', lambda: single_calls.append(1) or 'single', 60) == 'batch-b'
+    batch.join()
+
+    assert batches == [['b', 'c']] and single_calls == []
+    assert results == {'a': 'cached', 'b': 'batch-b', 'c': None}
+    assert cache.get('c') is None  # left out by the loader, not cached
+
+def test_single_waiter_on_key_left_out_of_batch():
+    cache = TTLCache(max_size=8)
+    def batch_loader(keys):
+        time.sleep(0.2)
+        return {}
+    batch = threading.Thread(target=lambda: cache.get_or_load_many(['x'], batch_loader, 60))
+    batch.start()
+    time.sleep(0.05)
+    with pytest.raises(KeyError):
+        cache.get_or_load('x', lambda: 'single', 60)
+    batch.join()
+    # Nothing was cached, so the next call loads on its own
+    assert cache.get_or_load('x', lambda: 'single', 60) == 'single'
+
+if __name__ == "__main__":
+    test_single_flight()
+    test_get_or_load_many_shares_flights()
+    test_single_waiter_on_key_left_out_of_batch()
+    test_lru_eviction_and_expiry()
+    test_ttl_aligned_to_bar()
+    print('Fetch cache tests complete.')
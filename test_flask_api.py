@@ -21,9 +21,10 @@ else:
     print('/analyze/Sensex: No data')
 
 # Simulate /predict endpoint
-from ml_predictor import predictor
+from ml_predictor import get_predictor, rule_based_prediction
 sample_indicators = {'rsi': 55.0, 'ma50': 18000, 'ma200': 17500}
-prediction = predictor.predict(sample_indicators)
+predictor = get_predictor()
+prediction = predictor.predict(sample_indicators) if predictor else rule_based_prediction(sample_indicators)[0]
 print(f'/predict: {prediction}')
 
 print('Flask API endpoints test complete.')
@@ -0,0 +1,83 @@
+import time
+import pandas as pd
+from hedged_fetch import HedgedFetcher, is_valid_frame
+from rate_limiter import PRIORITY_SCHEDULED
+
+FRAME = pd.DataFrame({'Close': [1.0, 2.0]})
+
+def provider(name, calls, delay=0.0, result=FRAME, error=None):
+    """
+    A fake provider recording (name, start time) and answering after delay.
+    """
+    def fetch(symbol):
+        calls.append((name, time.monotonic()))
+        time.sleep(delay)
+        if error:
+            raise error
+        return result.assign(source=name) if is_valid_frame(result) else result
+    return name, fetch
+
+def test_fast_primary_is_not_hedged():
+    calls = []
+    fetcher = HedgedFetcher([provider('a', calls, 0.01), provider('b', calls)], default_hedge_delay=0.5)
+    assert fetcher.fetch('X')['source'].iloc[0] == 'a'
+    assert [name for name, _ in calls] == ['a']
+
+def test_slow_primary_is_hedged_after_its_delay():
+    calls = []
+    fetcher = HedgedFetcher([provider('a', calls, 1.0), provider('b', calls, 0.01)], default_hedge_delay=0.1)
+    start = time.monotonic()
+    assert fetcher.fetch('X')['source'].iloc[0] == 'b'
+    assert 0.08 <= calls[1][1] - start < 0.5
+    assert time.monotonic() - start < 0.5
+
+def test_failures_move_on_immediately():
+    calls = []
+    fetcher = HedgedFetcher([provider('a', calls, error=ValueError('down')),
+                             provider('b', calls, result=pd.DataFrame()),
+                             provider('c', calls)], default_hedge_delay=5.0)
+    start = time.monotonic()
+    assert fetcher.fetch('X')['source'].iloc[0] == 'c'
+    assert time.monotonic() - start < 1.0
+
+def test_nothing_valid_in_time_returns_empty():
+    calls = []
+    fetcher = HedgedFetcher([provider('a', calls, 1.0), provider('b', calls, 1.0)],
+                            default_hedge_delay=0.05, timeout=0.2)
+    start = time.monotonic()
+    assert fetcher.fetch('X').empty
+    assert time.monotonic() - start < 0.5
+
+def test_hedge_delay_tracks_latency_percentile():
+    calls = []
+    fetcher = HedgedFetcher([provider('a', calls, 0.02)], default_hedge_delay=1.5, min_samples=3)
+    assert fetcher.hedge_delay('a') == 1.5
+    for _ in range(3):
+        fetcher.fetch('X')
+    assert 0.02 <= fetcher.hedge_delay('a') < 0.2
+
+class DenyingLimiter:
+    def __init__(self, denied):
+        self.denied = denied
+        self.requests = []
+
+    def acquire(self, name, priority, deadline=None):
+        self.requests.append((name, priority))
+        return name not in self.denied
+
+def test_provider_without_quota_routes_to_the_next():
+    calls = []
+    limiter = DenyingLimiter({'a'})
+    fetcher = HedgedFetcher([provider('a', calls), provider('b', calls)], default_hedge_delay=5.0, limiter=limiter)
+    assert fetcher.fetch('X', priority=PRIORITY_SCHEDULED)['source'].iloc[0] == 'b'
+    assert [name for name, _ in calls] == ['b']
+    assert limiter.requests == [('a', PRIORITY_SCHEDULED), ('b', PRIORITY_SCHEDULED)]
+
+if __name__ == "__main__":
+    test_fast_primary_is_not_hedged()
+    test_slow_primary_is_hedged_after_its_delay()
+    test_failures_move_on_immediately()
+    test_nothing_valid_in_time_returns_empty()
+    test_hedge_delay_tracks_latency_percentile()
+    test_provider_without_quota_routes_to_the_next()
+    print('Hedged fetch tests complete.')
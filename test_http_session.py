@@ -0,0 +1,89 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import http_session
+
+class FakeNSE(BaseHTTPRequestHandler):
+    """
+    Counts requests per path; the home page sets a cookie when
+    `cookies` is on and the API answers `api_status`.
+    """
+    def do_GET(self):
+        server = self.server
+        server.hits.append(self.path)
+        status = server.api_status.pop(0) if self.path.startswith('/api') and server.api_status else 200
+        self.send_response(status)
+        if self.path == '/option-chain' and server.cookies:
+            self.send_header('Set-Cookie', 'nsit=fake; Path=/; Max-Age=600')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+def fake_nse(monkeypatch, cookies=True):
+    """
+    Start a FakeNSE server and point http_session's NSE settings at it.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeNSE)
+    server.hits, server.cookies, server.api_status = [], cookies, []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(http_session, 'NSE_HOST', url.split('://', 1)[1])
+    monkeypatch.setattr(http_session, 'NSE_HOME_URL', f"{url}/option-chain")
+    monkeypatch.setattr(http_session, '_sessions', {})
+    monkeypatch.setattr(http_session, '_nse_primed_at', 0.0)
+    monkeypatch.setattr(http_session, '_nse_retry_at', 0.0)
+    return server, url
+
+@pytest.fixture
+def nse(monkeypatch):
+    server, url = fake_nse(monkeypatch)
+    yield server, url
+    server.shutdown()
+
+def test_nse_cookies_primed_once(nse):
+    server, url = nse
+    for _ in range(3):
+        assert http_session.http_get(f"{url}/api/chain").status_code == 200
+    assert server.hits == ['/option-chain'] + ['/api/chain'] * 3
+    assert http_session.get_session(url) is http_session.get_session(f"{url}/other")
+
+def test_rejected_request_reprimes_and_retries(nse):
+    server, url = nse
+    http_session.http_get(f"{url}/api/chain")
+    server.api_status.append(403)
+    assert http_session.http_get(f"{url}/api/chain").status_code == 200
+    assert server.hits == ['/option-chain', '/api/chain', '/api/chain', '/option-chain', '/api/chain']
+
+def test_missing_cookies_wait_before_priming_again(nse, monkeypatch):
+    server, url = nse
+    server.cookies = False
+    monkeypatch.setattr(http_session, 'NSE_PRIME_RETRY', 0.3)
+    for _ in range(3):
+        http_session.http_get(f"{url}/api/chain")
+    assert server.hits.count('/option-chain') == 1
+    time.sleep(0.35)
+    http_session.http_get(f"{url}/api/chain")
+    assert server.hits.count('/option-chain') == 2
+
+def test_other_hosts_are_not_primed(nse):
+    server, url = nse
+    other = url.replace('127.0.0.1', 'localhost')
+    http_session.http_get(f"{other}/api/chain")
+    assert server.hits == ['/api/chain']
+    assert http_session.get_session(other) is not http_session.get_session(url)
+
+if __name__ == "__main__":
+    for test in (test_nse_cookies_primed_once, test_rejected_request_reprimes_and_retries,
+                 test_missing_cookies_wait_before_priming_again, test_other_hosts_are_not_primed):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            server, url = fake_nse(monkeypatch)
+            if test is test_missing_cookies_wait_before_priming_again:
+                test((server, url), monkeypatch)
+            else:
+                test((server, url))
+            server.shutdown()
+    print('HTTP session tests complete.')
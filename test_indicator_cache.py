@@ -0,0 +1,60 @@
+import indicator_cache
+from indicator_cache import frame_fingerprint, memoize_indicator, clear_indicator_cache
+from indicator_engine import compute_indicators
+from indicators import get_indicator_signals
+from fetch_cache import TTLCache
+from synthetic_data import generate_ohlcv
+
+def test_fingerprint_tracks_new_and_revised_bars():
+    data = generate_ohlcv('Nifty50', interval='5m', periods=100, seed=1)
+    assert frame_fingerprint(data) == frame_fingerprint(data.copy())
+    assert frame_fingerprint(data.iloc[:-1]) != frame_fingerprint(data)
+    revised = data.copy()
+    revised.iloc[-1, revised.columns.get_loc('Close')] += 1
+    assert frame_fingerprint(revised) != frame_fingerprint(data)
+    tagged = data.copy()
+    tagged.attrs.update(symbol='^NSEI', interval='5m')
+    assert frame_fingerprint(tagged) != frame_fingerprint(data)
+
+def test_repeated_calls_hit_the_cache():
+    calls = []
+
+    @memoize_indicator
+    def closes(data, window=3):
+        calls.append(window)
+        return data['Close'].rolling(window).mean()
+
+    clear_indicator_cache()
+    data = generate_ohlcv('Sensex', interval='5m', periods=50, seed=2)
+    first = closes(data)
+    assert closes(data.copy()) is first
+    closes(data, window=5)
+    assert calls == [3, 5]
+    assert compute_indicators(data, ['rsi', 'atr']) is compute_indicators(data, ['rsi', 'atr'])
+
+def test_cached_signals_are_not_shared():
+    clear_indicator_cache()
+    data = generate_ohlcv('Nifty50', interval='5m', periods=120, seed=4)
+    signals = get_indicator_signals(data)
+    expected = dict(signals)
+    signals['macd_buy'] = 'changed'
+    signals['extra'] = True
+    assert get_indicator_signals(data) == expected
+
+def test_lru_bound(monkeypatch):
+    monkeypatch.setattr(indicator_cache, '_cache', TTLCache(max_size=2))
+
+    @memoize_indicator
+    def last_close(data):
+        return data['Close'].iloc[-1]
+
+    data = generate_ohlcv('BankNifty', interval='5m', periods=30, seed=3)
+    for n in (10, 20, 30):
+        last_close(data.iloc[:n])
+    assert len(indicator_cache._cache) == 2
+
+if __name__ == "__main__":
+    test_fingerprint_tracks_new_and_revised_bars()
+    test_repeated_calls_hit_the_cache()
+    test_cached_signals_are_not_shared()
+    print('Indicator cache tests complete.')
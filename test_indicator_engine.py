@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import ta
+from indicator_engine import IndicatorEngine, compute_indicators
+from synthetic_data import generate_ohlcv
+
+def ta_reference(data):
+    close, high, low, volume = data['Close'], data['High'], data['Low'], data['Volume']
+    macd = ta.trend.MACD(close)
+    bb = ta.volatility.BollingerBands(close)
+    stoch = ta.momentum.StochasticOscillator(high, low, close)
+    return {
+        'rsi': ta.momentum.RSIIndicator(close).rsi(),
+        'macd': macd.macd(),
+        'macd_signal': macd.macd_signal(),
+        'macd_diff': macd.macd_diff(),
+        'bb_upper': bb.bollinger_hband(),
+        'bb_middle': bb.bollinger_mavg(),
+        'bb_lower': bb.bollinger_lband(),
+        'sma_20': ta.trend.SMAIndicator(close, window=20).sma_indicator(),
+        'sma_50': ta.trend.SMAIndicator(close, window=50).sma_indicator(),
+        'ema_20': ta.trend.EMAIndicator(close, window=20).ema_indicator(),
+        'stoch_k': stoch.stoch(),
+        'stoch_d': stoch.stoch_signal(),
+        'williams_r': ta.momentum.WilliamsRIndicator(high, low, close).williams_r(),
+        'adx': ta.trend.ADXIndicator(high, low, close).adx(),
+        'cci': ta.trend.CCIIndicator(high, low, close).cci(),
+        'mfi': ta.volume.MFIIndicator(high, low, close, volume).money_flow_index(),
+        'roc': ta.momentum.ROCIndicator(close).roc(),
+        'atr': ta.volatility.AverageTrueRange(high, low, close).average_true_range(),
+    }
+
+def test_matches_ta():
+    # 28 bars is the shortest history ta computes an ADX for
+    for periods in (28, 29, 75, 400):
+        data = generate_ohlcv('Nifty50', interval='5m', periods=periods, seed=periods)
+        expected = ta_reference(data)
+        result = compute_indicators(data)
+        for name, series in expected.items():
+            assert np.allclose(result[name].values, series.values.astype(float), rtol=1e-9, atol=1e-9, equal_nan=True), name
+            assert result[name].index.equals(data.index)
+
+def test_latest_and_shared_intermediates():
+    data = generate_ohlcv('Sensex', interval='5m', periods=200, seed=5)
+    engine = IndicatorEngine(data)
+    latest = engine.latest(['stoch_k', 'williams_r', 'atr'])
+    # Stochastics and Williams %R share one rolling high/low pair
+    assert sum(1 for key in engine._memo if isinstance(key, tuple) and key[0] in ('max', 'min')) == 2
+    assert np.isclose(latest['atr'], ta.volatility.AverageTrueRange(data['High'], data['Low'], data['Close']).average_true_range().iloc[-1])
+
+def test_multi_symbol_frame():
+    frames = {name: generate_ohlcv(name, interval='5m', periods=300, seed=3, end='2026-01-09 15:30')
+              for name in ['Sensex', 'Nifty50', 'BankNifty']}
+    panel = pd.concat(frames, axis=1).swaplevel(axis=1)
+    result = compute_indicators(panel, ['rsi', 'adx', 'cci'])
+    for name, data in frames.items():
+        single = compute_indicators(data, ['rsi', 'adx', 'cci'])
+        for key in single:
+            assert np.allclose(result[key][name].values, single[key].values, equal_nan=True)
+
+if __name__ == "__main__":
+    test_matches_ta()
+    test_latest_and_shared_intermediates()
+    test_multi_symbol_frame()
+    print('Indicator engine tests complete.')
@@ -0,0 +1,33 @@
+import pandas as pd
+from market_calendar import (is_market_open, is_trading_day, next_session_open, seconds_until_next_session,
+                             session_index, find_gaps)
+
+def test_holidays_and_special_sessions():
+    assert is_market_open('2026-01-27 10:00')
+    assert not is_market_open('2026-01-26 10:00')  # Republic Day
+    assert not is_market_open('2026-01-24 10:00')  # Saturday
+    assert not is_market_open('2025-10-21 10:00')  # Diwali, regular session closed
+    assert is_market_open('2025-10-21 14:00')      # Muhurat trading
+    assert not is_trading_day('2026-12-25')
+
+def test_next_session_skips_holidays():
+    # Friday evening before the Republic Day Monday -> Tuesday 09:15
+    assert next_session_open('2026-01-23 16:00') == pd.Timestamp('2026-01-27 09:15', tz='Asia/Kolkata')
+    assert seconds_until_next_session('2026-01-23 16:00') == (3 * 24 + 17.25) * 3600
+    assert seconds_until_next_session('2026-01-27 11:00') == 0
+
+def test_session_index_and_gaps():
+    index = session_index('5m', start='2026-01-23', end='2026-01-27 23:59')
+    assert len(index) == 2 * 75
+    assert len(session_index('60m', start='2026-01-05', end='2026-01-05 23:59')) == 7
+    assert len(session_index('5m', end='2026-01-27 09:20', periods=10)) == 10
+
+    daily = pd.bdate_range('2026-01-19', '2026-01-30').drop([pd.Timestamp('2026-01-26'), pd.Timestamp('2026-01-28')])
+    gaps = find_gaps(daily, '1d')
+    assert list(gaps.strftime('%Y-%m-%d')) == ['2026-01-28']
+
+if __name__ == "__main__":
+    test_holidays_and_special_sessions()
+    test_next_session_skips_holidays()
+    test_session_index_and_gaps()
+    print('Market calendar tests complete.')
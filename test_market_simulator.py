@@ -0,0 +1,80 @@
+import os
+import subprocess
+from contextlib import contextmanager
+import sys
+from datetime import timedelta
+import pandas as pd
+import pytest
+import bar_store
+import data_fetcher
+import http_session
+from fetch_cache import TTLCache
+from market_simulator import start_simulator
+
+@contextmanager
+def running_simulator(tmp_path, monkeypatch):
+    """
+    A running simulator with data_fetcher pointed at it and stores in tmp_path.
+    """
+    server, url = start_simulator(seed=7)
+    monkeypatch.setattr(data_fetcher, 'MARKET_SIMULATOR_URL', url)
+    monkeypatch.setattr(data_fetcher, 'NSE_BASE_URL', url)
+    monkeypatch.setattr(http_session, 'NSE_HOST', url.split('://', 1)[1])
+    monkeypatch.setattr(http_session, 'NSE_HOME_URL', f"{url}/option-chain")
+    monkeypatch.setattr(data_fetcher, '_realtime_cache', TTLCache())
+    monkeypatch.setattr(bar_store, 'BAR_STORE_DIR', str(tmp_path / 'bars'))
+    try:
+        yield url
+    finally:
+        server.shutdown()
+
+@pytest.fixture
+def simulator(tmp_path, monkeypatch):
+    with running_simulator(tmp_path, monkeypatch) as url:
+        yield url
+
+def test_realtime_through_simulator(simulator):
+    data = data_fetcher.get_realtime_data('^NSEI', period='5d', interval='5m')
+    assert len(data) == 5 * 75  # simulator bars, not the one-session mock fallback
+    assert list(data.columns) == data_fetcher.OHLCV_COLUMNS
+    assert str(data.index.tz) == 'Asia/Kolkata'
+    assert data.attrs == {'symbol': '^NSEI', 'interval': '5m'}
+
+def test_batch_through_simulator(simulator):
+    frames = data_fetcher.get_realtime_data_batch(['^NSEI', '^NSEBANK'], period='1d', interval='5m')
+    assert [len(frames[t]) for t in ('^NSEI', '^NSEBANK')] == [75, 75]
+    assert not frames['^NSEI']['Close'].equals(frames['^NSEBANK']['Close'])
+    assert data_fetcher.get_realtime_data('^NSEBANK', period='1d', interval='5m') is frames['^NSEBANK']
+
+def test_option_chain_through_simulator(simulator):
+    chain = data_fetcher.get_fo_data('NIFTY')
+    assert not chain.empty
+    assert {'expiry', 'strike', 'CE_open_interest', 'PE_open_interest'} <= set(chain.columns)
+
+def test_stored_history_through_simulator(simulator, tmp_path):
+    end = pd.Timestamp.now(tz='Asia/Kolkata')
+    data = data_fetcher.fetch_stored_bars('^NSEI', end - timedelta(days=60), end, interval='1d')
+    assert len(data) > 30
+    assert os.path.exists(os.path.join(str(tmp_path / 'bars'), 'symbol=_NSEI', 'interval=1d', 'bars.parquet'))
+
+def test_simulated_runs_use_separate_stores():
+    code = "import bar_store, option_snapshots; print(bar_store.BAR_STORE_DIR, option_snapshots.OPTION_SNAPSHOT_DIR)"
+    env = {k: v for k, v in os.environ.items() if k not in ('BAR_STORE_DIR', 'OPTION_SNAPSHOT_DIR')}
+    live = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True).stdout.split()
+    env['MARKET_SIMULATOR_URL'] = 'http://127.0.0.1:8765'
+    simulated = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True).stdout.split()
+    assert live == ['bar_store', 'fo_snapshots']
+    assert simulated == ['bar_store_simulator', 'fo_snapshots_simulator']
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_simulated_runs_use_separate_stores()
+    for test in (test_realtime_through_simulator, test_batch_through_simulator,
+                 test_option_chain_through_simulator, test_stored_history_through_simulator):
+        tmp_path = pathlib.Path(tempfile.mkdtemp())
+        with pytest.MonkeyPatch.context() as monkeypatch, running_simulator(tmp_path, monkeypatch) as url:
+            if test is test_stored_history_through_simulator:
+                test(url, tmp_path)
+            else:
+                test(url)
+    print('Market simulator tests complete.')
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import time
+import model_registry
+import ml_predictor
+from model_registry import publish_model, current_version
+from ml_predictor import get_predictor, rule_based_prediction, start_background_training, training_status
+from test_model_registry import FEATURES, small_model
+
+def use_registry(monkeypatch, registry):
+    monkeypatch.setattr(model_registry, 'MODEL_REGISTRY_DIR', registry)
+    monkeypatch.setattr(ml_predictor, 'predictor', None)
+    monkeypatch.setattr(ml_predictor, '_last_version_check', 0.0)
+    monkeypatch.setattr(ml_predictor, '_training_attempts', 0)
+    monkeypatch.setattr(ml_predictor, '_next_training_attempt', 0.0)
+    monkeypatch.setattr(ml_predictor, 'MODEL_RELOAD_INTERVAL', 0.0)
+    # Legacy pickles in the working directory must not be migrated into the test registry
+    monkeypatch.setattr(ml_predictor, 'migrate_legacy_model', lambda: None)
+
+def test_rule_based_prediction():
+    assert rule_based_prediction({'rsi': 25, 'momentum': 1.0}) == ('buy', 0.6)
+    assert rule_based_prediction({'rsi': 80, 'macd': -1.0}) == ('sell', 0.6)
+    assert rule_based_prediction({}) == ('hold', 0.5)
+
+def test_get_predictor_trains_in_background_and_hot_swaps(tmp_path, monkeypatch):
+    registry = str(tmp_path)
+    use_registry(monkeypatch, registry)
+    started = []
+    monkeypatch.setattr(ml_predictor, 'start_background_training', lambda: started.append(1) or 'process')
+
+    assert get_predictor() is None and get_predictor() is None
+    assert started == [1]  # retried only after the backoff
+
+    first = publish_model(*small_model(0), FEATURES, registry_dir=registry)
+    predictor = get_predictor()
+    assert predictor.metadata['version'] == first
+    second = publish_model(*small_model(1), FEATURES, registry_dir=registry)
+    assert get_predictor().metadata['version'] == second
+    assert predictor.metadata['version'] == first  # held references are untouched
+
+def test_background_training_process(tmp_path):
+    registry = str(tmp_path)
+    assert training_status(registry)['state'] == 'idle'
+    process = start_background_training(n_estimators=4, registry_dir=registry)
+    assert process is not None
+    assert start_background_training(n_estimators=4, registry_dir=registry) is None
+    assert training_status(registry)['state'] == 'running'
+    process.join(300)
+    status = training_status(registry)
+    assert status['state'] == 'done' and status['progress'] == 1.0
+    assert status['version'] == current_version(registry)
+    assert not os.path.exists(os.path.join(registry, 'training.lock'))
+
+def test_stale_lock_is_taken_over(tmp_path, monkeypatch):
+    registry = str(tmp_path)
+    with open(os.path.join(registry, 'training.lock'), 'w') as f:
+        f.write('999999999')
+    started = []
+
+    class FakeProcess:
+        pid = 1234
+        def __init__(self, target, args, daemon):
+            pass
+        def start(self):
+            started.append(1)
+
+    class FakeContext:
+        Process = FakeProcess
+
+    monkeypatch.setattr(ml_predictor.multiprocessing, 'get_context', lambda method: FakeContext)
+    assert start_background_training(registry_dir=registry) is not None
+    assert started == [1]
+    assert open(os.path.join(registry, 'training.lock')).read() == '1234'
+
+def test_dead_trainer_is_restarted_after_backoff(tmp_path, monkeypatch):
+    registry = str(tmp_path)
+    use_registry(monkeypatch, registry)
+    dead = subprocess.Popen(['true'])
+    dead.wait()
+    started = []
+
+    class DyingProcess:
+        pid = dead.pid  # the trainer is gone as soon as it starts
+        def __init__(self, target, args, daemon):
+            pass
+        def start(self):
+            started.append(1)
+
+    class FakeContext:
+        Process = DyingProcess
+
+    monkeypatch.setattr(ml_predictor.multiprocessing, 'get_context', lambda method: FakeContext)
+    assert get_predictor() is None and started == [1]
+    assert training_status(registry)['state'] == 'failed'
+    assert get_predictor() is None and started == [1]  # backing off
+
+    monkeypatch.setattr(ml_predictor, '_next_training_attempt', 0.0)
+    assert get_predictor() is None and started == [1, 1]  # stale lock taken over
+    assert ml_predictor._next_training_attempt - time.time() > ml_predictor.TRAINING_RETRY_BACKOFF
+
+if __name__ == "__main__":
+    import tempfile
+    test_rule_based_prediction()
+    test_background_training_process(tempfile.mkdtemp())
+    print('ML predictor tests complete.')
@@ -0,0 +1,88 @@
+import os
+import numpy as np
+import pandas as pd
+import joblib
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+import model_registry
+from model_registry import publish_model, load_model, current_version, list_versions, verify_model, migrate_legacy_model
+
+FEATURES = ['rsi', 'macd', 'volume']
+
+def small_model(seed=0):
+    """
+    A quick forest over three features with labels -1/0/1.
+    """
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(500, 3)), columns=FEATURES)
+    y = np.sign(X['rsi'] + 0.5 * X['macd']).astype(int)
+    y[np.abs(X['rsi']) < 0.2] = 0
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=seed).fit(scaler.transform(X), y)
+    return model, scaler
+
+def test_published_forest_matches_sklearn(tmp_path):
+    model, scaler = small_model()
+    version = publish_model(model, scaler, FEATURES, metrics={'accuracy': 0.9}, registry_dir=str(tmp_path))
+    forest, loaded_scaler, features, metadata = load_model(registry_dir=str(tmp_path))
+    assert features == FEATURES and metadata['version'] == version
+    assert metadata['metrics'] == {'accuracy': 0.9}
+    assert isinstance(forest.arrays['threshold'], np.memmap)
+    X = np.random.default_rng(1).normal(size=(300, 3)) * 2
+    assert np.allclose(forest.predict_proba(X), model.predict_proba(X))
+    assert (forest.predict(X) == model.predict(X)).all()
+    assert np.allclose(loaded_scaler.mean_, scaler.mean_)
+    # Missing features follow the same branches as in sklearn
+    X[np.random.default_rng(2).random(X.shape) < 0.3] = np.nan
+    assert np.allclose(forest.predict_proba(X), model.predict_proba(X))
+
+def test_versions_and_checksums(tmp_path):
+    registry = str(tmp_path)
+    assert load_model(registry_dir=registry) is None
+    first = publish_model(*small_model(0), FEATURES, registry_dir=registry)
+    second = publish_model(*small_model(1), FEATURES, registry_dir=registry)
+    assert list_versions(registry) == [first, second]
+    assert current_version(registry) == second
+    assert load_model(first, registry_dir=registry)[3]['version'] == first
+
+    path = os.path.join(registry, second, 'threshold.npy')
+    data = bytearray(open(path, 'rb').read())
+    data[-1] ^= 0xFF
+    open(path, 'wb').write(bytes(data))
+    verify_model(second, registry, checksums=False)
+    with pytest.raises(ValueError):
+        load_model(registry_dir=registry, verify_checksums=True)
+
+def test_default_load_does_not_hash(tmp_path, monkeypatch):
+    registry = str(tmp_path)
+    version = publish_model(*small_model(), FEATURES, registry_dir=registry)
+    monkeypatch.setattr(model_registry, '_sha256', lambda path: pytest.fail(f"hashed {path}"))
+    assert load_model(registry_dir=registry)[3]['version'] == version
+    os.remove(os.path.join(registry, version, 'proba.npy'))
+    with pytest.raises(ValueError):
+        load_model(registry_dir=registry)
+
+def test_legacy_migration_and_predictor(tmp_path, monkeypatch):
+    model, scaler = small_model()
+    paths = [str(tmp_path / name) for name in ('model.pkl', 'scaler.pkl', 'features.pkl')]
+    for obj, path in zip((model, scaler, FEATURES), paths):
+        joblib.dump(obj, path)
+    registry = str(tmp_path / 'registry')
+    version = migrate_legacy_model(*paths, registry_dir=registry)
+    assert current_version(registry) == version
+
+    monkeypatch.setattr(model_registry, 'MODEL_REGISTRY_DIR', registry)
+    from ml_predictor import MLPredictor
+    predictor = MLPredictor()
+    assert predictor.metadata['version'] == version
+    assert predictor.predict({'rsi': 50, 'macd': 1.0, 'volume': 100000}) in ('buy', 'sell', 'hold')
+    assert 0 < predictor.get_prediction_confidence({'rsi': 20, 'macd': -1.0, 'volume': 1000}) <= 1
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_published_forest_matches_sklearn(pathlib.Path(tempfile.mkdtemp()))
+    test_versions_and_checksums(pathlib.Path(tempfile.mkdtemp()))
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_default_load_does_not_hash(pathlib.Path(tempfile.mkdtemp()), monkeypatch)
+    print('Model registry tests complete.')
@@ -0,0 +1,76 @@
+import numpy as np
+from moving_averages import (simple_ma, multi_sma, exponential_ma, weighted_ma, hull_ma, double_ema, triple_ema,
+                             kaufman_ma, volume_weighted_ma, ma_crossover, crossovers)
+from synthetic_data import generate_ohlcv
+
+def wma_reference(close, period):
+    weights = np.arange(1, period + 1)
+    return close.rolling(period).apply(lambda x: (x * weights).sum() / weights.sum(), raw=True)
+
+def kama_reference(close, period=10, fast=2, slow=30):
+    values = close.values
+    kama = np.full(len(values), np.nan)
+    kama[period - 1] = values[period - 1]
+    for t in range(period, len(values)):
+        volatility = np.abs(np.diff(values[t - period:t + 1])).sum()
+        er = abs(values[t] - values[t - period]) / volatility if volatility > 0 else 0.0
+        sc = (er * (2 / (fast + 1) - 2 / (slow + 1)) + 2 / (slow + 1)) ** 2
+        kama[t] = kama[t - 1] + sc * (values[t] - kama[t - 1])
+    return kama
+
+def close_enough(a, b):
+    return np.allclose(np.asarray(a, dtype=float), np.asarray(b, dtype=float), rtol=1e-9, equal_nan=True)
+
+def test_matches_references():
+    data = generate_ohlcv('Nifty50', interval='5m', periods=500, seed=7)
+    close = data['Close']
+    assert close_enough(simple_ma(data, 20), close.rolling(20).mean())
+    assert close_enough(exponential_ma(data, 20), close.ewm(span=20).mean())
+    assert close_enough(weighted_ma(data, 20), wma_reference(close, 20))
+    assert close_enough(kaufman_ma(data), kama_reference(close))
+
+    ema = close.ewm(span=20).mean()
+    ema2 = ema.ewm(span=20).mean()
+    assert close_enough(double_ema(data, 20), 2 * ema - ema2)
+    assert close_enough(triple_ema(data, 20), 3 * ema - 3 * ema2 + ema2.ewm(span=20).mean())
+
+    hull = wma_reference(2 * wma_reference(close, 8) - wma_reference(close, 16), 4)
+    assert close_enough(hull_ma(data, 16), hull)
+
+    vwma = (close * data['Volume']).rolling(20).sum() / data['Volume'].rolling(20).sum()
+    assert close_enough(volume_weighted_ma(data, 20), vwma)
+
+def test_kama_with_fully_efficient_bars():
+    data = generate_ohlcv('Nifty50', interval='5m', periods=2000, seed=3)
+    close = data['Close'].copy()
+    close.iloc[500:560] = np.linspace(close.iloc[500], close.iloc[500] * 1.05, 60)  # efficiency ratio 1
+    data = data.assign(Close=close)
+    for fast, slow in ((1, 30), (2, 30), (1, 2)):
+        result = kaufman_ma(data, fast=fast, slow=slow)
+        assert result.iloc[9:].notna().all()
+        assert close_enough(result, kama_reference(close, fast=fast, slow=slow))
+
+def test_multi_sma_and_gaps():
+    data = generate_ohlcv('Sensex', interval='5m', periods=300, seed=8)
+    averages = multi_sma(data, [5, 10, 50])
+    for period in averages.columns:
+        assert close_enough(averages[period], data['Close'].rolling(period).mean())
+    gappy = data.copy()
+    gappy.iloc[100, gappy.columns.get_loc('Close')] = np.nan
+    assert close_enough(simple_ma(gappy, 10), gappy['Close'].rolling(10).mean())
+
+def test_crossovers_all_pairs():
+    data = generate_ohlcv('BankNifty', interval='5m', periods=400, seed=9)
+    table = crossovers(data, [5, 20, 50])
+    assert list(table.columns) == [(5, 20), (5, 50), (20, 50)]
+    for short, long in table.columns:
+        bullish, bearish = ma_crossover(data, short, long)
+        assert (bullish == (table[(short, long)] == 1)).all()
+        assert (bearish == (table[(short, long)] == -1)).all()
+
+if __name__ == "__main__":
+    test_kama_with_fully_efficient_bars()
+    test_matches_references()
+    test_multi_sma_and_gaps()
+    test_crossovers_all_pairs()
+    print('Moving average tests complete.')
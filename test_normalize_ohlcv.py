@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+import data_fetcher
+from data_fetcher import normalize_ohlcv, OHLCV_COLUMNS
+from synthetic_data import generate_ohlcv
+
+def test_yfinance_multiindex_is_flattened():
+    bars = generate_ohlcv('Nifty50', interval='5m', periods=50, seed=1)
+    raw = bars.copy()
+    raw.index = raw.index.tz_convert('UTC')
+    raw['Adj Close'] = raw['Close']
+    raw.columns = pd.MultiIndex.from_product([raw.columns, ['^NSEI']], names=['Price', 'Ticker'])
+    raw = pd.concat([raw, raw.iloc[-2:]]).iloc[::-1]  # unsorted with duplicates
+
+    data = normalize_ohlcv(raw)
+    assert list(data.columns) == OHLCV_COLUMNS
+    assert str(data.index.tz) == 'Asia/Kolkata'
+    assert data.index.is_monotonic_increasing and data.index.is_unique
+    assert data['Volume'].dtype == np.int64
+    assert data.equals(bars)
+
+def test_canonical_frame_is_not_copied():
+    bars = generate_ohlcv('Sensex', interval='5m', periods=20, seed=2)
+    assert normalize_ohlcv(bars) is bars
+    assert normalize_ohlcv(pd.DataFrame()).empty
+
+def test_naive_index_uses_source_tz():
+    frame = pd.DataFrame({'Open': [1.0], 'High': [2.0], 'Low': [0.5], 'Close': [1.5]},
+                         index=pd.DatetimeIndex(['2026-01-05 03:45']))
+    data = normalize_ohlcv(frame, source_tz='UTC')
+    assert data.index[0].strftime('%H:%M') == '09:15'
+    assert data['Volume'].iloc[0] == 0
+
+def test_indian_market_data_is_canonical(monkeypatch):
+    bars = generate_ohlcv('BankNifty', interval='1d', periods=30, seed=3)
+    raw = bars.set_axis(bars.index.tz_localize(None)).iloc[::-1]
+    raw['Adj Close'] = raw['Close']
+    sources = {'yfinance': raw}
+    def fail(*args, **kwargs):
+        raise ConnectionError('offline')
+    monkeypatch.setattr(data_fetcher, 'http_get', fail)
+    monkeypatch.setattr(data_fetcher, '_yf_download', lambda *args, **kwargs: sources['yfinance'])
+    start, end = bars.index[0], bars.index[-1]
+    assert data_fetcher.get_indian_market_data('NSEBANK', start, end).equals(bars)
+    sources['yfinance'] = pd.DataFrame()
+    empty = data_fetcher.get_indian_market_data('NSEBANK', start, end)
+    assert empty.empty and list(empty.columns) == OHLCV_COLUMNS and str(empty.index.tz) == 'Asia/Kolkata'
+
+if __name__ == "__main__":
+    test_yfinance_multiindex_is_flattened()
+    test_canonical_frame_is_not_copied()
+    test_naive_index_uses_source_tz()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_indian_market_data_is_canonical(monkeypatch)
+    print('OHLCV normalization tests complete.')
@@ -0,0 +1,60 @@
+import numpy as np
+from market_simulator import option_chain_payload
+from option_chain import parse_option_chain, put_call_ratio, max_pain, pain_curve, oi_walls, classify_buildup
+
+def _chain(n_strikes=60, n_expiries=3, seed=7):
+    payload = option_chain_payload('BANKNIFTY', 52000.0, np.random.default_rng(seed), n_strikes=n_strikes, n_expiries=n_expiries)
+    return parse_option_chain(payload)
+
+def test_parse_flat_columns():
+    chain = _chain()
+    assert len(chain) == 60 * 3
+    assert chain['CE_open_interest'].dtype == np.int64
+    assert chain['PE_iv'].dtype == np.float64
+    for _, group in chain.groupby('expiry'):
+        assert group['strike'].is_monotonic_increasing
+
+def test_missing_leg_is_zero_filled():
+    chain = parse_option_chain({'records': {'data': [
+        {'strikePrice': 100, 'expiryDate': '01-Jan-2026', 'CE': {'openInterest': 5, 'lastPrice': 2.5}}
+    ]}})
+    assert chain.loc[0, 'CE_open_interest'] == 5
+    assert chain.loc[0, 'PE_open_interest'] == 0
+    assert parse_option_chain({}).empty
+
+def test_max_pain_matches_brute_force():
+    chain = _chain()
+    pain = max_pain(chain)
+    curve = pain_curve(chain)
+    for expiry, group in chain.groupby('expiry'):
+        k = group['strike'].values
+        c = group['CE_open_interest'].values
+        p = group['PE_open_interest'].values
+        brute = (c[None, :] * np.maximum(k[:, None] - k[None, :], 0)).sum(axis=1) + \
+                (p[None, :] * np.maximum(k[None, :] - k[:, None], 0)).sum(axis=1)
+        assert np.allclose(curve.loc[group.index, 'pain'].values, brute)
+        assert pain[expiry] == k[np.argmin(brute)]
+
+def test_pcr_walls_and_buildup():
+    chain = _chain()
+    pcr = put_call_ratio(chain)
+    first = chain[chain['expiry'] == pcr.index[0]]
+    assert np.isclose(pcr['pcr_oi'].iloc[0], first['PE_open_interest'].sum() / first['CE_open_interest'].sum())
+
+    walls = oi_walls(chain, top=2)
+    assert len(walls) == 3 * 2 * 2
+    top_call = walls[(walls['expiry'] == pcr.index[0]) & (walls['side'] == 'CE')]['open_interest'].iloc[0]
+    assert top_call == first['CE_open_interest'].max()
+
+    labelled = classify_buildup(chain)
+    row = labelled.iloc[0]
+    if row['CE_change'] > 0 and row['CE_change_oi'] > 0:
+        assert row['CE_buildup'] == 'Long Buildup'
+    assert set(labelled['PE_buildup']) <= {'Long Buildup', 'Short Buildup', 'Short Covering', 'Long Unwinding', 'Neutral'}
+
+if __name__ == "__main__":
+    test_parse_flat_columns()
+    test_missing_leg_is_zero_filled()
+    test_max_pain_matches_brute_force()
+    test_pcr_walls_and_buildup()
+    print('Option chain tests complete.')
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+import option_snapshots
+from market_simulator import option_chain_payload
+from option_chain import parse_option_chain
+from option_snapshots import append_snapshot, read_snapshots, chain_at, oi_evolution, chain_to_rows
+
+DAY = pd.Timestamp('2026-03-02 09:15', tz='Asia/Kolkata')
+
+@pytest.fixture(autouse=True)
+def snapshot_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(option_snapshots, 'OPTION_SNAPSHOT_DIR', str(tmp_path))
+    monkeypatch.setattr(option_snapshots, '_last_state', {})
+
+def _rows(seed=3):
+    payload = option_chain_payload('NIFTY', 22000.0, np.random.default_rng(seed), n_strikes=20, n_expiries=2)
+    rows = chain_to_rows(parse_option_chain(payload))
+    rows.loc[rows.index[:5], ['iv', 'last_price']] = np.nan  # far strikes without quotes
+    return rows
+
+def test_only_changed_rows_are_written():
+    rows = _rows()
+    assert append_snapshot('NIFTY', rows, DAY) == len(rows)
+    # Unchanged chain, NaN quotes included: nothing to write
+    assert append_snapshot('NIFTY', rows, DAY + pd.Timedelta(minutes=1)) == 0
+    changed = rows.copy()
+    changed.loc[changed.index[[0, 7]], 'open_interest'] += 100
+    assert append_snapshot('NIFTY', changed, DAY + pd.Timedelta(minutes=2)) == 2
+    assert len(read_snapshots('NIFTY', start=DAY, end=DAY + pd.Timedelta(hours=1))) == len(rows) + 2
+
+def test_snapshots_in_the_same_second_keep_both_parts():
+    rows = _rows()
+    append_snapshot('NIFTY', rows, DAY)
+    changed = rows.copy()
+    changed.loc[changed.index[3], 'volume'] += 1
+    assert append_snapshot('NIFTY', changed, DAY + pd.Timedelta(milliseconds=300)) == 1
+    changed.loc[changed.index[4], 'volume'] += 1
+    assert append_snapshot('NIFTY', changed, DAY + pd.Timedelta(milliseconds=300)) == 1
+    stored = read_snapshots('NIFTY', start=DAY, end=DAY + pd.Timedelta(seconds=1))
+    assert len(stored) == len(rows) + 2
+
+def test_restart_rebuilds_state_from_disk():
+    rows = _rows()
+    append_snapshot('NIFTY', rows, DAY)
+    option_snapshots._last_state.clear()  # new process
+    assert append_snapshot('NIFTY', rows, DAY + pd.Timedelta(minutes=5)) == 0
+    changed = rows.copy()
+    changed.loc[changed.index[10], 'last_price'] += 1.0
+    assert append_snapshot('NIFTY', changed, DAY + pd.Timedelta(minutes=6)) == 1
+
+def test_read_filters_chain_at_and_oi_evolution():
+    rows = _rows()
+    append_snapshot('NIFTY', rows, DAY)
+    changed = rows.copy()
+    first = changed.index[0]
+    changed.loc[first, 'open_interest'] += 500
+    append_snapshot('NIFTY', changed, DAY + pd.Timedelta(minutes=10))
+
+    strike = rows.loc[first, 'strike']
+    window = read_snapshots('NIFTY', start=DAY, end=DAY + pd.Timedelta(hours=1), strike_min=strike, strike_max=strike)
+    assert set(window['strike']) == {strike}
+
+    before = chain_at('NIFTY', DAY + pd.Timedelta(minutes=5))
+    after = chain_at('NIFTY', DAY + pd.Timedelta(minutes=15))
+    def oi(chain):
+        match = (chain['strike'] == strike) & (chain['side'] == rows.loc[first, 'side']) & (chain['expiry'] == rows.loc[first, 'expiry'])
+        return chain.loc[match, 'open_interest'].iloc[0]
+    assert oi(after) - oi(before) == 500
+    assert len(after) == len(rows)
+
+    panel = oi_evolution('NIFTY', DAY)
+    assert len(panel) == 2 and not panel.isna().any().any()
+    column = (rows.loc[first, 'expiry'], strike, rows.loc[first, 'side'])
+    assert panel[column].diff().iloc[-1] == 500
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_only_changed_rows_are_written, test_snapshots_in_the_same_second_keep_both_parts,
+                 test_restart_rebuilds_state_from_disk, test_read_filters_chain_at_and_oi_evolution):
+        option_snapshots.OPTION_SNAPSHOT_DIR = tempfile.mkdtemp()
+        option_snapshots._last_state.clear()
+        test()
+    print('Option snapshot tests complete.')
@@ -0,0 +1,42 @@
+import numpy as np
+from indicator_engine import compute_indicators
+from panel_indicators import build_panel, panel_indicators, latest_panel
+from synthetic_data import generate_ohlcv
+
+NAMES = ['rsi', 'macd_signal', 'bb_upper', 'stoch_d', 'adx', 'cci', 'mfi', 'atr']
+
+def make_frames():
+    full = generate_ohlcv('Nifty50', interval='5m', periods=400, seed=1, end='2026-01-09 15:30')
+    frames = {
+        'Nifty50': full,
+        # Listed later than the others
+        'BankNifty': generate_ohlcv('BankNifty', interval='5m', periods=250, seed=2, end='2026-01-09 15:30'),
+        # A halt in the middle
+        'Sensex': generate_ohlcv('Sensex', interval='5m', periods=400, seed=3, end='2026-01-09 15:30').drop(full.index[100:130]),
+    }
+    return frames
+
+def test_matches_single_symbol():
+    frames = make_frames()
+    panel = build_panel(frames)
+    result = panel_indicators(panel, NAMES)
+    for symbol, data in frames.items():
+        single = compute_indicators(data, NAMES)
+        for name in NAMES:
+            column = result[name][symbol]
+            assert column[~column.index.isin(data.index)].isna().all(), (symbol, name)
+            assert np.allclose(column.loc[data.index].values, single[name].values, equal_nan=True), (symbol, name)
+
+def test_latest_panel():
+    frames = make_frames()
+    frames['Empty'] = frames['Nifty50'].iloc[:0]
+    latest = latest_panel(build_panel(frames), NAMES)
+    assert latest.loc['Empty'].isna().all()
+    for symbol in ['Nifty50', 'BankNifty', 'Sensex']:
+        single = compute_indicators(frames[symbol], NAMES)
+        assert np.allclose(latest.loc[symbol].values, [single[name].iloc[-1] for name in NAMES])
+
+if __name__ == "__main__":
+    test_matches_single_symbol()
+    test_latest_panel()
+    print('Panel indicator tests complete.')
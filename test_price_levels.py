@@ -0,0 +1,102 @@
+import numpy as np
+import threading
+from price_levels import VolumeProfile, LevelEngine, cluster_levels
+from price_rejection_acceptance import price_rejection, price_acceptance
+from synthetic_data import generate_ohlcv
+
+def test_profile_matches_brute_force():
+    data = generate_ohlcv('Nifty50', interval='5m', periods=500, seed=3)
+    profile = VolumeProfile(data, bins=50)
+    edges = profile.edges
+    expected = np.zeros(50)
+    for low, high, volume in zip(data['Low'], data['High'], data['Volume']):
+        expected += np.clip(np.minimum(edges[1:], high) - np.maximum(edges[:-1], low), 0, None) / (high - low) * volume
+    assert np.allclose(profile.volume, expected, rtol=1e-6)
+    assert edges[0] <= data['Low'].min() and edges[-1] >= data['High'].max()
+    low, high = profile.value_area()
+    assert low <= profile.poc() <= high
+
+def test_incremental_updates():
+    data = generate_ohlcv('Sensex', interval='5m', periods=400, seed=4)
+    profile = VolumeProfile(data.iloc[:20], bins=40)
+    for i in range(20, len(data), 10):
+        # Re-feeding the whole window must not count bars twice
+        profile.update(data.iloc[:i + 10])
+    assert np.isclose(profile.volume.sum(), data['Volume'].sum())
+    assert len(profile.volume) == 40
+    # A forming bar fed twice counts once
+    last = data.iloc[-1:].copy()
+    last['Volume'] = last['Volume'] * 3
+    profile.update(last)
+    profile.update(data.iloc[-1:])
+    assert np.isclose(profile.volume.sum(), data['Volume'].sum())
+
+def test_cluster_levels():
+    prices = [100.0, 100.1, 100.2, 105.0, 105.05, 110.0]
+    kinds = [1, -1, 1, -1, -1, 1]
+    levels = cluster_levels(prices, kinds, tolerance=0.003)
+    assert levels['touches'].tolist() == [3, 2, 1]
+    assert np.isclose(levels['price'].iloc[0], 100.1)
+    assert levels[['highs', 'lows']].iloc[0].tolist() == [2, 1]
+    # A long chain of close prices is cut into tolerance-wide bands
+    chain = cluster_levels(np.arange(100, 110, 0.1), tolerance=0.003)
+    assert len(chain) > 10
+
+def test_level_engine_queries_and_rejection():
+    data = generate_ohlcv('BankNifty', interval='5m', periods=600, seed=5)
+    engine = LevelEngine(data)
+    price = data['Close'].iloc[-1]
+    support, resistance = engine.nearest(price)
+    assert support <= price < resistance or np.isnan(support) or np.isnan(resistance)
+    assert set(engine.summary(price)) >= {'poc', 'value_area_low', 'value_area_high', 'support', 'resistance'}
+    up, down = price_rejection(data, threshold=0.001, levels=engine)
+    assert len(up) == len(data) and up.dtype == bool
+    default = price_acceptance(data)
+    assert len(default[0]) == len(data)
+
+def test_level_engine_window_and_rebuild():
+    data = generate_ohlcv('Nifty50', interval='5m', periods=1000, seed=6)
+    engine = LevelEngine(data.iloc[:50], bins=50, window=200)
+    for i in range(50, len(data), 25):
+        engine.update(data.iloc[:i + 25])
+        assert len(engine._bars) <= 400
+    # The profile holds between one and two windows of bars
+    held = engine._bars
+    assert 200 <= len(held) <= 400 and held.index[-1] == data.index[-1]
+    assert np.isclose(engine.profile.volume.sum(), held['Volume'].sum())
+    fine = engine.profile.width
+    # A forming bar revised back after a spike does not leave the bins coarse
+    spike = data.iloc[-1:].copy()
+    spike['High'] = spike['High'] * 3
+    engine.update(spike)
+    assert engine.profile.width > fine
+    engine.update(data.iloc[-1:])
+    assert engine.profile.width == fine
+    assert np.isclose(engine.profile.volume.sum(), held['Volume'].sum())
+
+def test_level_engine_shared_across_threads():
+    data = generate_ohlcv('BankNifty', interval='5m', periods=600, seed=7)
+    shared = LevelEngine(data.iloc[:100], window=300)
+    def feed():
+        for i in range(100, len(data), 20):
+            shared.update(data.iloc[:i + 20])
+            shared.summary(data['Close'].iloc[i])
+    threads = [threading.Thread(target=feed) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    alone = LevelEngine(data.iloc[:100], window=300)
+    for i in range(100, len(data), 20):
+        alone.update(data.iloc[:i + 20])
+    assert np.isclose(shared.profile.volume.sum(), alone._bars['Volume'].sum())
+    assert shared._bars.index.equals(alone._bars.index)
+
+if __name__ == "__main__":
+    test_profile_matches_brute_force()
+    test_incremental_updates()
+    test_cluster_levels()
+    test_level_engine_queries_and_rejection()
+    test_level_engine_window_and_rebuild()
+    test_level_engine_shared_across_threads()
+    print('Price level tests complete.')
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from indicators import range_filter
+from synthetic_data import generate_ohlcv
+
+def loop_range_filter(data, period=20, multiplier=1.6):
+    # Reference: the original bar-by-bar state machine
+    range_filter = (data['High'] - data['Low']).rolling(period).mean() * multiplier
+    trend = pd.Series(index=data.index, dtype=float)
+    trend.iloc[0] = 0
+    for i in range(1, len(data)):
+        rf_val = range_filter.iloc[i]
+        close_val = data['Close'].iloc[i]
+        prev_close_val = data['Close'].iloc[i-1]
+        if np.isnan(rf_val) or np.isnan(close_val) or np.isnan(prev_close_val):
+            trend.iloc[i] = trend.iloc[i-1]
+        elif close_val > prev_close_val + rf_val:
+            trend.iloc[i] = 1
+        elif close_val < prev_close_val - rf_val:
+            trend.iloc[i] = -1
+        else:
+            trend.iloc[i] = trend.iloc[i-1]
+    return range_filter, trend
+
+def test_matches_loop():
+    for seed in range(5):
+        data = generate_ohlcv('Nifty50', interval='5m', periods=1500, seed=seed, volatility=0.004, wick=0.0005)
+        data.iloc[[100, 700], data.columns.get_loc('Close')] = np.nan
+        rf, trend = range_filter(data, period=10, multiplier=0.5)
+        ref_rf, ref_trend = loop_range_filter(data, period=10, multiplier=0.5)
+        assert rf.equals(ref_rf)
+        assert (trend.values == ref_trend.values).all()
+        assert set(np.unique(trend)) <= {-1.0, 0.0, 1.0}
+
+def test_multi_symbol_panel():
+    frames = {name: generate_ohlcv(name, interval='5m', periods=500, seed=3, end='2026-01-09 15:30')
+              for name in ['Sensex', 'Nifty50', 'BankNifty']}
+    panel = pd.concat(frames, axis=1).swaplevel(axis=1)
+    rf, trend = range_filter(panel, period=10, multiplier=0.5)
+    assert trend.shape == (500, 3)
+    for name, data in frames.items():
+        assert (trend[name].values == range_filter(data, period=10, multiplier=0.5)[1].values).all()
+
+if __name__ == "__main__":
+    test_matches_loop()
+    test_multi_symbol_panel()
+    print('Range filter tests complete.')
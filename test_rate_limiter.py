@@ -0,0 +1,61 @@
+import multiprocessing
+import time
+import pandas as pd
+from rate_limiter import RateLimiter, PRIORITY_SCHEDULED, PRIORITY_INTERACTIVE
+from hedged_fetch import HedgedFetcher
+
+def _spend(quota_file, calls):
+    limiter = RateLimiter(limits={'fmp': (None, 1000)}, quota_file=quota_file)
+    for _ in range(calls):
+        assert limiter.acquire('fmp', PRIORITY_SCHEDULED)
+
+def test_usage_is_shared_between_processes(tmp_path):
+    quota_file = str(tmp_path / 'quota.json')
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=_spend, args=(quota_file, 25)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+    assert RateLimiter(limits={'fmp': (None, 1000)}, quota_file=quota_file).remaining('fmp') == 900
+
+def test_daily_quota_counts_every_limiter(tmp_path):
+    quota_file = str(tmp_path / 'quota.json')
+    first = RateLimiter(limits={'fmp': (None, 8)}, quota_file=quota_file, interactive_reserve=0.0)
+    second = RateLimiter(limits={'fmp': (None, 8)}, quota_file=quota_file, interactive_reserve=0.0)
+    granted = [limiter.acquire('fmp') for _ in range(6) for limiter in (first, second)]
+    assert sum(granted) == 8
+    assert first.remaining('fmp') == 0 and second.remaining('fmp') == 0
+
+def test_interactive_reserve(tmp_path):
+    limiter = RateLimiter(limits={'fmp': (None, 10)}, quota_file=str(tmp_path / 'quota.json'), interactive_reserve=0.2)
+    assert sum(limiter.acquire('fmp', PRIORITY_INTERACTIVE) for _ in range(10)) == 8
+    assert limiter.acquire('fmp', PRIORITY_SCHEDULED)
+
+def test_scheduled_wait_respects_caller_deadline(tmp_path):
+    limiter = RateLimiter(limits={'polygon': (1, None)}, quota_file=str(tmp_path / 'quota.json'))
+    assert limiter.acquire('polygon', PRIORITY_SCHEDULED)
+    start = time.monotonic()
+    assert not limiter.acquire('polygon', PRIORITY_SCHEDULED, deadline=start + 0.2)
+    assert time.monotonic() - start < 1.0
+
+def test_hedged_fetch_does_not_spend_quota_after_timeout(tmp_path):
+    limiter = RateLimiter(limits={'polygon': (1, 100)}, quota_file=str(tmp_path / 'quota.json'))
+    assert limiter.acquire('polygon', PRIORITY_SCHEDULED)
+    calls = []
+    fetcher = HedgedFetcher([('polygon', lambda: calls.append(1) or pd.DataFrame({'Close': [1.0]}))],
+                            timeout=0.3, limiter=limiter)
+    start = time.monotonic()
+    assert fetcher.fetch(priority=PRIORITY_SCHEDULED).empty
+    time.sleep(0.5)  # let the worker give up
+    assert calls == [] and limiter.remaining('polygon') == 99
+    assert time.monotonic() - start < 2.0
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    for test in (test_usage_is_shared_between_processes, test_daily_quota_counts_every_limiter,
+                 test_interactive_reserve, test_scheduled_wait_respects_caller_deadline,
+                 test_hedged_fetch_does_not_spend_quota_after_timeout):
+        test(pathlib.Path(tempfile.mkdtemp()))
+    print('Rate limiter tests complete.')
@@ -0,0 +1,35 @@
+import pandas as pd
+from synthetic_data import generate_ohlcv
+from resampler import resample_bars, BarResampler
+
+def _bars():
+    return generate_ohlcv('Nifty50', interval='5m', start='2026-01-05', end='2026-01-07 12:02', seed=3)
+
+def test_aggregation_matches_pandas():
+    data = _bars()
+    hourly = resample_bars(data, '60m')
+    expected = data.groupby(pd.Grouper(freq='60min', origin=pd.Timestamp('2026-01-05 09:15', tz='Asia/Kolkata'))).agg(
+        {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}).dropna()
+    assert (hourly[['Open', 'High', 'Low', 'Close', 'Volume']].values == expected.values).all()
+    # Seven 1h bars per session, the last one 15:15-15:30
+    assert (hourly.index.normalize() == pd.Timestamp('2026-01-05', tz='Asia/Kolkata')).sum() == 7
+    assert hourly.index[0].strftime('%H:%M') == '09:15'
+
+def test_partial_flag():
+    hourly = resample_bars(_bars(), '60m')
+    assert hourly['Partial'].tolist() == [False] * (len(hourly) - 1) + [True]
+    daily = resample_bars(_bars(), '1d')
+    assert daily['Partial'].tolist() == [False, False, True]
+
+def test_incremental_matches_batch():
+    data = _bars()
+    resampler = BarResampler('15m')
+    for i in range(0, len(data), 4):
+        resampler.update(data.iloc[i:i + 4])
+    assert resampler.bars.equals(resample_bars(data, '15m'))
+
+if __name__ == "__main__":
+    test_aggregation_matches_pandas()
+    test_partial_flag()
+    test_incremental_matches_batch()
+    print('Resampler tests complete.')
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from stop_losses import initial_stop_loss, trailing_stop_loss, stop_candidates, simulate_stops
+from support_resistance import calculate_atr
+from synthetic_data import generate_ohlcv
+
+def reference_trade(data, entry, candidates, direction, horizon):
+    """
+    One trade bar by bar.
+    """
+    close, opens = data['Close'].values, data['Open'].values
+    adverse = data['Low'].values if direction == 1 else data['High'].values
+    better = max if direction == 1 else min
+    stop = candidates[entry]
+    for t in range(entry + 1, min(entry + horizon, len(data) - 1) + 1):
+        if not np.isnan(stop) and (adverse[t] <= stop if direction == 1 else adverse[t] >= stop):
+            fill = min(opens[t], stop) if direction == 1 else max(opens[t], stop)
+            return t, fill, True
+        if not np.isnan(candidates[t]):
+            stop = candidates[t] if np.isnan(stop) else better(stop, candidates[t])
+    t = min(entry + horizon, len(data) - 1)
+    return t, close[t], False
+
+def test_trailing_stop_ratchets():
+    data = generate_ohlcv('Nifty50', interval='5m', periods=200, seed=1)
+    sl_long, _ = initial_stop_loss(data)
+    trail = trailing_stop_loss(data, sl_long.iloc[20], trail_percent=0.01)
+    assert (trail.diff().dropna() >= 0).all()
+    assert np.isclose(trail.iloc[-1], max(sl_long.iloc[20], (data['Close'] * 0.99).max()))
+    atr = calculate_atr(data)
+    assert np.allclose(initial_stop_loss(data, atr=atr)[0], sl_long, equal_nan=True)
+
+def test_simulation_matches_reference():
+    data = generate_ohlcv('BankNifty', interval='5m', periods=400, seed=2)
+    entries = np.arange(0, 400, 3)
+    for direction in (1, -1):
+        for method in ('atr', 'percent', 'chandelier'):
+            kwargs = {'percent': 0.003} if method == 'percent' else {'multiplier': 2.0}
+            trades = simulate_stops(data, entries, direction=direction, method=method, horizon=40, **kwargs)
+            candidates = stop_candidates(data, method=method, direction=direction, **kwargs).values
+            for row, entry in zip(trades.itertuples(), entries):
+                t, price, stopped = reference_trade(data, entry, candidates, direction, 40)
+                assert row.exit_time == data.index[t], (method, direction, entry)
+                assert np.isclose(row.exit_price, price) and row.stopped == stopped
+
+def test_entry_formats():
+    data = generate_ohlcv('Sensex', interval='5m', periods=100, seed=3)
+    mask = pd.Series(False, index=data.index)
+    mask.iloc[[10, 50]] = True
+    by_mask = simulate_stops(data, mask)
+    by_time = simulate_stops(data, data.index[[10, 50]])
+    assert by_mask.equals(by_time)
+    with pytest.raises(KeyError):
+        simulate_stops(data, [data.index[10] + pd.Timedelta(minutes=1)])
+    with pytest.raises(KeyError):
+        simulate_stops(data, [10, len(data)])
+    with pytest.raises(KeyError):
+        simulate_stops(data, [-1])
+    assert list(by_mask.columns) == ['entry_time', 'entry_price', 'exit_time', 'exit_price', 'bars_held', 'stopped', 'return_pct']
+
+if __name__ == "__main__":
+    test_trailing_stop_ratchets()
+    test_simulation_matches_reference()
+    test_entry_formats()
+    print('Stop loss tests complete.')
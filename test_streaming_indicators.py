@@ -0,0 +1,55 @@
+import json
+import numpy as np
+import ta
+from indicator_engine import compute_indicators
+from streaming_indicators import IndicatorSet, StreamingIndicator
+from synthetic_data import generate_ohlcv
+
+def stream(data, indicators=None, start=0):
+    indicators = indicators or IndicatorSet()
+    rows = []
+    for timestamp, bar in data.iloc[start:].iterrows():
+        values = indicators.update(bar, timestamp)
+        macd, signal, diff = values['macd']
+        upper, middle, lower = values['bollinger']
+        k, d = values['stochastic']
+        rows.append({'rsi': values['rsi'], 'macd': macd, 'macd_signal': signal, 'macd_diff': diff,
+                     'bb_upper': upper, 'bb_middle': middle, 'bb_lower': lower, 'atr': values['atr'],
+                     'adx': values['adx'], 'stoch_k': k, 'stoch_d': d, 'mfi': values['mfi'],
+                     'cci': values['cci'], 'obv': values['obv']})
+    return indicators, {name: np.array([row[name] for row in rows]) for name in rows[0]}
+
+def test_matches_batch_indicators():
+    data = generate_ohlcv('Nifty50', interval='5m', periods=300, seed=11)
+    _, streamed = stream(data)
+    expected = compute_indicators(data, [name for name in streamed if name != 'obv'])
+    expected['obv'] = ta.volume.OnBalanceVolumeIndicator(data['Close'], data['Volume']).on_balance_volume()
+    for name, values in streamed.items():
+        assert np.allclose(values, expected[name].values.astype(float), rtol=1e-7, atol=1e-7, equal_nan=True), name
+
+def test_snapshot_restore_resumes():
+    data = generate_ohlcv('BankNifty', interval='5m', periods=200, seed=4)
+    _, full = stream(data)
+    half, _ = stream(data.iloc[:120])
+    restored = StreamingIndicator.from_snapshot(json.loads(json.dumps(half.snapshot())))
+    _, resumed = stream(data, restored, start=120)
+    for name, values in resumed.items():
+        assert np.allclose(values, full[name][120:], equal_nan=True), name
+
+def test_forming_bar_revision():
+    data = generate_ohlcv('Sensex', interval='5m', periods=80, seed=2)
+    indicators = IndicatorSet()
+    indicators.warm_up(data.iloc[:-1])
+    timestamp, bar = data.index[-1], data.iloc[-1]
+    # A stale tick of the last bar, then its final values
+    indicators.update(bar * 1.01, timestamp)
+    revised = indicators.update(bar, timestamp)
+    _, full = stream(data)
+    assert np.isclose(revised['rsi'], full['rsi'][-1])
+    assert np.isclose(revised['obv'], full['obv'][-1])
+
+if __name__ == "__main__":
+    test_matches_batch_indicators()
+    test_snapshot_restore_resumes()
+    test_forming_bar_revision()
+    print('Streaming indicator tests complete.')
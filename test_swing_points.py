@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from swing_points import SwingIndex
+from chart_patterns import head_and_shoulders, double_top, scan_chart_patterns
+from support_resistance import swing_support_resistance
+from synthetic_data import generate_ohlcv
+
+def zigzag_bars(turns, steps=6):
+    """
+    Bars walking linearly between the given turning prices.
+    """
+    path = np.concatenate([np.linspace(a, b, steps, endpoint=False) for a, b in zip(turns[:-1], turns[1:])] + [[turns[-1]] * steps])
+    index = pd.date_range('2026-01-05 09:15', periods=len(path), freq='5min', tz='Asia/Kolkata')
+    return pd.DataFrame({'Open': path, 'High': path + 0.1, 'Low': path - 0.1, 'Close': path, 'Volume': 1000}, index=index)
+
+def test_matches_brute_force_and_incremental():
+    data = generate_ohlcv('Nifty50', interval='5m', periods=600, seed=3)
+    full = SwingIndex(data)
+    incremental = SwingIndex(data.iloc[:50])
+    for i in range(50, len(data), 7):
+        incremental.update(data.iloc[i:i + 7])
+    high, k = data['High'].values, 5
+    expected = [i for i in range(k, len(high) - k) if high[i] > high[i - k:i].max() and high[i] >= high[i + 1:i + k + 1].max()]
+    assert list(full.swings(5, kind=1)['position']) == expected
+    for scale in full.scales:
+        assert full.swings(scale).equals(incremental.swings(scale))
+
+def test_forming_bar_revision():
+    data = generate_ohlcv('Sensex', interval='5m', periods=200, seed=4)
+    swings = SwingIndex(data.iloc[:-1])
+    spike = data.iloc[-1:].copy()
+    spike['High'] *= 1.2
+    swings.update(spike)
+    swings.update(data.iloc[-1:])
+    assert swings.swings(2).equals(SwingIndex(data).swings(2))
+
+def test_overlapping_and_growing_windows():
+    data = generate_ohlcv('Nifty50', interval='5m', periods=600, seed=3)
+    full = SwingIndex(data)
+    for overlap in (1, 2, 3, 30):
+        swings = SwingIndex(data.iloc[:50])
+        for i in range(50, len(data), 7):
+            swings.update(data.iloc[max(i - overlap, 0):i + 7])
+        for scale in full.scales:
+            assert swings.swings(scale).equals(full.swings(scale))
+    # A refresh loop feeding the whole window every time
+    growing = SwingIndex(data.iloc[:50])
+    for i in range(50, len(data), 7):
+        growing.update(data.iloc[:i + 7])
+    for scale in full.scales:
+        assert growing.swings(scale).equals(full.swings(scale))
+
+def test_revision_several_bars_back():
+    data = generate_ohlcv('BankNifty', interval='5m', periods=300, seed=5)
+    revised = data.copy()
+    revised.iloc[-4, revised.columns.get_loc('High')] *= 1.05
+    swings = SwingIndex(data)
+    swings.update(revised.iloc[-4:])
+    for scale in swings.scales:
+        assert swings.swings(scale).equals(SwingIndex(revised).swings(scale))
+
+def test_structural_patterns():
+    hs = zigzag_bars([100, 110, 104, 116, 104, 110, 100, 98])
+    assert head_and_shoulders(hs).sum() == 1
+    assert 'head_and_shoulders' in set(scan_chart_patterns(hs)['pattern'])
+    top = zigzag_bars([100, 110, 102, 110.5, 100, 98])
+    assert double_top(top).sum() == 1
+    assert head_and_shoulders(top).sum() == 0
+
+def test_swing_support_resistance():
+    data = zigzag_bars([100, 110, 104, 116, 104, 110, 100, 98])
+    support, resistance = swing_support_resistance(data)
+    assert np.isnan(resistance.iloc[0])
+    assert np.isclose(resistance.iloc[-1], 110.1) and np.isclose(support.iloc[-1], 97.9)
+
+if __name__ == "__main__":
+    test_matches_brute_force_and_incremental()
+    test_forming_bar_revision()
+    test_overlapping_and_growing_windows()
+    test_revision_several_bars_back()
+    test_structural_patterns()
+    test_swing_support_resistance()
+    print('Swing point tests complete.')
@@ -0,0 +1,30 @@
+import numpy as np
+from synthetic_data import generate_ohlcv
+
+def test_ohlc_integrity_and_bounds():
+    data = generate_ohlcv('Sensex', interval='5m', periods=5000, seed=7, end='2026-01-09 15:30')
+    assert len(data) == 5000
+    assert (data['High'] >= data[['Open', 'Close']].max(axis=1)).all()
+    assert (data['Low'] <= data[['Open', 'Close']].min(axis=1)).all()
+    assert data['Close'].between(83754 * 0.8, 83754 * 1.2).all()
+    assert data.index.is_monotonic_increasing
+    assert data['Volume'].dtype == np.int64
+
+def test_session_calendar():
+    data = generate_ohlcv('Nifty50', interval='5m', start='2026-01-05', end='2026-01-11', seed=1)
+    # Five weekdays of 75 five-minute bars between 09:15 and 15:25
+    assert len(data) == 5 * 75
+    assert (data.index.dayofweek < 5).all()
+    assert data.index.min().strftime('%H:%M') == '09:15'
+    assert data.index.max().strftime('%H:%M') == '15:25'
+
+def test_seed_is_reproducible():
+    a = generate_ohlcv('CrudeOil', interval='1d', periods=250, seed=42, end='2026-01-09')
+    b = generate_ohlcv('CrudeOil', interval='1d', periods=250, seed=42, end='2026-01-09')
+    assert a.equals(b)
+
+if __name__ == "__main__":
+    test_ohlc_integrity_and_bounds()
+    test_session_calendar()
+    test_seed_is_reproducible()
+    print('Synthetic data tests complete.')
@@ -1,7 +1,8 @@
 import time
 import matplotlib.pyplot as plt
 import pandas as pd
-from data_fetcher import get_realtime_data, get_historical_data, is_market_open, symbols
+from data_fetcher import get_realtime_data, get_realtime_data_batch, get_historical_data, is_market_open, symbols
+from market_calendar import next_session_open, seconds_until_next_session
 from support_resistance import find_support_resistance, dynamic_support_resistance
 from market_stages import identify_market_phase
 from trending_ranging import is_trending
@@ -14,57 +15,61 @@ from risk_management import position_size
 from stop_losses import initial_stop_loss
 from trading_journal import log_entry
 from indicators import get_indicator_signals
-from ml_predictor import get_predictor
+from ml_predictor import get_predictor, rule_based_prediction
 from models import TradingRecord, session
 import json
-import ta  # For RSI
+from indicator_engine import latest_indicators
+from panel_indicators import build_panel, latest_panel
 
-def analyze_symbol(symbol_name, symbol):
+# Indicators analyze_symbol reads (latest value of each)
+ANALYSIS_INDICATORS = ['rsi', 'macd', 'macd_signal', 'bb_upper', 'bb_middle', 'bb_lower', 'sma_20', 'sma_50',
+                       'ema_20', 'stoch_k', 'stoch_d', 'adx', 'cci', 'williams_r', 'mfi', 'roc', 'atr']
+
+def analyze_symbol(symbol_name, symbol, rt_data=None, indicators=None):
     """
     Advanced analysis with price targets and trend analysis for accurate trading signals.
+    Pass rt_data to analyse bars that were already fetched (e.g. by a batch download),
+    and indicators (name -> latest value) when they were computed for a whole panel.
     """
     try:
         # Get real-time data
-        rt_data = get_realtime_data(symbol, period='1d', interval='5m')
+        if rt_data is None:
+            rt_data = get_realtime_data(symbol, period='1d', interval='5m')
         if rt_data.empty:
             return None
 
         # Calculate comprehensive indicators
-        close_prices = rt_data['Close'].squeeze()
-        high_prices = rt_data['High'].squeeze()
-        low_prices = rt_data['Low'].squeeze()
-        volume = rt_data['Volume'].squeeze()
+        close_prices = rt_data['Close']
+        high_prices = rt_data['High']
+        low_prices = rt_data['Low']
+        volume = rt_data['Volume']
 
-        # Core indicators
-        rsi = ta.momentum.RSIIndicator(close_prices).rsi().iloc[-1]
-        macd_indicator = ta.trend.MACD(close_prices)
-        macd = macd_indicator.macd().iloc[-1]
-        macd_signal = macd_indicator.macd_signal().iloc[-1]
+        # All indicators in one pass over shared intermediates (diffs, true range, rolling windows, EMAs)
+        ind = indicators if indicators is not None else latest_indicators(rt_data, ANALYSIS_INDICATORS)
+        rsi = ind['rsi']
+        macd = ind['macd']
+        macd_signal = ind['macd_signal']
 
         # Bollinger Bands
-        bb_indicator = ta.volatility.BollingerBands(close_prices)
-        bb_upper = bb_indicator.bollinger_hband().iloc[-1]
-        bb_lower = bb_indicator.bollinger_lband().iloc[-1]
-        bb_middle = bb_indicator.bollinger_mavg().iloc[-1]
+        bb_upper = ind['bb_upper']
+        bb_lower = ind['bb_lower']
+        bb_middle = ind['bb_middle']
 
         # Moving averages
-        sma_20 = ta.trend.SMAIndicator(close_prices, window=20).sma_indicator().iloc[-1]
-        sma_50 = ta.trend.SMAIndicator(close_prices, window=50).sma_indicator().iloc[-1]
-        ema_20 = ta.trend.EMAIndicator(close_prices, window=20).ema_indicator().iloc[-1]
+        sma_20 = ind['sma_20']
+        sma_50 = ind['sma_50']
+        ema_20 = ind['ema_20']
 
         # Stochastic Oscillator
-        stoch_indicator = ta.momentum.StochasticOscillator(high_prices, low_prices, close_prices)
-        stoch_k = stoch_indicator.stoch().iloc[-1]
-        stoch_d = stoch_indicator.stoch_signal().iloc[-1]
+        stoch_k = ind['stoch_k']
+        stoch_d = ind['stoch_d']
 
         # Additional advanced indicators
-        adx_indicator = ta.trend.ADXIndicator(high_prices, low_prices, close_prices)
-        adx = adx_indicator.adx().iloc[-1]
-
-        cci = ta.trend.CCIIndicator(high_prices, low_prices, close_prices).cci().iloc[-1]
-        williams_r = ta.momentum.WilliamsRIndicator(high_prices, low_prices, close_prices).williams_r().iloc[-1]
-        mfi = ta.volume.MFIIndicator(high_prices, low_prices, close_prices, volume).money_flow_index().iloc[-1]
-        roc = ta.momentum.ROCIndicator(close_prices).roc().iloc[-1]
+        adx = ind['adx']
+        cci = ind['cci']
+        williams_r = ind['williams_r']
+        mfi = ind['mfi']
+        roc = ind['roc']
 
         # Volume analysis
         avg_volume = volume.mean()
@@ -85,7 +90,7 @@ def analyze_symbol(symbol_name, symbol):
             trend_strength += 1
 
         # Get ML prediction with enhanced indicators
-        indicators = {
+        features = {
             'rsi': rsi,
             'macd': macd,
             'macd_signal': macd_signal,
@@ -110,36 +115,29 @@ def analyze_symbol(symbol_name, symbol):
         # Use lazy predictor to avoid heavy initialization during import
         predictor = get_predictor()
         if predictor:
-            action = predictor.predict(indicators)
-            confidence = predictor.get_prediction_confidence(indicators)
+            action = predictor.predict(features)
+            confidence = predictor.get_prediction_confidence(features)
         else:
-            # Fallback rule-based action when the ML predictor isn't available
-            if indicators['rsi'] < 30 and indicators['momentum'] > 0:
-                action = 'buy'
-                confidence = 0.6
-            elif indicators['rsi'] > 70 and indicators['momentum'] < 0:
-                action = 'sell'
-                confidence = 0.6
-            else:
-                action = 'hold'
-                confidence = 0.5
+            # Fallback rule-based action while the ML model is unavailable or training
+            action, confidence = rule_based_prediction(features)
 
         # Calculate precise price targets based on current market conditions
         current_price = close_prices.iloc[-1]
 
         # Dynamic stop loss and take profit based on volatility and trend
-        atr = ta.volatility.AverageTrueRange(high_prices, low_prices, close_prices).average_true_range().iloc[-1]
+        atr = ind['atr']
         risk_multiplier = 1.5 if volatility > 2.0 else 2.0  # Higher risk in volatile markets
+        sl_long, sl_short = initial_stop_loss(rt_data.iloc[-1:], risk_multiplier, atr=atr)
 
         if action == 'buy':
-            stop_loss = current_price - (atr * risk_multiplier)
+            stop_loss = sl_long.iloc[-1]
             # Profit targets based on resistance levels and trend strength
             if trend_strength >= 3:  # Strong uptrend
                 take_profit = current_price + (atr * 4)  # Higher target in strong trends
             else:
                 take_profit = current_price + (atr * 2.5)
         elif action == 'sell':
-            stop_loss = current_price + (atr * risk_multiplier)
+            stop_loss = sl_short.iloc[-1]
             if trend_strength >= 3:  # Strong downtrend
                 take_profit = current_price - (atr * 4)
             else:
@@ -359,15 +357,22 @@ def main():
     while True:
         if is_market_open():
             print("Market open, analyzing...")
+            # One provider round trip for the whole watchlist
+            batch = get_realtime_data_batch(list(symbols.values()), period='1d', interval='5m')
+            # Indicators for the whole watchlist in one vectorized pass
+            frames = {sym: data for sym, data in batch.items() if not data.empty}
+            latest = latest_panel(build_panel(frames), ANALYSIS_INDICATORS) if frames else pd.DataFrame()
             for name, sym in symbols.items():
-                result = analyze_symbol(name, sym)
+                ind = latest.loc[sym].to_dict() if sym in latest.index else None
+                result = analyze_symbol(name, sym, rt_data=batch.get(sym), indicators=ind)
                 if result:
                     print(f"{result['symbol']}: {result['action']} at {result['price']:.2f}, SL: {result['stop_loss']:.2f if result['stop_loss'] else 'N/A'}, TP: {result['take_profit']:.2f if result['take_profit'] else 'N/A'}")
                     print(f"Reason: {result['reason']}")
             time.sleep(300)  # 5 min
         else:
-            print("Market closed, waiting...")
-            time.sleep(60)  # Check every min
+            # Sleep through nights, weekends and exchange holidays in one go
+            print(f"Market closed, next session at {next_session_open()}")
+            time.sleep(max(seconds_until_next_session(), 1))
 
 if __name__ == "__main__":
     main()